@@ -5,10 +5,13 @@ import tkinter as tk
 import tkinter.ttk as ttk
 from tkinter import messagebox as mssg
 from tkinter import filedialog
-from datetime import datetime
-from db_handler import DatabaseHandler  # Importa el módulo para manejo de la base de datos
-import csv
-import re  # Para validaciones con expresiones regulares
+# Solo se importa lo necesario para construir la ventana; los demás módulos del proyecto se importan
+# después de mostrarla (Participantes.prepara_Trabajo y crea_Servicio) o donde se usan
+from time import perf_counter
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
 
 # --------------------------
 # Funciones para el placeholder
@@ -95,20 +98,246 @@ class CreateToolTip(object):
             self.tw.destroy()
         self.tw = None
 
+# --------------------------
+# Clase para el diálogo de progreso
+# --------------------------
+class DialogoProgreso(object):
+    """
+    Ventana de progreso para operaciones largas que se ejecutan en otro hilo.
+    El hilo de trabajo informa su avance con progreso(); la ventana lo consulta periódicamente
+    y el botón Cancelar activa el evento 'cancelado', que el hilo revisa entre lotes.
+    """
+    def __init__(self, master, titulo, intervalo=100):
+        self.hechos = 0         # Unidades procesadas (escritas por el hilo de trabajo)
+        self.total = 0          # Unidades totales esperadas
+        self.intervalo = intervalo
+        self.cancelado = threading.Event()
+        self.tw = tk.Toplevel(master)
+        self.tw.title(titulo)
+        self.tw.configure(background="#E8F6F3")
+        self.tw.resizable(False, False)
+        self.tw.transient(master)
+        self.lblEstado = tk.Label(self.tw, text="Iniciando...", bg="#E8F6F3", font=("Helvetica", 10))
+        self.lblEstado.pack(padx=10, pady=(10, 5))
+        self.barra = ttk.Progressbar(self.tw, length=320, mode="determinate")
+        self.barra.pack(padx=10, pady=5)
+        self.btnCancelar = ttk.Button(self.tw, text="🚫 Cancelar", style="Custom.TButton", command=self.cancelar)
+        self.btnCancelar.pack(padx=10, pady=(5, 10))
+        self.tw.protocol("WM_DELETE_WINDOW", self.cancelar)
+        self.id = self.tw.after(self.intervalo, self.actualiza)
+
+    def progreso(self, hechos, total):
+        # Se llama desde el hilo de trabajo: solo guarda los valores, la ventana se actualiza en actualiza()
+        self.hechos, self.total = hechos, total
+
+    def actualiza(self):
+        # Refleja en la barra el último avance informado y vuelve a programarse.
+        self.barra.configure(maximum=max(self.total, 1), value=self.hechos)
+        if not self.cancelado.is_set():
+            self.lblEstado.config(text=f"{self.hechos} de {self.total}")
+        self.id = self.tw.after(self.intervalo, self.actualiza)
+
+    def cancelar(self):
+        # Solicita la cancelación; el hilo de trabajo la atiende al terminar el lote en curso.
+        self.cancelado.set()
+        self.lblEstado.config(text="Cancelando...")
+        self.btnCancelar.state(["disabled"])
+
+    def cerrar(self):
+        # Detiene la actualización periódica y destruye la ventana.
+        if self.id:
+            self.tw.after_cancel(self.id)
+            self.id = None
+        self.tw.destroy()
+
+# --------------------------
+# Clase para la lista de sugerencias
+# --------------------------
+class ListaSugerencias(object):
+    """
+    Lista desplegable bajo un campo de texto con sugerencias para lo que se está escribiendo.
+    mostrar() recibe pares (valor, texto); al elegir una sugerencia con clic o Enter se llama a al_elegir(valor).
+    """
+    def __init__(self, entry, al_elegir, filas=8):
+        self.entry = entry
+        self.al_elegir = al_elegir
+        self.filas = filas      # Máximo de sugerencias visibles
+        self.valores = []       # Valor de cada sugerencia, en el orden de la lista
+        self.tw = None          # Ventana de la lista (None si está oculta)
+        self.lista = None
+
+    def mostrar(self, sugerencias):
+        # Reemplaza las sugerencias visibles; sin sugerencias, la lista se oculta.
+        if not sugerencias:
+            self.ocultar()
+            return
+        if self.tw is None:
+            self.tw = tk.Toplevel(self.entry)
+            self.tw.wm_overrideredirect(True)
+            self.lista = tk.Listbox(self.tw, width=self.entry.cget("width"), exportselection=False,
+                                    background="#ffffe0", relief='solid', borderwidth=1)
+            self.lista.pack(fill="both", expand=True)
+            self.lista.bind("<ButtonRelease-1>", self.elegir)
+            self.lista.bind("<Return>", self.elegir)
+            self.lista.bind("<Escape>", self.ocultar)
+            self.lista.bind("<FocusOut>", self.ocultar)
+        self.tw.wm_geometry("+%d+%d" % (self.entry.winfo_rootx(),
+                                        self.entry.winfo_rooty() + self.entry.winfo_height()))
+        self.valores = [valor for valor, _ in sugerencias]
+        self.lista.delete(0, "end")
+        self.lista.insert("end", *(texto for _, texto in sugerencias))
+        self.lista.configure(height=min(len(sugerencias), self.filas))
+
+    def enfocar(self, event=None):
+        # Pasa el foco a la primera sugerencia (flecha abajo en el campo de texto).
+        if self.tw is None:
+            return None
+        self.lista.focus_set()
+        self.lista.selection_set(0)
+        self.lista.activate(0)
+        return "break"
+
+    def elegir(self, event=None):
+        # Oculta la lista y entrega el valor de la sugerencia seleccionada.
+        seleccion = self.lista.curselection()
+        if not seleccion:
+            return
+        valor = self.valores[seleccion[0]]
+        self.ocultar()
+        self.entry.focus_set()
+        self.al_elegir(valor)
+
+    def ocultar_sin_foco(self):
+        # Oculta la lista si el foco no pasó a ella (el campo de texto perdió el foco).
+        if self.tw is not None and self.tw.focus_get() is not self.lista:
+            self.ocultar()
+
+    def ocultar(self, event=None):
+        # Destruye la ventana de la lista si está visible.
+        if self.tw:
+            self.tw.destroy()
+        self.tw = None
+        self.lista = None
+        self.valores = []
+
+# --------------------------
+# Clase para el panel de estadísticas
+# --------------------------
+class VentanaEstadisticas(object):
+    """
+    Ventana con el número de participantes por departamento, ciudad, entidad y fecha, una pestaña por cada uno.
+    Los conteos salen de las tablas de resumen que mantienen los triggers (ServicioParticipantes.estadisticas),
+    así que se vuelven a leer cada 'intervalo' milisegundos mientras la ventana está abierta.
+    """
+    columnas = ("Departamento", "Ciudad", "Entidad", "Fecha")
+
+    def __init__(self, master, ejecutor, estadisticas, intervalo=5000):
+        self.ejecutor = ejecutor
+        self.estadisticas = estadisticas    # Función que retorna columna -> [(valor, cantidad)]
+        self.intervalo = intervalo
+        self.id = None
+        self.tw = tk.Toplevel(master)
+        self.tw.title("Estadísticas de participantes")
+        self.tw.configure(background="#E8F6F3")
+        self.tw.geometry("420x420")
+        self.lblTotal = tk.Label(self.tw, text="Cargando...", bg="#E8F6F3", font=("Helvetica", 10, "bold"))
+        self.lblTotal.pack(padx=10, pady=(10, 5), anchor="w")
+        self.pestanas = ttk.Notebook(self.tw)
+        self.pestanas.pack(fill="both", expand=True, padx=10, pady=5)
+        self.tablas = {}
+        for columna in self.columnas:
+            marco = tk.Frame(self.pestanas)
+            tabla = ttk.Treeview(marco, columns=("Cantidad",), selectmode="browse")
+            tabla.heading('#0', text=columna)
+            tabla.heading('Cantidad', text='Participantes')
+            tabla.column('#0', width=260)
+            tabla.column('Cantidad', width=100, anchor='e')
+            barra = ttk.Scrollbar(marco, orient="vertical", command=tabla.yview)
+            tabla.configure(yscrollcommand=barra.set)
+            barra.pack(side="right", fill="y")
+            tabla.pack(side="left", fill="both", expand=True)
+            self.pestanas.add(marco, text=columna)
+            self.tablas[columna] = tabla
+        ttk.Button(self.tw, text="🔄 Actualizar", style="Custom.TButton",
+                   command=self.actualiza).pack(padx=10, pady=(5, 10))
+        self.tw.protocol("WM_DELETE_WINDOW", self.cerrar)
+        self.actualiza()
+
+    def abierta(self):
+        # Indica si la ventana no se ha cerrado.
+        return self.tw is not None and self.tw.winfo_exists()
+
+    def actualiza(self):
+        # Pide los conteos al hilo de la base de datos (una sola consulta vigente) y reprograma la siguiente lectura.
+        if self.id:
+            self.tw.after_cancel(self.id)
+        self.ejecutor.enviar(self.estadisticas, al_terminar=self.muestra, al_fallar=self.falla, clave="estadisticas")
+        self.id = self.tw.after(self.intervalo, self.actualiza)
+
+    def muestra(self, conteos):
+        # Reemplaza el contenido de cada pestaña; solo hay una fila por valor distinto.
+        if not self.abierta():
+            return
+        for columna, tabla in self.tablas.items():
+            tabla.delete(*tabla.get_children())
+            for valor, cantidad in conteos.get(columna, ()):
+                tabla.insert('', 'end', text=valor or "(sin dato)", values=(cantidad,))
+        total = sum(cantidad for _, cantidad in conteos.get("Ciudad", ()))
+        self.lblTotal.config(text=f"Total de participantes: {total}")
+
+    def falla(self, e):
+        # Informa el error en la ventana; se reintenta en la siguiente actualización.
+        if self.abierta():
+            self.lblTotal.config(text=f"No se pudo leer las estadísticas: {e}")
+
+    def cerrar(self):
+        # Detiene la actualización periódica y destruye la ventana.
+        if self.id:
+            self.tw.after_cancel(self.id)
+            self.id = None
+        self.ejecutor.cancelar("estadisticas")
+        self.tw.destroy()
+        self.tw = None
+
 # --------------------------
 # Clase Principal: Participantes
 # --------------------------
 class Participantes:
     # Ruta a la base de datos SQLite
     db_path = r"C:/Users/jorge/OneDrive/Documentos/Proyecto Poo/Participantes.db"
+    # Los siguientes se crean al abrir la primera ventana (ver crea_Servicio), no al importar el módulo
+    # Medición de las sentencias SQL; solo se activa con las variables de entorno de instrumentacion.py
+    monitor_sql = None
     # Instancia del manejador de la base de datos
-    db_handler = DatabaseHandler(db_path)
+    db_handler = None
+    # Hilo escritor único: los registros de todas las ventanas se graban por lotes (ver escritor.py)
+    escritor = None
+    # Caché de departamentos y municipios compartida por todas las ventanas
+    gazetteer = None
+    # Lógica de negocio sin interfaz: registro, consulta, búsqueda, exportación e importación
+    servicio = None
+    # Milisegundos en los que la ventana debe quedar visible y utilizable desde su creación
+    presupuesto_arranque = 300
+    # Milisegundos de pausa en la escritura antes de ejecutar la búsqueda
+    espera_filtro = 250
+    # Número de filas que se leen en cada página del TreeView
+    tamano_pagina = 200
+    # Número de identificaciones sugeridas mientras se escribe el Id
+    max_sugerencias = 8
+    # Carpeta de los respaldos (None: 'respaldos' junto a la base) y cuántos se conservan
+    carpeta_respaldos = None
+    respaldos_conservados = 10
+    # Columnas del TreeView que se ordenan al hacer clic en su encabezado (ver consultas.ORDEN_LISTADO)
+    columnas_orden = {'#0': 'Id', 'Nombre': 'Nombre', 'Entidad': 'Entidad', 'Fecha': 'Fecha', 'Ciudad': 'Ciudad'}
 
     def __init__(self, master=None):
         """
         Constructor de la clase.
         Inicializa la ventana principal, configura la interfaz y crea los componentes de la aplicación.
+        La base de datos no se toca aquí: se prepara después de mostrar la ventana (ver arranque_Diferido).
         """
+        self.inicio_arranque = perf_counter()
+        self.tiempos_arranque = {}  # Etapa del arranque -> milisegundos desde la creación de la ventana
         # Crea la ventana principal o una ventana secundaria
         self.win = tk.Tk() if master is None else tk.Toplevel()
         self.win.title("Conferencia MACSS y la Ingeniería de Requerimientos")
@@ -144,6 +373,14 @@ class Participantes:
                                 validate="key", validatecommand=vcmd)
         self.entryId.grid(column=1, row=0, padx=5, pady=10, sticky="w")
         CreateToolTip(self.entryId, "Ingrese el ID (máximo 15 caracteres, solo números).")
+        # Sugerencias de participantes registrados mientras se escribe el Id (flecha abajo para elegir)
+        self.indice_ids = None      # Índice de Id en memoria (ver prepara_Trabajo y carga_IndiceIds)
+        self.prefijo_sugerido = ""
+        self.sugerencias = ListaSugerencias(self.entryId, self.elige_Sugerencia, self.max_sugerencias)
+        self.entryId.bind("<KeyRelease>", self.sugiere_Ids, add="+")
+        self.entryId.bind("<Down>", self.sugerencias.enfocar)
+        self.entryId.bind("<Escape>", self.sugerencias.ocultar)
+        self.entryId.bind("<FocusOut>", lambda e: self.win.after(100, self.sugerencias.ocultar_sin_foco), add="+")
         
         # Campo Nombre (solo letras)
         self.lblNombre = ttk.Label(self.lblfrm_Datos, text="Nombre", width=12)
@@ -197,9 +434,21 @@ class Participantes:
         self.lblCiudad.grid(column=0, row=7, padx=5, pady=10, sticky="w")
         self.comboCiudad = ttk.Combobox(self.lblfrm_Datos, state="readonly")
         self.comboCiudad.grid(column=1, row=7, padx=5, pady=10, sticky="w")
-        
-        # Carga la lista de departamentos desde la base de datos
-        self.cargar_Nombre_Departamento()
+
+        # Campo Buscar ciudad: busca el municipio en todo el país y llena el departamento y la ciudad
+        self.lblBuscaCiudad = ttk.Label(self.lblfrm_Datos, text="Buscar ciudad")
+        self.lblBuscaCiudad.grid(column=0, row=8, padx=5, pady=10, sticky="w")
+        self.entryBuscaCiudad = tk.Entry(self.lblfrm_Datos, width=30, justify="left", relief="groove")
+        self.entryBuscaCiudad.grid(column=1, row=8, padx=5, pady=10, sticky="w")
+        CreateToolTip(self.entryBuscaCiudad, "Escriba parte del nombre del municipio, con o sin tildes.")
+        self.sugerencias_ciudad = ListaSugerencias(self.entryBuscaCiudad, self.elige_Ciudad, self.max_sugerencias)
+        self.entryBuscaCiudad.bind("<KeyRelease>", self.sugiere_Ciudades)
+        self.entryBuscaCiudad.bind("<Down>", self.sugerencias_ciudad.enfocar)
+        self.entryBuscaCiudad.bind("<Return>", self.elige_Primera_Ciudad)
+        self.entryBuscaCiudad.bind("<Escape>", self.sugerencias_ciudad.ocultar)
+        self.entryBuscaCiudad.bind("<FocusOut>", lambda e: self.win.after(100, self.sugerencias_ciudad.ocultar_sin_foco),
+                                   add="+")
+
         
         # --------------------------
         # Sección del TreeView y búsqueda (lado derecho)
@@ -216,7 +465,8 @@ class Participantes:
         lblBuscar.pack(side="left", padx=5, pady=5)
         self.entryBuscar = tk.Entry(self.search_frame, width=30)
         self.entryBuscar.pack(side="left", padx=5, pady=5)
-        self.entryBuscar.bind("<KeyRelease>", self.filtra_registros)
+        self.entryBuscar.bind("<KeyRelease>", self.programa_Filtro)
+        self.id_filtro = None  # Identificador del filtro programado (debounce)
         
         # Configuración del TreeView para mostrar los registros
         self.style = ttk.Style()
@@ -249,10 +499,23 @@ class Participantes:
         self.treeDatos.heading('Fecha', text='Fecha')
         self.treeDatos.heading('Ciudad', text='Ciudad')
         self.treeDatos.heading('Departamento', text='Departamento')
+        # Clic en un encabezado ordena el listado por esa columna; un segundo clic invierte el orden
+        self.orden = None            # Columna de orden del listado (None: por Id, como al iniciar)
+        self.orden_descendente = False
+        for columna in self.columnas_orden:
+            self.treeDatos.heading(columna, command=lambda c=columna: self.ordena_Listado(c))
         
         # Agrega una barra de desplazamiento vertical al TreeView
         self.scrollbar = ttk.Scrollbar(self.tree_frame, orient='vertical', command=self.treeDatos.yview)
-        self.treeDatos.configure(yscroll=self.scrollbar.set)
+        # El desplazamiento pasa por desplaza_TreeView para cargar más filas al acercarse al final
+        self.treeDatos.configure(yscroll=self.desplaza_TreeView)
+        self.paginador = None        # Paginador del listado actual (None si no hay más filas por cargar)
+        self.id_pagina = None        # Identificador de la carga de página programada
+        self.pagina_en_curso = False # Indica si hay una página leyéndose en el hilo de la base de datos
+        self.total_listado = 0
+        # Participantes cargados en el TreeView, por Id y en el mismo orden (el iid de cada ítem es su Id);
+        # se crea en prepara_Trabajo
+        self.almacen = None
         self.scrollbar.grid(row=1, column=1, sticky="ns")
         
         # --------------------------
@@ -260,7 +523,7 @@ class Participantes:
         # --------------------------
         self.button_frame = tk.Frame(self.win, bg="#E8F6F3")
         self.button_frame.grid(row=1, column=0, sticky="ew", padx=10, pady=10)
-        self.button_frame.grid_columnconfigure((0,1,2,3,4,5), weight=1)
+        self.button_frame.grid_columnconfigure((0,1,2,3,4,5,6,7,8,9), weight=1)
         
         # Configuración de estilos personalizados para los botones
         self.customStyle = ttk.Style()
@@ -319,17 +582,62 @@ class Participantes:
         self.btnExportar.bind("<Enter>", lambda e: e.widget.configure(style="Hover.TButton"))
         self.btnExportar.bind("<Leave>", lambda e: e.widget.configure(style="Custom.TButton"))
         CreateToolTip(self.btnExportar, "Exportar información de participantes a CSV.")
+
+        # Botón Importar: carga masiva de participantes desde un archivo CSV
+        self.btnImportar = ttk.Button(self.button_frame, text="📥 Importar", style="Custom.TButton",
+                                      command=self.import_data)
+        self.btnImportar.grid(row=0, column=6, padx=5, pady=5)
+        self.btnImportar.bind("<Enter>", lambda e: e.widget.configure(style="Hover.TButton"))
+        self.btnImportar.bind("<Leave>", lambda e: e.widget.configure(style="Custom.TButton"))
+        CreateToolTip(self.btnImportar, "Importar participantes desde un archivo CSV.")
+
+        # Botón Deshacer: restaura el último grupo de participantes eliminados
+        self.btnDeshacer = ttk.Button(self.button_frame, text="↩️ Deshacer", style="Custom.TButton",
+                                      command=self.deshace_Eliminacion)
+        self.btnDeshacer.grid(row=0, column=7, padx=5, pady=5)
+        self.btnDeshacer.bind("<Enter>", lambda e: e.widget.configure(style="Hover.TButton"))
+        self.btnDeshacer.bind("<Leave>", lambda e: e.widget.configure(style="Custom.TButton"))
+        CreateToolTip(self.btnDeshacer, "Deshacer la última eliminación (Ctrl+Z).")
+
+        # Botón Estadísticas: participantes por departamento, ciudad, entidad y fecha
+        self.btnEstadisticas = ttk.Button(self.button_frame, text="📊 Estadísticas", style="Custom.TButton",
+                                          command=self.muestra_Estadisticas)
+        self.btnEstadisticas.grid(row=0, column=8, padx=5, pady=5)
+        self.btnEstadisticas.bind("<Enter>", lambda e: e.widget.configure(style="Hover.TButton"))
+        self.btnEstadisticas.bind("<Leave>", lambda e: e.widget.configure(style="Custom.TButton"))
+        CreateToolTip(self.btnEstadisticas, "Ver participantes por departamento, ciudad, entidad y fecha.")
+        self.ventana_estadisticas = None
+
+        # Botón Respaldo: copia verificada de la base sin detener el registro
+        self.btnRespaldo = ttk.Button(self.button_frame, text="🗄️ Respaldo", style="Custom.TButton",
+                                      command=self.respalda_Base)
+        self.btnRespaldo.grid(row=0, column=9, padx=5, pady=5)
+        self.btnRespaldo.bind("<Enter>", lambda e: e.widget.configure(style="Hover.TButton"))
+        self.btnRespaldo.bind("<Leave>", lambda e: e.widget.configure(style="Custom.TButton"))
+        CreateToolTip(self.btnRespaldo, "Crear un respaldo de la base de datos en la carpeta 'respaldos'.")
         
         # Barra de estado para mostrar mensajes y notificaciones al usuario
         self.status_bar = tk.Label(self.win, text="Listo", bd=1, relief=tk.SUNKEN, anchor='w', bg="#E8F6F3")
         self.status_bar.grid(row=2, column=0, sticky="ew", padx=10, pady=(0,5))
+
+        # Hilos de trabajo para la base de datos; se crean en prepara_Trabajo, con la ventana ya dibujada
+        self.ejecutor = None
+        self.ejecutor_largo = None
         
-        # Carga inicial de los registros en el TreeView
-        self.lee_tablaTreeView()
+        # La base de datos, las ciudades y el listado se cargan cuando la ventana ya está dibujada
+        self.win.after_idle(self.arranque_Diferido)
         
         # Atajos de teclado: Ctrl+N para nuevo registro y Ctrl+E para editar
         self.win.bind("<Control-n>", self.nuevo_registro)
         self.win.bind("<Control-e>", self.edita_tablaTreeView)
+        self.win.bind("<Control-z>", self.deshace_Eliminacion)
+        # Grupos de participantes eliminados en esta sesión, para poder deshacer cada eliminación completa
+        self.pila_deshacer = []
+        # Indica si el formulario contiene un participante cargado para edición
+        self.actualiza = False
+
+        # Al cerrar la ventana se liberan las conexiones a la base de datos
+        self.win.protocol("WM_DELETE_WINDOW", self.cerrar)
 
     # --------------------------
     # Métodos para la gestión del formulario y la base de datos
@@ -340,19 +648,165 @@ class Participantes:
         self.entryId.focus_set()  # Coloca el foco en el campo de identificación
         self.status_bar.config(text="Preparado para nuevo registro.")
 
+    @classmethod
+    def crea_Servicio(cls):
+        """
+        Crea, la primera vez, el manejador de la base de datos, el gazetteer y el servicio compartidos
+        por todas las ventanas. Sus módulos se importan aquí para no retrasar la aparición de la ventana.
+        """
+        if cls.servicio is None:
+            from db_handler import DatabaseHandler
+            from escritor import EscritorAgrupado
+            from gazetteer import Gazetteer
+            from instrumentacion import monitor_desde_entorno
+            from nucleo import ServicioParticipantes
+            cls.monitor_sql = monitor_desde_entorno()
+            cls.db_handler = DatabaseHandler(cls.db_path, monitor=cls.monitor_sql)
+            cls.gazetteer = Gazetteer(cls.db_handler)
+            # Las recargas de ciudades se notan en un hilo aparte: las consultas de la interfaz solo leen memoria
+            cls.gazetteer.iniciar_verificacion()
+            cls.escritor = EscritorAgrupado(cls.db_handler)
+            cls.servicio = ServicioParticipantes(cls.db_handler, cls.gazetteer, cls.escritor)
+        return cls.servicio
+
+    def arranque_Diferido(self):
+        """
+        Segunda etapa del arranque, con la ventana ya construida: la dibuja, registra cuánto tardó
+        en estar disponible y prepara la base de datos en el hilo de trabajo.
+        """
+        self.win.update_idletasks()
+        self.marca_Arranque("ventana")
+        self.status_bar.config(text="Cargando datos...")
+        self.prepara_Trabajo()
+        self.prepara_BaseDatos()
+
+    def prepara_Trabajo(self):
+        """
+        Crea los hilos de trabajo, el almacén del listado y el índice de Id. Sus módulos se importan
+        aquí, y no al importar Proyecto_poo, para que la ventana aparezca antes.
+        """
+        from ejecutor import EjecutorBD
+        from indice_ids import IndiceIds
+        from modelo import AlmacenParticipantes
+        # Hilo de trabajo para la base de datos: las consultas no bloquean la interfaz
+        self.ejecutor = EjecutorBD(self.win, al_cambiar_ocupado=self.indica_Ocupado)
+        # Hilo aparte para operaciones largas (exportación), para que no retrasen la captura de datos
+        self.ejecutor_largo = EjecutorBD(self.win)
+        self.almacen = AlmacenParticipantes()
+        self.indice_ids = IndiceIds()   # Se llena al terminar el arranque (ver carga_IndiceIds)
+
+    def marca_Arranque(self, etapa):
+        """
+        Registra los milisegundos transcurridos desde la creación de la ventana hasta la etapa indicada
+        ('ventana', 'ciudades' o 'listado'). Al mostrarse el listado escribe los tiempos en el log
+        y advierte si la ventana superó el presupuesto de arranque.
+        """
+        if etapa in self.tiempos_arranque:
+            return
+        self.tiempos_arranque[etapa] = round((perf_counter() - self.inicio_arranque) * 1000, 1)
+        if etapa != "listado":
+            return
+        logger.info("Arranque (ms): %s", ", ".join(f"{e} {ms}" for e, ms in self.tiempos_arranque.items()))
+        if self.tiempos_arranque.get("ventana", 0) > self.presupuesto_arranque:
+            logger.warning("La ventana tardó %s ms en mostrarse (presupuesto: %s ms).",
+                           self.tiempos_arranque["ventana"], self.presupuesto_arranque)
+
+    def prepara_BaseDatos(self):
+        """
+        Aplica, en el hilo de la base de datos, las migraciones pendientes del esquema (tablas e índices)
+        y carga en memoria la tabla de ciudades. Al terminar llena la lista de departamentos
+        y lee la primera página del listado.
+        """
+        servicio = self.crea_Servicio()
+
+        def carga_Datos_Iniciales(resultado=None):
+            self.marca_Arranque("ciudades")
+            self.cargar_Nombre_Departamento()
+            self.lee_tablaTreeView(al_mostrar=lambda: self.marca_Arranque("listado"))
+            self.carga_IndiceIds()
+
+        def falla(e):
+            mssg.showerror("Error", f"No se pudo actualizar la base de datos. Error: {str(e)}")
+            carga_Datos_Iniciales()
+
+        self.ejecutor.enviar(servicio.preparar, al_terminar=carga_Datos_Iniciales, al_fallar=falla)
+
+    def carga_IndiceIds(self):
+        """
+        Lee en el hilo de la base de datos los Id de todos los participantes y reemplaza con ellos
+        el índice de sugerencias. Las grabaciones y eliminaciones posteriores lo actualizan sin releerlo.
+        """
+        def cargado(indice):
+            self.indice_ids = indice
+            self.prefijo_sugerido = None
+
+        self.ejecutor.enviar(self.servicio.indice_ids, al_terminar=cargado, al_fallar=self.error_Tarea,
+                             clave="indice_ids")
+
+    def sugiere_Ids(self, event=None):
+        """
+        Muestra, después de cada tecla en el campo de identificación, los participantes registrados
+        cuyo Id empieza por lo escrito. Se busca en el índice en memoria, sin consultar la base de datos;
+        el nombre se muestra si el participante está cargado en el listado.
+        """
+        if str(self.entryId.cget("state")) == "readonly":
+            return
+        prefijo = self.entryId.get().strip()
+        if prefijo == self.prefijo_sugerido:
+            return
+        self.prefijo_sugerido = prefijo
+        ids = self.indice_ids.con_prefijo(prefijo, self.max_sugerencias) if prefijo else []
+        sugerencias = []
+        for id_participante in ids:
+            participante = self.almacen.obtener(id_participante)
+            texto = f"{id_participante} - {participante.nombre}" if participante else str(id_participante)
+            sugerencias.append((id_participante, texto))
+        self.sugerencias.mostrar(sugerencias)
+        if ids and ids[0] == int(prefijo):
+            self.status_bar.config(text=f"El Id {prefijo} ya está registrado. Flecha abajo para cargarlo.")
+
+    def elige_Sugerencia(self, id_participante):
+        """
+        Carga en el formulario el participante elegido en las sugerencias.
+        Si está en el listado se toma del almacén en memoria; si no, se lee por Id en el hilo de la base de datos.
+        """
+        participante = self.almacen.obtener(id_participante)
+        if participante is not None:
+            self.carga_Sugerencia(participante)
+            if self.treeDatos.exists(str(id_participante)):
+                self.treeDatos.selection_set(str(id_participante))
+                self.treeDatos.see(str(id_participante))
+            return
+
+        def leido(registro):
+            if registro is None:
+                # Lo eliminaron desde otro puesto: se descarta del índice
+                self.indice_ids.quita([id_participante])
+                self.status_bar.config(text=f"El participante {id_participante} ya no existe.")
+                return
+            from modelo import Participante
+            self.carga_Sugerencia(Participante.desde_fila(registro))
+
+        self.ejecutor.enviar(self.servicio.obtener, id_participante, al_terminar=leido, al_fallar=self.error_Tarea)
+
+    def carga_Sugerencia(self, participante):
+        """
+        Carga un participante en el formulario para editarlo.
+        """
+        self.limpia_Campos()
+        self.llena_Formulario(participante)
+        self.actualiza = True
+        self.status_bar.config(text=f"Participante {participante.id} cargado para edición.")
+
     def cargar_Nombre_Departamento(self):
         """
-        Consulta la base de datos para obtener la lista de departamentos disponibles y los carga en el combobox.
+        Obtiene la lista de departamentos disponibles desde el gazetteer y los carga en el combobox.
         """
-        query = "SELECT DISTINCT Nombre_Departamento FROM t_ciudades ORDER BY Nombre_Departamento"
-        resultados = self.run_Query(query)
-        if resultados is None:
+        departamentos = self.gazetteer.departamentos()
+        if departamentos is None:
             mssg.showerror("Error", "No se pudo cargar la lista de departamentos.")
             self.status_bar.config(text="Error al cargar departamentos.")
             return
-        filas = resultados.fetchall()
-        departamentos = [fila[0] for fila in filas]
-        print("Depuración - Departamentos cargados:", departamentos)
         if not departamentos:
             mssg.showwarning("Información", "No se encontraron departamentos en la base de datos.")
         self.comboDepartamento["values"] = departamentos
@@ -363,23 +817,52 @@ class Participantes:
     def actualiza_ciudades(self, event=None):
         """
         Actualiza el combobox de ciudades basado en el departamento seleccionado.
-        Ejecuta una consulta SQL para obtener las ciudades correspondientes.
+        Las ciudades se obtienen del gazetteer en memoria, sin consultar la base de datos.
         """
         departamento_seleccionado = self.comboDepartamento.get()
-        print("Departamento seleccionado:", departamento_seleccionado)
-        query = "SELECT Nombre_Ciudad FROM t_ciudades WHERE Nombre_Departamento = ? ORDER BY Nombre_Ciudad"
-        resultados = self.run_Query(query, (departamento_seleccionado,))
-        if resultados is None:
+        ciudades = self.gazetteer.ciudades(departamento_seleccionado)
+        if ciudades is None:
             mssg.showerror("Error", "No se pudo cargar las ciudades.")
             self.status_bar.config(text="Error al cargar ciudades.")
             return
-        filas = resultados.fetchall()
-        ciudades = [fila[0] for fila in filas]
         if not ciudades:
             mssg.showwarning("Información", "No se encontraron ciudades para el departamento seleccionado.")
         self.comboCiudad["values"] = ciudades
         self.comboCiudad.set("")
 
+    def sugiere_Ciudades(self, event=None):
+        """
+        Muestra, después de cada tecla en Buscar ciudad, los municipios cuyo nombre o alguna de sus palabras
+        empieza por lo escrito, sin distinguir tildes ni mayúsculas (índice del gazetteer en memoria).
+        """
+        if event is not None and event.keysym in ("Down", "Up", "Return", "Escape", "Tab"):
+            return
+        if self.gazetteer is None:
+            return
+        encontradas = self.gazetteer.busca_ciudades(self.entryBuscaCiudad.get(), self.max_sugerencias) or []
+        self.sugerencias_ciudad.mostrar([((ciudad, departamento), f"{ciudad} ({departamento})")
+                                         for ciudad, departamento in encontradas])
+
+    def elige_Primera_Ciudad(self, event=None):
+        """
+        Elige con Enter la primera sugerencia de Buscar ciudad.
+        """
+        if self.sugerencias_ciudad.valores:
+            self.elige_Ciudad(self.sugerencias_ciudad.valores[0])
+            self.sugerencias_ciudad.ocultar()
+        return "break"
+
+    def elige_Ciudad(self, valor):
+        """
+        Llena los combobox de departamento y ciudad con el municipio elegido en Buscar ciudad.
+        """
+        ciudad, departamento = valor
+        self.comboDepartamento.set(departamento)
+        self.actualiza_ciudades()
+        self.comboCiudad.set(ciudad)
+        self.entryBuscaCiudad.delete(0, 'end')
+        self.status_bar.config(text=f"Ciudad seleccionada: {ciudad} ({departamento}).")
+
     def valida(self):
         """
         Verifica que el campo de identificación no esté vacío.
@@ -393,149 +876,312 @@ class Participantes:
         """
         self.win.mainloop()
 
+    def cerrar(self):
+        """
+        Detiene el hilo de trabajo, cierra las conexiones a la base de datos y destruye la ventana.
+        """
+        if self.ejecutor is not None:
+            self.ejecutor.cerrar()
+            self.ejecutor_largo.cerrar()
+        # El escritor es compartido: solo la ventana principal lo detiene, después de grabar lo encolado
+        if self.escritor is not None and isinstance(self.win, tk.Tk):
+            self.escritor.cerrar()
+            self.gazetteer.detener_verificacion()
+        if self.db_handler is not None:
+            self.db_handler.close()
+        if self.monitor_sql is not None:
+            try:
+                self.monitor_sql.registrar_en_log()
+                self.monitor_sql.exportar_json()
+            except OSError as e:
+                logger.error("No se pudo guardar las estadísticas SQL: %s", e)
+        self.win.destroy()
+
+    def indica_Ocupado(self, ocupado):
+        """
+        Muestra u oculta el indicador de trabajo mientras hay consultas en el hilo de la base de datos.
+        """
+        if ocupado:
+            self.win.config(cursor="watch")
+            self.status_bar.config(text="Procesando...")
+        else:
+            self.win.config(cursor="")
+
+    def error_Tarea(self, error):
+        """
+        Informa al usuario de un error ocurrido en el hilo de la base de datos.
+        """
+        self.status_bar.config(text="Error al acceder a la base de datos.")
+        mssg.showerror("Error", f"No se pudo completar la operación. Error: {str(error)}")
+
     def validar_identificacion(self, nuevo_valor):
         """
-        Valida el campo de identificación:
+        Valida el campo de identificación con la regla 'Id' del esquema (ver validaciones.py):
          - Permite solo dígitos.
          - Máximo 15 caracteres.
          - Resalta el campo en verde si es correcto, rojo si hay error.
         """
-        if nuevo_valor == "":
+        from validaciones import ESQUEMA, acepta_escritura
+        if acepta_escritura("Id", nuevo_valor):
             self.entryId.config(highlightthickness=1, highlightbackground="green", highlightcolor="green")
             return True
-        if not nuevo_valor.isdigit():
-            self.entryId.config(highlightthickness=1, highlightbackground="red", highlightcolor="red")
-            return False
-        if len(nuevo_valor) > 15:
+        if len(nuevo_valor) > ESQUEMA["Id"].longitud_maxima:
             mssg.showwarning("Advertencia", "La identificación no puede exceder 15 caracteres. Se han eliminado los caracteres adicionales.")
-            self.entryId.config(highlightthickness=1, highlightbackground="red", highlightcolor="red")
-            return False
-        self.entryId.config(highlightthickness=1, highlightbackground="green", highlightcolor="green")
-        return True
+        self.entryId.config(highlightthickness=1, highlightbackground="red", highlightcolor="red")
+        return False
 
     def validar_numeros(self, nuevo_valor):
         """
-        Valida que el valor ingresado contenga únicamente dígitos.
+        Valida que el celular ingresado contenga únicamente dígitos (regla 'Celular' del esquema).
         """
-        if nuevo_valor == "":
-            return True
-        return nuevo_valor.isdigit()
+        from validaciones import acepta_escritura
+        return acepta_escritura("Celular", nuevo_valor)
 
     def validar_nombre(self, nuevo_valor):
         """
-        Valida que el nombre contenga solo letras, espacios, acentos y la letra ñ.
-        Se utiliza una expresión regular para la validación.
+        Valida que el nombre contenga solo letras, espacios, acentos y la letra ñ (regla 'Nombre' del esquema).
         """
-        if nuevo_valor == "":
-            return True
-        patron = r'^[A-Za-zÁÉÍÓÚáéíóúÑñ\s]+$'
-        return re.fullmatch(patron, nuevo_valor) is not None
+        from validaciones import acepta_escritura
+        return acepta_escritura("Nombre", nuevo_valor)
 
     def valida_Fecha(self, event=None):
         """
         Valida que la fecha ingresada esté en formato dd/mm/aaaa y no sea anterior a la fecha actual.
         Si la fecha es inválida, muestra un mensaje de error y limpia el campo.
         """
+        from validaciones import convierte_fecha, error_campo
         date_str = self.entryFecha.get().strip()
-        if date_str == "":
+        error = error_campo("Fecha", date_str)
+        if error is None:
             return
-        try:
-            dt = datetime.strptime(date_str, "%d/%m/%Y")
-        except ValueError:
-            mssg.showerror("Error de Fecha", "Ingrese una fecha válida en formato dd/mm/aaaa.")
-            self.entryFecha.delete(0, "end")
+        mssg.showerror("Error de Fecha", error)
+        self.entryFecha.delete(0, "end")
+        if convierte_fecha(date_str) is None:
             self.status_bar.config(text="Error: fecha inválida.")
-            return "break"
-        
-        today = datetime.today().date()
-        if dt.date() < today:
-            mssg.showerror("Error de Fecha", "La fecha no puede ser en el pasado.")
-            self.entryFecha.delete(0, "end")
+        else:
             self.status_bar.config(text="Error: la fecha es anterior a hoy.")
-            return "break"
+        return "break"
 
-    def lee_tablaTreeView(self):
+    def lee_tablaTreeView(self, al_mostrar=None):
+        """
+        Carga los registros de la base de datos en el TreeView sin aplicar filtros.
+        Solo se lee la primera página; las siguientes se cargan al desplazarse hacia abajo.
         """
-        Carga todos los registros de la base de datos en el TreeView sin aplicar filtros.
+        self.inicia_Listado(self.servicio.paginador(tamano_pagina=self.tamano_pagina, orden=self.orden,
+                                                    descendente=self.orden_descendente),
+                            "Error al leer la base de datos.", al_mostrar=al_mostrar)
+
+    def inicia_Listado(self, paginador, mensaje_error, mensaje=None, al_mostrar=None):
         """
-        # Elimina todos los registros actuales del TreeView
-        for linea in self.treeDatos.get_children():
-            self.treeDatos.delete(linea)
-        query = """SELECT p.Id, p.Nombre, p."Dirección", p.Celular, p.Entidad, p.Fecha, p.Ciudad,
-                          (SELECT Nombre_Departamento FROM t_ciudades WHERE Nombre_Ciudad = p.Ciudad LIMIT 1) AS Departamento
-                   FROM t_participantes p
-                   ORDER BY p.Id DESC"""
-        db_rows = self.run_Query(query)
-        if db_rows is None:
-            self.status_bar.config(text="Error al leer la base de datos.")
+        Lee en el hilo de la base de datos el total y la primera página del paginador indicado,
+        y luego reemplaza con ella el contenido del TreeView; después llama a al_mostrar(), si se indica.
+        Un listado nuevo cancela al anterior si este aún no había terminado (por ejemplo, una búsqueda vieja).
+        """
+        if self.id_pagina:
+            self.win.after_cancel(self.id_pagina)
+            self.id_pagina = None
+        self.paginador = paginador
+        self.pagina_en_curso = False
+
+        def lee_primera_pagina():
+            total = paginador.total()
+            return total, (paginador.siguiente_pagina() if total is not None else None)
+
+        def muestra_primera_pagina(resultado):
+            total, db_rows = resultado
+            if paginador is not self.paginador:
+                return
+            if db_rows is None:
+                self.paginador = None
+                self.status_bar.config(text=mensaje_error)
+                return
+            # El almacén cambia de orden solo ahora: mientras llega la página sigue mostrando el listado anterior
+            self.treeDatos.delete(*self.treeDatos.get_children())
+            self.almacen.ordena(paginador.clave if paginador.orden else None, paginador.descendente)
+            self.total_listado = total
+            self.inserta_Filas(db_rows)
+            if mensaje:
+                self.status_bar.config(text=mensaje.format(total=total))
+            if al_mostrar:
+                al_mostrar()
+
+        self.ejecutor.enviar(lee_primera_pagina, al_terminar=muestra_primera_pagina,
+                             al_fallar=self.error_Tarea, clave="listado")
+
+    def carga_Pagina(self):
+        """
+        Lee en el hilo de la base de datos la siguiente página del listado actual y la agrega al final del TreeView.
+        """
+        self.id_pagina = None
+        paginador = self.paginador
+        if paginador is None or paginador.agotado or self.pagina_en_curso:
+            return
+        self.pagina_en_curso = True
+
+        def muestra_pagina(db_rows):
+            if paginador is not self.paginador:
+                return
+            self.pagina_en_curso = False
+            if db_rows is None:
+                self.status_bar.config(text="Error al leer la base de datos.")
+                return
+            self.inserta_Filas(db_rows)
+
+        self.ejecutor.enviar(paginador.siguiente_pagina, al_terminar=muestra_pagina,
+                             al_fallar=self.error_Tarea, clave="listado")
+
+    def inserta_Filas(self, db_rows):
+        """
+        Agrega filas al final del TreeView y actualiza el conteo en la barra de estado.
+        Cada ítem usa el Id del participante como identificador, para poder ubicarlo sin recorrer la tabla.
+        """
+        for participante in self.almacen.agrega_filas(db_rows):
+            self.treeDatos.insert('', 'end', iid=str(participante.id), text=participante.id,
+                                  values=self.valores_Fila(participante))
+        self.muestra_Conteo()
+
+    def muestra_Conteo(self):
+        """
+        Muestra en la barra de estado cuántas filas hay cargadas en el TreeView y el total del listado.
+        """
+        self.status_bar.config(text=f"Mostrando {len(self.almacen)} de {self.total_listado} registros.")
+
+    def actualiza_Fila(self, row, visible=True):
+        """
+        Refleja en el TreeView un registro insertado o actualizado, sin recargar el listado.
+        - Si el ítem ya está en el TreeView se actualizan sus valores (o se quita si dejó de coincidir con el filtro).
+        - Si es nuevo se inserta en la posición que le corresponde en el orden del listado, siempre que esa zona
+          ya esté cargada; si no, aparecerá al cargar la página correspondiente.
+        """
+        id_participante = row[0]
+        iid = str(id_participante)
+        if self.treeDatos.exists(iid):
+            if not visible:
+                self.quita_Fila(id_participante)
+            elif self.paginador is not None and not self.paginador.cargada(row):
+                # El cambio lo llevó a una parte del orden aún no leída: aparecerá con su página
+                self.quita_Fila(id_participante)
+                self.total_listado += 1
+                self.muestra_Conteo()
+            else:
+                participante, posicion = self.almacen.reemplaza(row)
+                self.treeDatos.item(iid, text=id_participante, values=self.valores_Fila(participante))
+                if posicion is not None:
+                    self.treeDatos.move(iid, '', posicion)
+            return
+        if not visible or self.paginador is None:
+            return
+        self.total_listado += 1
+        if self.paginador.cargada(row):
+            participante, posicion = self.almacen.inserta(row)
+            self.treeDatos.insert('', posicion, iid=iid, text=id_participante,
+                                  values=self.valores_Fila(participante))
+        self.muestra_Conteo()
+
+    def quita_Fila(self, id_participante):
+        """
+        Quita del TreeView el ítem del participante indicado, si está cargado.
+        """
+        self.quita_Filas([id_participante])
+
+    def quita_Filas(self, ids):
+        """
+        Quita del TreeView, en una sola pasada, los ítems de los participantes indicados que estén cargados.
+        """
+        iids = [str(i) for i in ids if self.treeDatos.exists(str(i))]
+        if not iids:
             return
-        # Inserta cada registro en el TreeView
-        for row in db_rows:
-            self.treeDatos.insert('', 0, text=row[0],
-                                  values=[row[1], row[2], row[3], row[4], row[5], row[6], row[7]])
-        self.status_bar.config(text="Registros cargados.")
+        self.treeDatos.delete(*iids)
+        self.almacen.quita(ids)
+        self.total_listado = max(self.total_listado - len(iids), 0)
+
+    def desplaza_TreeView(self, primero, ultimo):
+        """
+        Actualiza la barra de desplazamiento y, cuando la vista se acerca al final de las filas cargadas,
+        programa la carga de la siguiente página.
+        """
+        self.scrollbar.set(primero, ultimo)
+        if (float(ultimo) >= 0.9 and self.paginador is not None and not self.paginador.agotado
+                and self.id_pagina is None and not self.pagina_en_curso):
+            self.id_pagina = self.win.after_idle(self.carga_Pagina)
+
+    def valores_Fila(self, p):
+        """
+        Retorna los valores de las columnas del TreeView para un participante (ver modelo.py),
+        agregando el departamento de su ciudad desde el gazetteer.
+        """
+        return (p.nombre, p.direccion, p.celular, p.entidad, p.fecha, p.ciudad, self.gazetteer.departamento_de(p.ciudad))
+
+    def programa_Filtro(self, event=None):
+        """
+        Programa el filtrado después de una pausa en la escritura (debounce),
+        de modo que al escribir rápido se ejecute una sola consulta y no una por tecla.
+        """
+        if self.id_filtro:
+            self.win.after_cancel(self.id_filtro)
+        self.id_filtro = self.win.after(self.espera_filtro, self.filtra_registros)
 
     def filtra_registros(self, event=None):
         """
         Filtra dinámicamente los registros del TreeView en función del texto ingresado en el campo de búsqueda.
+        Usa el índice de texto completo: cada palabra se busca como prefijo, sin distinguir tildes ni mayúsculas.
         """
+        self.id_filtro = None
         filtro = self.entryBuscar.get().strip()
-        # Elimina registros actuales del TreeView
-        for linea in self.treeDatos.get_children():
-            self.treeDatos.delete(linea)
-        query = """SELECT p.Id, p.Nombre, p."Dirección", p.Celular, p.Entidad, p.Fecha, p.Ciudad,
-                      (SELECT Nombre_Departamento FROM t_ciudades WHERE Nombre_Ciudad = p.Ciudad LIMIT 1) AS Departamento
-               FROM t_participantes p"""
-        parametros = ()
-        # Si se ingresa un filtro, se modifica la consulta para buscar coincidencias en varios campos
-        if filtro:
-            query += """ WHERE 
-                        p.Id LIKE ? OR 
-                        p.Nombre LIKE ? OR 
-                        p."Dirección" LIKE ? OR 
-                        p.Celular LIKE ? OR 
-                        p.Entidad LIKE ? OR 
-                        p.Fecha LIKE ? OR 
-                        p.Ciudad LIKE ?"""
-            filtro_param = f"%{filtro}%"
-            parametros = (filtro_param,) * 7
-        query += " ORDER BY p.Id DESC"
-    
-        db_rows = self.run_Query(query, parametros)
-        if db_rows is None:
-            self.status_bar.config(text="Error al aplicar filtro.")
-            return
-        # Inserta los registros filtrados en el TreeView
-        for row in db_rows:
-            self.treeDatos.insert('', 0, text=row[0],
-                                  values=[row[1], row[2], row[3], row[4], row[5], row[6], row[7]])
-        self.status_bar.config(text=f"Filtro aplicado: '{filtro}'" if filtro else "Mostrando todos los registros.")
+        # Si se ingresa un filtro, se usa la búsqueda de texto completo sobre todos los campos
+        paginador = self.servicio.paginador(filtro, self.tamano_pagina, orden=self.orden,
+                                            descendente=self.orden_descendente)
+        mensaje = f"Filtro aplicado: '{filtro}' ({{total}} coincidencias)." if paginador.expresion else None
+        self.inicia_Listado(paginador, "Error al aplicar filtro.", mensaje)
+
+    def ordena_Listado(self, columna):
+        """
+        Ordena el listado (con el filtro actual) por la columna del encabezado pulsado, en orden alfabético
+        español. La base de datos entrega cada página ya ordenada usando un índice, por lo que solo
+        se lee y se dibuja la primera página; un segundo clic en la misma columna invierte el orden.
+        """
+        if self.servicio is None:
+            return
+        orden = self.columnas_orden[columna]
+        self.orden_descendente = not self.orden_descendente if orden == self.orden else False
+        self.orden = orden
+        for encabezado, nombre in self.columnas_orden.items():
+            flecha = (" ▼" if self.orden_descendente else " ▲") if nombre == orden else ""
+            self.treeDatos.heading(encabezado, text=nombre + flecha)
+        self.filtra_registros()
 
     def carga_Datos(self):
         """
         Carga los datos del registro seleccionado en el TreeView hacia los campos del formulario para permitir su edición.
+        Los datos se toman del almacén en memoria por Id, con sus valores originales
+        (los valores del TreeView pasan por Tk y, por ejemplo, pierden los ceros iniciales del celular).
         """
         selected_item = self.treeDatos.selection()[0]
-        item_data = self.treeDatos.item(selected_item)
-        valores = item_data['values']
-        # Habilita el campo de identificación y lo carga con el valor del registro seleccionado
+        self.llena_Formulario(self.almacen.obtener(int(selected_item)))
+
+    def llena_Formulario(self, p):
+        """
+        Carga un participante (ver modelo.py) en los campos del formulario, con la identificación de solo lectura.
+        """
+        # Habilita el campo de identificación y lo carga con el valor del registro
         self.entryId.configure(state='normal')
         self.entryId.delete(0, 'end')
-        self.entryId.insert(0, item_data['text'])
+        self.entryId.insert(0, p.id)
         self.entryId.configure(state='readonly')
         # Carga cada uno de los campos del formulario con los datos del registro
         self.entryNombre.delete(0, 'end')
-        self.entryNombre.insert(0, valores[0])
+        self.entryNombre.insert(0, p.nombre)
         self.entryDireccion.delete(0, 'end')
-        self.entryDireccion.insert(0, valores[1])
+        self.entryDireccion.insert(0, p.direccion)
+        self.entryDireccion.config(foreground="black")
         self.entryCelular.delete(0, 'end')
-        self.entryCelular.insert(0, valores[2])
+        self.entryCelular.insert(0, p.celular)
         self.entryEntidad.delete(0, 'end')
-        self.entryEntidad.insert(0, valores[3])
+        self.entryEntidad.insert(0, p.entidad)
         self.entryFecha.delete(0, 'end')
-        self.entryFecha.insert(0, valores[4])
-        self.comboCiudad.set(valores[5])
-        self.comboDepartamento.set(valores[6])
+        self.entryFecha.insert(0, p.fecha)
+        self.comboCiudad.set(p.ciudad)
+        self.comboDepartamento.set(self.gazetteer.departamento_de(p.ciudad))
 
     def limpia_Campos(self):
         """
@@ -554,21 +1200,20 @@ class Participantes:
         self.entryFecha.delete(0, 'end')
         self.comboDepartamento.set("")
         self.comboCiudad.set("")
+        self.entryBuscaCiudad.delete(0, 'end')
+        self.actualiza = False
+        self.prefijo_sugerido = ""
+        self.sugerencias.ocultar()
+        self.sugerencias_ciudad.ocultar()
         self.status_bar.config(text="Campos limpiados.")
 
-    def run_Query(self, query, parametros=()):
-        """
-        Ejecuta una consulta SQL utilizando el manejador de base de datos.
-        Imprime la consulta en consola para facilitar la depuración.
-        """
-        print("Ejecutando consulta:", query)
-        return self.db_handler.execute_query(query, parametros)
-    
     def adiciona_Registro(self, event=None):
         """
         Inserta o actualiza un registro en la base de datos.
-        - Verifica si el registro ya existe (según el ID).
-        - Si existe, pregunta si se desea actualizar; de lo contrario, inserta un nuevo registro.
+        - Si el formulario tiene un participante cargado para edición, actualiza sus datos.
+        - Si no, agrega el registro; si el ID ya existe, pregunta si se desea actualizar.
+        Los datos se validan con las mismas reglas de la importación y del servicio HTTP (ServicioParticipantes.validar).
+        Cada grabación es una sola sentencia (INSERT ... ON CONFLICT) en el hilo de la base de datos.
         """
         id_participante = self.entryId.get().strip()
         if not self.valida():
@@ -580,49 +1225,76 @@ class Participantes:
             mssg.showerror("Error", "Debe seleccionar una ciudad")
             self.status_bar.config(text="Error: ciudad no seleccionada.")
             return
-        # Verifica si ya existe un registro con el mismo ID
-        query_check = "SELECT COUNT(*) FROM t_participantes WHERE Id = ?"
-        resultado = self.run_Query(query_check, (id_participante,))
-        if resultado is None:
-            self.status_bar.config(text="Error al verificar existencia.")
+        try:
+            datos = self.servicio.validar({"Id": id_participante, "Nombre": self.entryNombre.get(),
+                                           "Dirección": self.entryDireccion.get(), "Celular": self.entryCelular.get(),
+                                           "Entidad": self.entryEntidad.get(), "Fecha": self.entryFecha.get(),
+                                           "Ciudad": ciudad_seleccionada,
+                                           "Departamento": self.comboDepartamento.get()})
+        except ValueError as e:
+            # nucleo.ErrorValidacion, con el motivo del primer campo inválido
+            mssg.showerror("Error", str(e))
+            self.status_bar.config(text="Error: datos inválidos.")
             return
-        existe = resultado.fetchone()[0] > 0
 
-        if existe:
-            # Si el registro ya existe, solicita confirmación para actualizarlo
-            confirmacion = mssg.askyesno("Confirmación", "Este participante ya existe. ¿Desea actualizar sus datos?")
+        if self.actualiza:
+            confirmacion = mssg.askyesno("Confirmación", "¿Desea actualizar los datos de este participante?")
             if not confirmacion:
                 self.status_bar.config(text="Actualización cancelada.")
                 return
-            query = '''UPDATE t_participantes 
-                       SET Nombre = ?, "Dirección" = ?, Celular = ?, Entidad = ?, Fecha = ?, Ciudad = ? 
-                       WHERE Id = ?'''
-            parametros = (self.entryNombre.get(), self.entryDireccion.get(),
-                          self.entryCelular.get(), self.entryEntidad.get(), 
-                          self.entryFecha.get(), ciudad_seleccionada, id_participante)
-            self.run_Query(query, parametros)
-            mssg.showinfo('Éxito', 'Registro actualizado con éxito')
-            self.entryId.configure(state='readonly')
-            self.status_bar.config(text="Registro actualizado con éxito.")
         else:
-            # Si el registro no existe, solicita confirmación para agregarlo
             confirmacion = mssg.askyesno("Confirmación", "¿Desea agregar este nuevo registro?")
             if not confirmacion:
                 self.status_bar.config(text="Operación de grabación cancelada.")
                 return
-            query = '''INSERT INTO t_participantes 
-                       (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
-                       VALUES (?, ?, ?, ?, ?, ?, ?)'''
-            parametros = (id_participante, self.entryNombre.get(), 
-                          self.entryDireccion.get(), self.entryCelular.get(), 
-                          self.entryEntidad.get(), self.entryFecha.get(), ciudad_seleccionada)
-            self.run_Query(query, parametros)
-            mssg.showinfo('Éxito', f'Registro {id_participante} agregado')
+        self.graba_Registro(datos, sobrescribir=self.actualiza)
+
+    def graba_Registro(self, datos, sobrescribir):
+        """
+        Envía la grabación al hilo de la base de datos.
+        Con sobrescribir=False no se modifica un participante existente (ver registro_Grabado).
+        """
+        expresion = self.paginador.expresion if self.paginador is not None else None
+
+        def graba():
+            fila, creado = self.servicio.guardar(datos, sobrescribir=sobrescribir)
+            visible = True
+            if fila is not None and expresion:
+                visible = self.servicio.coincide(expresion, fila[0])
+            return fila, creado, visible
+
+        def falla(e):
+            self.status_bar.config(text="Error al grabar el registro.")
+            mssg.showerror("Error", f"No se pudo grabar el registro. Error: {str(e)}")
+
+        self.ejecutor.enviar(graba, al_terminar=lambda resultado: self.registro_Grabado(datos, resultado),
+                             al_fallar=falla)
+
+    def registro_Grabado(self, datos, resultado):
+        """
+        Informa el resultado de la grabación, limpia los campos y actualiza solo la fila afectada del TreeView.
+        Si se intentó agregar un ID que ya existía, pregunta si se desea actualizarlo.
+        """
+        fila, creado, visible = resultado
+        if fila is None:
+            # El participante ya existía y no se modificó
+            confirmacion = mssg.askyesno("Confirmación", "Este participante ya existe. ¿Desea actualizar sus datos?")
+            if confirmacion:
+                self.graba_Registro(datos, sobrescribir=True)
+            else:
+                self.status_bar.config(text="Actualización cancelada.")
+            return
+        if creado:
+            self.indice_ids.agrega(fila[0])
+            mssg.showinfo('Éxito', f'Registro {fila[0]} agregado')
             self.status_bar.config(text="Registro agregado exitosamente.")
+        else:
+            mssg.showinfo('Éxito', 'Registro actualizado con éxito')
+            self.status_bar.config(text="Registro actualizado con éxito.")
 
-        # Después de insertar o actualizar, se limpian los campos y se actualiza el TreeView
+        # Después de insertar o actualizar, se limpian los campos y se actualiza la fila en el TreeView
         self.limpia_Campos()
-        self.lee_tablaTreeView()
+        self.actualiza_Fila(fila, visible)
 
     def edita_tablaTreeView(self, event=None):
         """
@@ -649,18 +1321,55 @@ class Participantes:
             self.status_bar.config(text="Error: no se seleccionó ningún participante.")
             return
         confirmacion = mssg.askyesno("Confirmación", "¿Está seguro de que desea eliminar los participantes seleccionados?")
-        if confirmacion:
-            try:
-                for item in seleccionados:
-                    id_participante = self.treeDatos.item(item)['text']
-                    query = "DELETE FROM t_participantes WHERE Id = ?"
-                    self.run_Query(query, (id_participante,))
-                    self.treeDatos.delete(item)
-                mssg.showinfo("Éxito", "Participante(s) eliminado(s) correctamente.")
-                self.status_bar.config(text="Participante(s) eliminado(s) correctamente.")
-            except Exception as e:
-                mssg.showerror("Error", f"No se pudo eliminar el/los participante(s). Error: {str(e)}")
-                self.status_bar.config(text="Error al eliminar participantes.")
+        if not confirmacion:
+            return
+        # El iid de cada ítem es el Id del participante
+        ids = [int(item) for item in seleccionados]
+
+        def eliminados(filas):
+            self.indice_ids.quita(ids)
+            self.pila_deshacer.append(filas)
+            self.quita_Filas(ids)
+            self.muestra_Conteo()
+            mssg.showinfo("Éxito", f"{len(filas)} participante(s) eliminado(s) correctamente.")
+            self.status_bar.config(text=f"{len(filas)} participante(s) eliminado(s). Ctrl+Z para deshacer.")
+
+        def falla(e):
+            mssg.showerror("Error", f"No se pudo eliminar el/los participante(s). Error: {str(e)}")
+            self.status_bar.config(text="Error al eliminar participantes. No se eliminó ninguno.")
+
+        # El servicio retorna las filas eliminadas para poder deshacer
+        self.ejecutor.enviar(self.servicio.eliminar, ids, al_terminar=eliminados, al_fallar=falla)
+
+    def deshace_Eliminacion(self, event=None):
+        """
+        Restaura en una sola transacción el último grupo de participantes eliminados en esta sesión.
+        """
+        if not self.pila_deshacer:
+            self.status_bar.config(text="No hay eliminaciones para deshacer.")
+            return
+        filas = self.pila_deshacer.pop()
+        expresion = self.paginador.expresion if self.paginador is not None else None
+
+        def restaura():
+            self.servicio.restaurar(filas)
+            if not expresion:
+                return None
+            return self.servicio.coincidencias(expresion, [row[0] for row in filas])
+
+        def restaurados(coinciden):
+            for row in filas:
+                self.indice_ids.agrega(row[0])
+                self.actualiza_Fila(row, coinciden is None or row[0] in coinciden)
+            self.status_bar.config(text=f"{len(filas)} participante(s) restaurado(s).")
+
+        def falla(e):
+            # Si no se pudo restaurar (por ejemplo, un Id se volvió a registrar), el grupo sigue disponible
+            self.pila_deshacer.append(filas)
+            mssg.showerror("Error", f"No se pudo deshacer la eliminación. Error: {str(e)}")
+            self.status_bar.config(text="Error al deshacer la eliminación.")
+
+        self.ejecutor.enviar(restaura, al_terminar=restaurados, al_fallar=falla)
 
     def consulta_Registro(self):
         """
@@ -672,86 +1381,149 @@ class Participantes:
             mssg.showerror("Error", "Debe ingresar el Id o NIT del participante para consultar.")
             self.status_bar.config(text="Error: no se ingresó Id para consultar.")
             return
-        query = """SELECT p.Id, p.Nombre, p."Dirección", p.Celular, p.Entidad, p.Fecha, p.Ciudad,
-                          (SELECT Nombre_Departamento FROM t_ciudades WHERE Nombre_Ciudad = p.Ciudad LIMIT 1) AS Departamento
-                   FROM t_participantes p
-                   WHERE p.Id = ?"""
-        resultado = self.run_Query(query, (id_participante,))
-        if resultado is None:
-            self.status_bar.config(text="Error en la consulta.")
+        if not id_participante.isdigit():
+            mssg.showerror("Error", "El Id o NIT debe ser numérico.")
+            self.status_bar.config(text="Error: Id no numérico.")
+            return
+        # Si el participante está cargado en el listado no hace falta consultarlo
+        participante = self.almacen.obtener(int(id_participante))
+        if participante is not None:
+            self.ejecutor.cancelar("listado")
+            self.muestra_Consulta(participante.como_fila())
             return
-        registro = resultado.fetchone()
+        self.ejecutor.enviar(self.servicio.obtener, int(id_participante),
+                             al_terminar=self.muestra_Consulta, al_fallar=self.error_Tarea, clave="listado")
+
+    def muestra_Consulta(self, registro):
+        """
+        Muestra en el TreeView y en el formulario el registro obtenido por consulta_Registro (None si no existe).
+        """
         # Limpia el TreeView para mostrar solo el registro consultado
-        for linea in self.treeDatos.get_children():
-            self.treeDatos.delete(linea)
+        self.paginador = None
+        self.treeDatos.delete(*self.treeDatos.get_children())
+        self.almacen.limpia()
         if registro:
-            self.treeDatos.insert('', 0, text=registro[0],
-                                  values=[registro[1], registro[2], registro[3], registro[4],
-                                          registro[5], registro[6], registro[7]])
+            participante = self.almacen.agrega_filas([registro])[0]
+            self.treeDatos.insert('', 0, iid=str(participante.id), text=participante.id,
+                                  values=self.valores_Fila(participante))
             # Carga los datos en el formulario
-            self.entryId.configure(state='normal')
-            self.entryId.delete(0, 'end')
-            self.entryId.insert(0, registro[0])
-            self.entryId.configure(state='readonly')
-            self.entryNombre.delete(0, 'end')
-            self.entryNombre.insert(0, registro[1])
-            self.entryDireccion.delete(0, 'end')
-            self.entryDireccion.insert(0, registro[2])
-            self.entryCelular.delete(0, 'end')
-            self.entryCelular.insert(0, registro[3])
-            self.entryEntidad.delete(0, 'end')
-            self.entryEntidad.insert(0, registro[4])
-            self.entryFecha.delete(0, 'end')
-            self.entryFecha.insert(0, registro[5])
-            self.comboCiudad.set(registro[6])
-            if registro[7]:
-                self.comboDepartamento.set(registro[7])
-            else:
-                # Si no se obtiene el departamento, se consulta a la tabla t_ciudades
-                dep_query = "SELECT Nombre_Departamento FROM t_ciudades WHERE Nombre_Ciudad = ?"
-                dep_result = self.run_Query(dep_query, (registro[6],))
-                dep = dep_result.fetchone() if dep_result else None
-                self.comboDepartamento.set(dep[0] if dep else "")
+            self.llena_Formulario(participante)
+            self.actualiza = True
             self.status_bar.config(text="Consulta realizada con éxito.")
         else:
             mssg.showinfo("Consulta", "No se encontró ningún participante con el Id/NIT ingresado.")
             self.status_bar.config(text="Consulta sin resultados.")
 
-    def export_data(self):
+    def muestra_Estadisticas(self):
         """
-        Exporta la información de participantes a un archivo CSV.
-        Solicita al usuario la ubicación del archivo y escribe la cabecera y los registros.
+        Abre el panel de estadísticas, o lo trae al frente si ya está abierto.
+        El panel se actualiza solo mientras permanece abierto (ver VentanaEstadisticas).
         """
-        query = """SELECT p.Id, p.Nombre, p."Dirección", p.Celular, p.Entidad, p.Fecha, p.Ciudad,
-                          (SELECT Nombre_Departamento FROM t_ciudades WHERE Nombre_Ciudad = p.Ciudad LIMIT 1) AS Departamento
-                   FROM t_participantes p
-                   ORDER BY p.Id DESC"""
-        db_rows = self.run_Query(query)
-        if db_rows is None:
-            self.status_bar.config(text="Error al obtener datos para exportar.")
-            mssg.showerror("Error", "No se pudo obtener los datos para exportar.")
+        if self.servicio is None:
+            return
+        if self.ventana_estadisticas is not None and self.ventana_estadisticas.abierta():
+            self.ventana_estadisticas.tw.lift()
             return
-        registros = db_rows.fetchall()
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files","*.csv")])
+        self.ventana_estadisticas = VentanaEstadisticas(self.win, self.ejecutor, self.servicio.estadisticas)
+
+    def export_data(self):
+        """
+        Exporta la información de participantes a un archivo CSV (o CSV comprimido con gzip).
+        Solicita al usuario la ubicación del archivo y escribe la cabecera y los registros por lotes
+        en un hilo aparte, mostrando el avance y permitiendo cancelar.
+        """
+        file_path = filedialog.asksaveasfilename(defaultextension=".csv",
+                                                 filetypes=[("CSV files", "*.csv"),
+                                                            ("CSV comprimido (gzip)", "*.csv.gz")])
         if not file_path:
             self.status_bar.config(text="Exportación cancelada.")
             return
-        try:
-            with open(file_path, mode='w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                # Escribe la cabecera del CSV
-                writer.writerow(["Id", "Nombre", "Dirección", "Celular", "Entidad", "Fecha", "Ciudad", "Departamento"])
-                for row in registros:
-                    writer.writerow(row)
-            self.status_bar.config(text=f"Datos exportados exitosamente a {file_path}")
+        dialogo = DialogoProgreso(self.win, "Exportando participantes")
+
+        def exportado(resultado):
+            dialogo.cerrar()
+            escritos, completo = resultado
+            if not completo:
+                self.status_bar.config(text="Exportación cancelada.")
+                return
+            self.status_bar.config(text=f"{escritos} registros exportados exitosamente a {file_path}")
             mssg.showinfo("Éxito", f"Datos exportados exitosamente a {file_path}")
-        except Exception as e:
+
+        def falla(e):
+            dialogo.cerrar()
             self.status_bar.config(text="Error al exportar datos.")
             mssg.showerror("Error", f"No se pudo exportar los datos. Error: {str(e)}")
 
+        self.status_bar.config(text="Exportando datos...")
+        self.ejecutor_largo.enviar(self.servicio.exportar, file_path,
+                                   None, dialogo.progreso, dialogo.cancelado.is_set,
+                                   al_terminar=exportado, al_fallar=falla)
+
+    def respalda_Base(self):
+        """
+        Crea un respaldo de la base de datos en un hilo aparte, mostrando el avance y permitiendo cancelar.
+        El registro puede continuar mientras tanto: la copia no bloquea las escrituras (ver respaldo.py).
+        """
+        if self.servicio is None:
+            return
+        dialogo = DialogoProgreso(self.win, "Respaldando la base de datos")
+
+        def respaldado(ruta):
+            dialogo.cerrar()
+            if ruta is None:
+                self.status_bar.config(text="Respaldo cancelado.")
+                return
+            self.status_bar.config(text=f"Respaldo creado en {ruta}")
+            mssg.showinfo("Respaldo", f"Respaldo verificado y guardado en {ruta}")
+
+        def falla(e):
+            dialogo.cerrar()
+            self.status_bar.config(text="Error al crear el respaldo.")
+            mssg.showerror("Error", f"No se pudo crear el respaldo. Error: {str(e)}")
+
+        self.status_bar.config(text="Creando respaldo...")
+        self.ejecutor_largo.enviar(self.servicio.respaldar, self.carpeta_respaldos, self.respaldos_conservados,
+                                   dialogo.progreso, dialogo.cancelado.is_set,
+                                   al_terminar=respaldado, al_fallar=falla)
+
+    def import_data(self):
+        """
+        Importa participantes desde un archivo CSV en un hilo aparte, mostrando el avance.
+        Las filas inválidas se guardan con su motivo en '<archivo>_rechazos.csv'.
+        """
+        file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+        if not file_path:
+            self.status_bar.config(text="Importación cancelada.")
+            return
+        dialogo = DialogoProgreso(self.win, "Importando participantes")
+
+        def importado(resultado):
+            dialogo.cerrar()
+            leidas, importadas, rechazadas, completo = resultado
+            resumen = f"Filas leídas: {leidas}. Importadas: {importadas}. Rechazadas: {rechazadas}."
+            if rechazadas:
+                resumen += "\nLas filas rechazadas se guardaron en el archivo de rechazos junto al CSV."
+            if not completo:
+                resumen = "Importación cancelada.\n" + resumen
+            self.status_bar.config(text=resumen.splitlines()[0])
+            mssg.showinfo("Importación", resumen)
+            self.lee_tablaTreeView()
+            self.carga_IndiceIds()
+
+        def falla(e):
+            dialogo.cerrar()
+            self.status_bar.config(text="Error al importar datos.")
+            mssg.showerror("Error", f"No se pudo importar los datos. Error: {str(e)}")
+
+        self.status_bar.config(text="Importando datos...")
+        self.ejecutor_largo.enviar(self.servicio.importar, file_path,
+                                   dialogo.progreso, dialogo.cancelado.is_set,
+                                   al_terminar=importado, al_fallar=falla)
+
 # --------------------------
 # Bloque Principal: Ejecución de la aplicación
 # --------------------------
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app = Participantes()
     app.run()
@@ -1,5 +1,7 @@
 import sqlite3
 import os
+import logging
+from migraciones import aplicar_migraciones, version_esquema
 
 def get_db_path():
     # Solicita la ruta al usuario y se asegura de incluir el nombre del archivo .db
@@ -15,6 +17,9 @@ def get_db_path():
     db_path = os.path.abspath(db_path)
     return db_path
 
+# Muestra en consola las migraciones aplicadas
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 while True:
     db_path = get_db_path()
     if os.path.exists(db_path):
@@ -31,34 +36,11 @@ while True:
 try:
     # Conexión a la base de datos; si el archivo no existe, se creará
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # 1. Crear la tabla t_ciudades (estructura según Anexo 3)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS t_ciudades (
-            Id_Departamento INTEGER NOT NULL,
-            Id_Ciudad INTEGER NOT NULL,
-            Nombre_Departamento TEXT,
-            Nombre_Ciudad TEXT,
-            PRIMARY KEY (Id_Ciudad)
-        );
-    ''')
 
-    # 2. Crear la tabla t_participantes (incluyendo la columna Ciudad)
-    cursor.execute('''
-       CREATE TABLE IF NOT EXISTS t_participantes (
-       Id INTEGER NOT NULL UNIQUE,
-       Nombre VARCHAR(45),
-      "Dirección" VARCHAR(45),
-      Celular VARCHAR(45),
-      Entidad VARCHAR(45),
-      Fecha DATE,
-      Ciudad VARCHAR(45),
-      PRIMARY KEY(Id)
-        );
-    ''')
+    # Crea las tablas e índices aplicando las migraciones pendientes del esquema
+    aplicadas = aplicar_migraciones(conn)
+    print(f"Versión del esquema: {version_esquema(conn)} (migraciones aplicadas: {len(aplicadas)})")
 
-    conn.commit()
     print("Base de datos y tablas creadas/actualizadas exitosamente.")
 
 except sqlite3.Error as e:
@@ -0,0 +1,9 @@
+# benchmarks/__init__.py
+"""
+Mediciones reproducibles del rendimiento de la aplicación sin interfaz gráfica.
+ - generador.py crea bases de datos sintéticas con nombres colombianos y las ciudades del CSV del DANE.
+ - __main__.py cronometra las mismas consultas que usa Proyecto_poo.py y escribe los resultados en JSON.
+
+Uso, desde la carpeta del proyecto:
+    python -m benchmarks --participantes 10000 100000 --salida resultados.json
+"""
@@ -0,0 +1,347 @@
+# benchmarks/__main__.py
+"""
+Cronometra, sin interfaz gráfica, las operaciones de Proyecto_poo.py sobre bases sintéticas:
+ - listado:       lee_tablaTreeView (conteo y primera página) y el desplazamiento por las páginas siguientes
+ - filtro:        filtra_registros (conteo y primera página de coincidencias)
+ - consulta:      consulta_Registro (lectura de un participante por Id)
+ - indice_ids:    sugerencias de Id (carga del índice en memoria y búsqueda por prefijo)
+ - busca_ciudad:  Buscar ciudad (municipios por prefijo en el gazetteer, sin tildes)
+ - grabacion:     adiciona_Registro (alta y actualización de un participante)
+ - exportacion:   export_data (CSV completo, sin comprimir y comprimido)
+ - ciudades:      cargador de ciudades (carga completa y recarga sin cambios)
+ - validacion:    esquema de validaciones.py sobre 100000 registros, por columnas
+ - estadisticas:  panel de estadísticas (tablas de resumen) frente a contar con GROUP BY sobre t_participantes
+ - concurrencia:  10 puestos grabando a la vez, cada uno con su transacción o por el escritor agrupado
+ - arranque:      importación de Proyecto_poo.py y carga de los datos iniciales, en un proceso nuevo
+Los resultados se escriben en JSON para comparar versiones.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from time import perf_counter
+from benchmarks.generador import generar_base, participantes_sinteticos
+from busqueda import expresion_fts
+from cargador_ciudades import cargar_ciudades
+from db_handler import DatabaseHandler
+from escritor import EscritorAgrupado
+from exportacion import exportar_csv
+from gazetteer import Gazetteer
+from importacion import COLUMNAS
+from indice_ids import IndiceIds
+from instrumentacion import datos_maquina
+from migraciones import aplicar_migraciones
+from nucleo import ServicioParticipantes
+from validaciones import valida_columnas
+from paginacion import PaginadorKeyset
+from repositorio import ParticipantRepository
+
+CARPETA_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_CSV = os.path.join(CARPETA_PROYECTO, "Departamentos_y_municipios_de_Colombia_20250222.csv")
+# Textos de búsqueda: apellido frecuente, prefijo corto, nombre y apellido, ciudad y uno sin coincidencias
+FILTROS = ("rodriguez", "mar", "ana gomez", "medellin", "zzzz")
+# Textos de Buscar ciudad: nombre sin tilde, prefijo muy común, palabra intermedia y uno sin coincidencias
+TEXTOS_CIUDAD = ("bogo", "medelli", "san", "cuerquia", "zzzz")
+# Arranque de la aplicación sin ventana: imprime [segundos de importación, segundos de datos iniciales]
+SCRIPT_ARRANQUE = """
+import json, sys
+from time import perf_counter
+inicio = perf_counter()
+import Proyecto_poo
+importado = perf_counter()
+Proyecto_poo.Participantes.db_path = sys.argv[1]
+servicio = Proyecto_poo.Participantes.crea_Servicio()
+servicio.preparar()
+paginador = servicio.paginador(tamano_pagina=int(sys.argv[2]))
+paginador.total()
+paginador.siguiente_pagina()
+fin = perf_counter()
+Proyecto_poo.Participantes.gazetteer.detener_verificacion()
+Proyecto_poo.Participantes.db_handler.close()
+print(json.dumps([importado - inicio, fin - importado]))
+"""
+
+def resumen_tiempos(tiempos):
+    """Estadísticas en milisegundos de una lista de duraciones en segundos."""
+    ms = sorted(t * 1000 for t in tiempos)
+    return {
+        "repeticiones": len(ms),
+        "min_ms": round(ms[0], 3),
+        "mediana_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "max_ms": round(ms[-1], 3),
+        "media_ms": round(statistics.fmean(ms), 3),
+    }
+
+def cronometra(funcion, repeticiones):
+    """Ejecuta la función 'repeticiones' veces y retorna el resumen de sus tiempos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = perf_counter()
+        funcion()
+        tiempos.append(perf_counter() - inicio)
+    return resumen_tiempos(tiempos)
+
+def mide_listado(db_handler, tamano_pagina, repeticiones, paginas=20):
+    """lee_tablaTreeView: conteo y primera página; luego el recorrido de las páginas siguientes."""
+    def primera_pagina():
+        paginador = PaginadorKeyset(db_handler, tamano_pagina)
+        paginador.total()
+        paginador.siguiente_pagina()
+
+    def desplazamiento():
+        paginador = PaginadorKeyset(db_handler, tamano_pagina)
+        for _ in range(paginas):
+            if not paginador.siguiente_pagina():
+                break
+
+    return {"primera_pagina": cronometra(primera_pagina, repeticiones),
+            f"{paginas}_paginas": cronometra(desplazamiento, repeticiones)}
+
+def mide_filtro(db_handler, tamano_pagina, repeticiones):
+    """filtra_registros: conteo y primera página de coincidencias para cada texto de FILTROS."""
+    resultados = {}
+    for texto in FILTROS:
+        def filtra(expresion=expresion_fts(texto)):
+            paginador = PaginadorKeyset(db_handler, tamano_pagina, expresion)
+            paginador.total()
+            paginador.siguiente_pagina()
+        resultados[texto] = cronometra(filtra, repeticiones)
+    return resultados
+
+def mide_consulta(repositorio, ids, repeticiones):
+    """consulta_Registro: lectura de participantes existentes elegidos al azar."""
+    azar = random.Random(7)
+    return cronometra(lambda: repositorio.obtener(azar.choice(ids)), repeticiones)
+
+def mide_indice_ids(repositorio, ids, repeticiones):
+    """sugiere_Ids: carga del índice de Id y búsquedas por prefijos de 3 a 8 dígitos de Id existentes."""
+    carga = cronometra(lambda: IndiceIds(repositorio.ids(), ordenados=True), max(1, repeticiones // 100))
+    indice = IndiceIds(repositorio.ids(), ordenados=True)
+    azar = random.Random(11)
+    prefijos = [str(azar.choice(ids))[:azar.randint(3, 8)] for _ in range(repeticiones)]
+    pendientes = iter(prefijos)
+    return {"carga": carga, "ids": len(indice),
+            "busqueda_prefijo": cronometra(lambda: indice.con_prefijo(next(pendientes), 8), repeticiones)}
+
+def mide_grabacion(repositorio, ciudades, repeticiones):
+    """adiciona_Registro: altas y luego actualizaciones; al final se eliminan las filas agregadas."""
+    # Filas con otra semilla, para que sean altas y no actualizaciones
+    nuevas = next(participantes_sinteticos(repeticiones, ciudades, semilla=99, tamano_lote=repeticiones))
+    pendientes = iter(nuevas)
+    alta = cronometra(lambda: repositorio.guardar(*next(pendientes), sobrescribir=False), repeticiones)
+    actualizadas = iter(nuevas)
+    actualizacion = cronometra(lambda: repositorio.guardar(*next(actualizadas)), repeticiones)
+    repositorio.eliminar([fila[0] for fila in nuevas])
+    return {"alta": alta, "actualizacion": actualizacion}
+
+def mide_exportacion(db_handler, gazetteer, carpeta, repeticiones):
+    """export_data: exportación completa a CSV y a CSV comprimido, con el tamaño de cada archivo."""
+    resultados = {}
+    for comprimir in (False, True):
+        ruta = os.path.join(carpeta, "exportacion.csv" + (".gz" if comprimir else ""))
+        resultados["csv.gz" if comprimir else "csv"] = cronometra(
+            lambda: exportar_csv(db_handler, gazetteer, ruta, comprimir), repeticiones)
+        resultados[("csv.gz" if comprimir else "csv") + "_bytes"] = os.path.getsize(ruta)
+        os.remove(ruta)
+    return resultados
+
+def mide_ciudades(carpeta, repeticiones):
+    """Cargador de ciudades: carga en una base nueva y recarga del mismo archivo (sin cambios)."""
+    ruta = os.path.join(carpeta, "ciudades.db")
+
+    def carga_completa():
+        for sufijo in ("", "-wal", "-shm"):
+            if os.path.exists(ruta + sufijo):
+                os.remove(ruta + sufijo)
+        db_handler = DatabaseHandler(ruta)
+        try:
+            conn = db_handler.connect()
+            aplicar_migraciones(conn)
+            cargar_ciudades(conn, RUTA_CSV)
+        finally:
+            db_handler.close()
+
+    def recarga():
+        db_handler = DatabaseHandler(ruta)
+        try:
+            cargar_ciudades(db_handler.connect(), RUTA_CSV)
+        finally:
+            db_handler.close()
+
+    completa = cronometra(carga_completa, repeticiones)
+    return {"carga_completa": completa, "recarga_sin_cambios": cronometra(recarga, repeticiones)}
+
+def mide_arranque(ruta, tamano_pagina, repeticiones):
+    """
+    Arranque de Proyecto_poo.py, cada vez en un proceso nuevo y sin crear la ventana:
+     - importacion: lo que se ejecuta antes de construir la ventana
+     - datos_iniciales: lo que se hace después de mostrarla (servicio, migraciones, ciudades y primera página)
+    """
+    importacion, datos_iniciales = [], []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", SCRIPT_ARRANQUE, ruta, str(tamano_pagina)],
+                                cwd=CARPETA_PROYECTO, capture_output=True, text=True, check=True)
+        tiempos = json.loads(salida.stdout.strip().splitlines()[-1])
+        importacion.append(tiempos[0])
+        datos_iniciales.append(tiempos[1])
+    return {"importacion": resumen_tiempos(importacion), "datos_iniciales": resumen_tiempos(datos_iniciales)}
+
+def mide_validacion(semilla, repeticiones, cantidad=100_000):
+    """Validación por columnas (importación): registros sintéticos válidos y con un 1 % de errores."""
+    filas = next(participantes_sinteticos(cantidad, ["Medellín", "Cali"], semilla, tamano_lote=cantidad))
+    columnas = {campo: [str(valor) for valor in valores] for campo, valores in zip(COLUMNAS, zip(*filas))}
+    con_errores = {campo: list(valores) for campo, valores in columnas.items()}
+    for i in range(0, cantidad, 100):
+        con_errores["Celular"][i] = "3OO"
+    return {"registros": cantidad,
+            "validos": cronometra(lambda: valida_columnas(columnas), repeticiones),
+            "con_errores": cronometra(lambda: valida_columnas(con_errores), repeticiones)}
+
+def mide_estadisticas(db_handler, gazetteer, repeticiones):
+    """muestra_Estadisticas: lectura de las tablas de resumen y, para comparar, los mismos conteos con GROUP BY."""
+    servicio = ServicioParticipantes(db_handler, gazetteer)
+
+    def agrupa():
+        for columna in ("Ciudad", "Entidad", "Fecha"):
+            db_handler.fetch_all(f"SELECT {columna}, COUNT(*) FROM t_participantes GROUP BY {columna}")
+
+    return {"resumen": cronometra(servicio.estadisticas, repeticiones),
+            "group_by": cronometra(agrupa, max(1, repeticiones // 10))}
+
+def mide_concurrencia(ruta, ciudades, por_puesto, puestos=10):
+    """
+    adiciona_Registro desde varios puestos a la vez (hilos con su propia conexión): registros por segundo
+    grabando cada uno en su transacción y por el escritor agrupado (escritor.py). Al final se eliminan.
+    En modo transacción cada puesto tiene su propio DatabaseHandler, como si fuera otro proceso: los puestos
+    compiten por el bloqueo de escritura de SQLite (BEGIN IMMEDIATE con reintentos), no por el candado
+    de escritura de un manejador compartido.
+    """
+    nuevas = next(participantes_sinteticos(por_puesto * puestos, ciudades, semilla=77,
+                                           tamano_lote=por_puesto * puestos))
+    resultados = {}
+    for modo in ("transaccion", "escritor"):
+        manejadores = [DatabaseHandler(ruta) for _ in range(puestos if modo == "transaccion" else 1)]
+        escritor = EscritorAgrupado(manejadores[0]) if modo == "escritor" else None
+        servicios = [ServicioParticipantes(db_handler, escritor=escritor) for db_handler in manejadores]
+        errores = []
+
+        def puesto(servicio, filas):
+            for fila in filas:
+                try:
+                    servicio.guardar(servicio.parametros(*fila))
+                except Exception as e:
+                    errores.append(e)
+
+        hilos = [threading.Thread(target=puesto, args=(servicios[i % len(servicios)], nuevas[i::puestos]))
+                 for i in range(puestos)]
+        inicio = perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        segundos = perf_counter() - inicio
+        if escritor is not None:
+            escritor.cerrar()
+        ParticipantRepository(manejadores[0]).eliminar([fila[0] for fila in nuevas])
+        for db_handler in manejadores:
+            db_handler.close()
+        resultados[modo] = {"registros_por_segundo": round(len(nuevas) / segundos, 1), "errores": len(errores)}
+    return resultados
+
+def mide_base(ruta, carpeta, repeticiones, tamano_pagina):
+    """Ejecuta todas las mediciones sobre una base ya generada."""
+    db_handler = DatabaseHandler(ruta)
+    try:
+        repositorio = ParticipantRepository(db_handler)
+        gazetteer = Gazetteer(db_handler)
+        inicio = perf_counter()
+        gazetteer.cargar()
+        carga_gazetteer = perf_counter() - inicio
+        conn = db_handler.connect()
+        ids = [fila[0] for fila in conn.execute("SELECT Id FROM t_participantes ORDER BY random() LIMIT 1000")]
+        ciudades = [fila[0] for fila in conn.execute("SELECT Nombre_Ciudad FROM t_ciudades")]
+        return {
+            "gazetteer_ms": round(carga_gazetteer * 1000, 3),
+            "busca_ciudad": {texto: cronometra(lambda texto=texto: gazetteer.busca_ciudades(texto, 8), repeticiones * 100)
+                             for texto in TEXTOS_CIUDAD},
+            "listado": mide_listado(db_handler, tamano_pagina, repeticiones),
+            "filtro": mide_filtro(db_handler, tamano_pagina, repeticiones),
+            "consulta": mide_consulta(repositorio, ids, repeticiones * 10),
+            "indice_ids": mide_indice_ids(repositorio, ids, repeticiones * 100),
+            "grabacion": mide_grabacion(repositorio, ciudades, repeticiones * 10),
+            "estadisticas": mide_estadisticas(db_handler, gazetteer, repeticiones * 10),
+            "concurrencia": mide_concurrencia(ruta, ciudades, repeticiones * 20),
+            "exportacion": mide_exportacion(db_handler, gazetteer, carpeta, max(1, repeticiones // 5)),
+            "arranque": mide_arranque(ruta, tamano_pagina, repeticiones),
+        }
+    finally:
+        db_handler.close()
+
+def version_codigo():
+    """Commit actual del proyecto si está en un repositorio git, para comparar resultados entre versiones."""
+    try:
+        salida = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=CARPETA_PROYECTO,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Mide el rendimiento sobre bases de participantes sintéticas.")
+    parser.add_argument("--participantes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="tamaños de base a medir (por defecto 10000 100000)")
+    parser.add_argument("--repeticiones", type=int, default=10, help="repeticiones de cada medición")
+    parser.add_argument("--semilla", type=int, default=2025, help="semilla de los datos sintéticos")
+    parser.add_argument("--pagina", type=int, default=200, help="filas por página del listado")
+    parser.add_argument("--carpeta", help="carpeta donde se guardan (y reutilizan) las bases generadas")
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto se muestran en pantalla)")
+    args = parser.parse_args(argv)
+
+    carpeta = args.carpeta or tempfile.mkdtemp(prefix="benchmarks_participantes_")
+    os.makedirs(carpeta, exist_ok=True)
+    resultados = {
+        "version": version_codigo(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "maquina": datos_maquina(),
+        "parametros": {"repeticiones": args.repeticiones, "semilla": args.semilla, "pagina": args.pagina},
+        "ciudades": None,
+        "validacion": None,
+        "bases": {},
+    }
+    try:
+        resultados["ciudades"] = mide_ciudades(carpeta, args.repeticiones)
+        resultados["validacion"] = mide_validacion(args.semilla, args.repeticiones)
+        for cantidad in args.participantes:
+            ruta = os.path.join(carpeta, f"participantes_{cantidad}_{args.semilla}.db")
+            inicio = perf_counter()
+            generar_base(ruta, cantidad, RUTA_CSV, args.semilla)
+            generacion = perf_counter() - inicio
+            print(f"Base de {cantidad} participantes lista ({generacion:.1f} s); midiendo...", file=sys.stderr)
+            medicion = mide_base(ruta, carpeta, args.repeticiones, args.pagina)
+            medicion["generacion_s"] = round(generacion, 3)
+            medicion["tamano_bytes"] = os.path.getsize(ruta)
+            resultados["bases"][str(cantidad)] = medicion
+    finally:
+        if args.carpeta is None:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+    texto = json.dumps(resultados, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto + "\n")
+    else:
+        print(texto)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# benchmarks/generador.py
+"""
+Generación de bases de datos sintéticas de participantes.
+Los datos se derivan de una semilla, de modo que la misma semilla y el mismo número de
+participantes producen siempre la misma base.
+"""
+import math
+import os
+import random
+import sqlite3
+from datetime import date, timedelta
+from cargador_ciudades import cargar_ciudades
+from db_handler import DatabaseHandler
+from migraciones import aplicar_migraciones
+from repositorio import ParticipantRepository
+
+NOMBRES = (
+    "Juan", "José", "Carlos", "Luis", "Andrés", "Jorge", "Camilo", "Santiago", "Sebastián", "Alejandro",
+    "Diego", "Felipe", "Julián", "Mateo", "Nicolás", "Daniel", "David", "Óscar", "Jhon", "Édgar",
+    "María", "Ana", "Luisa", "Carolina", "Paola", "Natalia", "Daniela", "Valentina", "Camila", "Laura",
+    "Sofía", "Juliana", "Andrea", "Diana", "Marcela", "Ángela", "Lucía", "Yesenia", "Sandra", "Gloria",
+)
+APELLIDOS = (
+    "Rodríguez", "Gómez", "González", "Martínez", "García", "López", "Hernández", "Sánchez", "Ramírez",
+    "Pérez", "Díaz", "Muñoz", "Rojas", "Moreno", "Jiménez", "Vargas", "Castro", "Gutiérrez", "Ortiz",
+    "Álvarez", "Ruiz", "Suárez", "Torres", "Ramos", "Castaño", "Restrepo", "Londoño", "Ospina", "Cárdenas",
+    "Quintero", "Mejía", "Zapata", "Arango", "Valencia", "Polo", "Peña", "Salazar", "Cifuentes", "Agudelo",
+)
+ENTIDADES = (
+    "Universidad Nacional", "Universidad de Antioquia", "Universidad del Valle", "SENA", "Colpensiones",
+    "Ecopetrol", "Bancolombia", "Alcaldía Municipal", "Gobernación", "Independiente",
+)
+VIAS = ("Calle", "Carrera", "Avenida", "Transversal", "Diagonal")
+
+def ciudades_de(conn):
+    """Retorna los nombres de las ciudades cargadas en t_ciudades."""
+    return [fila[0] for fila in conn.execute("SELECT Nombre_Ciudad FROM t_ciudades ORDER BY Id_Ciudad")]
+
+def participantes_sinteticos(cantidad, ciudades, semilla=2025, tamano_lote=10000):
+    """
+    Entrega listas de hasta 'tamano_lote' filas (Id, Nombre, Dirección, Celular, Entidad, Fecha, Ciudad)
+    con Id únicos de 8 a 10 dígitos y fechas posteriores a hoy, como las que acepta el formulario.
+    """
+    azar = random.Random(semilla)
+    # Id distintos sin guardar un conjunto: una permutación lineal del rango de cédulas
+    base, rango = 10_000_000, 9_990_000_000
+    paso = azar.randrange(1, rango)
+    while math.gcd(paso, rango) != 1:
+        paso += 1
+    inicio = azar.randrange(rango)
+    hoy = date.today()
+    lote = []
+    for i in range(cantidad):
+        nombre = f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}"
+        direccion = f"{azar.choice(VIAS)} {azar.randint(1, 150)} # {azar.randint(1, 99)}-{azar.randint(1, 99)}"
+        celular = f"3{azar.randint(0, 999_999_999):09d}"
+        fecha = (hoy + timedelta(days=azar.randint(1, 365))).strftime("%d/%m/%Y")
+        lote.append((base + (inicio + i * paso) % rango, nombre, direccion, celular,
+                     azar.choice(ENTIDADES), fecha, azar.choice(ciudades)))
+        if len(lote) >= tamano_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def generar_base(ruta, participantes, ruta_csv, semilla=2025, reemplazar=False):
+    """
+    Crea en 'ruta' una base con el esquema vigente, las ciudades del CSV y 'participantes' filas sintéticas.
+    Si la base ya existe con ese número de participantes se reutiliza, salvo que se pida reemplazarla.
+    Retorna la ruta.
+    """
+    if os.path.exists(ruta):
+        if not reemplazar:
+            conn = sqlite3.connect(ruta)
+            try:
+                existentes = conn.execute("SELECT COUNT(*) FROM t_participantes").fetchone()[0]
+            except sqlite3.Error:
+                existentes = None
+            finally:
+                conn.close()
+            if existentes == participantes:
+                return ruta
+        for sufijo in ("", "-wal", "-shm"):
+            if os.path.exists(ruta + sufijo):
+                os.remove(ruta + sufijo)
+
+    db_handler = DatabaseHandler(ruta)
+    try:
+        conn = db_handler.connect()
+        aplicar_migraciones(conn)
+        cargar_ciudades(conn, ruta_csv)
+        repositorio = ParticipantRepository(db_handler)
+        for lote in participantes_sinteticos(participantes, ciudades_de(conn), semilla):
+            repositorio.guardar_lote(lote)
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        db_handler.close()
+    return ruta
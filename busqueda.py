@@ -0,0 +1,21 @@
+# busqueda.py
+"""
+Construcción de expresiones de búsqueda para el índice de texto completo t_participantes_fts.
+"""
+import re
+
+# Un término es cualquier secuencia de letras (con tildes y ñ) o dígitos
+PATRON_TERMINO = re.compile(r"\w+")
+
+def expresion_fts(texto):
+    """
+    Convierte el texto escrito por el usuario en una expresión MATCH de FTS5.
+    Cada término se busca como prefijo y todos deben aparecer (AND implícito):
+        'jor san' -> '"jor"* "san"*'
+    Retorna None si el texto no contiene ningún término.
+    """
+    terminos = PATRON_TERMINO.findall(texto)
+    if not terminos:
+        return None
+    # Las comillas impiden que palabras como AND, OR o NOT se interpreten como operadores
+    return " ".join(f'"{termino}"*' for termino in terminos)
@@ -0,0 +1,148 @@
+# cargador_ciudades.py
+"""
+Carga incremental de la tabla de referencia t_ciudades desde el CSV de departamentos y
+municipios del DANE.
+ - Se calcula la huella (SHA-256) del archivo; si coincide con la de la última carga, no se hace nada.
+ - El archivo se lee por lotes y se compara con la tabla: solo se insertan los municipios nuevos,
+   se actualizan los modificados y se eliminan los que ya no aparecen.
+ - Todos los cambios se aplican en una sola transacción, de modo que la tabla nunca queda a medio cargar.
+
+Uso desde la línea de comandos:
+    python cargador_ciudades.py ruta/Participantes.db ruta/Departamentos_y_municipios.csv [--forzar]
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import sqlite3
+import sys
+from migraciones import aplicar_migraciones
+
+logger = logging.getLogger(__name__)
+
+CLAVE_HUELLA = "huella_csv_ciudades"
+
+def huella_archivo(ruta):
+    """Retorna el SHA-256 del archivo, leído por bloques."""
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 20), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+def lee_municipios(ruta, tamano_lote=5000):
+    """
+    Lee el CSV del DANE y entrega listas de hasta 'tamano_lote' tuplas
+    (Id_Ciudad, Id_Departamento, Nombre_Departamento, Nombre_Ciudad).
+    Se omiten las combinaciones (departamento, municipio) y los códigos de municipio repetidos,
+    conservando la primera aparición.
+    """
+    registros_unicos = set()
+    codigos_vistos = set()
+    lote = []
+    with open(ruta, newline="", encoding="utf-8-sig") as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            try:
+                # Eliminar el punto para obtener el código completo
+                id_dep = int(row['CÓDIGO DANE DEL DEPARTAMENTO'].replace(".", ""))
+                id_muni = int(row['CÓDIGO DANE DEL MUNICIPIO'].replace(".", ""))
+                departamento = row['DEPARTAMENTO'].strip()
+                municipio = row['MUNICIPIO'].strip()
+            except KeyError as e:
+                raise ValueError(f"No se encontró la columna esperada en el CSV: {e}") from e
+            except ValueError as e:
+                logger.warning("Error al convertir un valor numérico: %s", e)
+                continue
+            clave = (departamento, municipio)
+            if clave in registros_unicos or id_muni in codigos_vistos:
+                continue
+            registros_unicos.add(clave)
+            codigos_vistos.add(id_muni)
+            lote.append((id_muni, id_dep, departamento, municipio))
+            if len(lote) >= tamano_lote:
+                yield lote
+                lote = []
+    if lote:
+        yield lote
+
+def cargar_ciudades(conn, ruta_csv, forzar=False, tamano_lote=5000):
+    """
+    Sincroniza t_ciudades con el CSV indicado.
+    Retorna un diccionario con los conteos 'insertados', 'actualizados', 'eliminados' y 'omitido'
+    (True si el archivo no cambió desde la última carga).
+    """
+    resumen = {"insertados": 0, "actualizados": 0, "eliminados": 0, "omitido": False}
+    huella = huella_archivo(ruta_csv)
+    fila = conn.execute("SELECT Valor FROM t_metadatos WHERE Clave = ?", (CLAVE_HUELLA,)).fetchone()
+    if not forzar and fila and fila[0] == huella:
+        resumen["omitido"] = True
+        return resumen
+
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Códigos presentes en el archivo, para eliminar al final los que ya no aparecen
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS t_carga_ciudades (Id_Ciudad INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM temp.t_carga_ciudades")
+        for lote in lee_municipios(ruta_csv, tamano_lote):
+            codigos = json.dumps([m[0] for m in lote])
+            conn.execute("INSERT INTO temp.t_carga_ciudades (Id_Ciudad) SELECT value FROM json_each(?)", (codigos,))
+            actuales = {
+                r[0]: r for r in conn.execute(
+                    """SELECT Id_Ciudad, Id_Departamento, Nombre_Departamento, Nombre_Ciudad
+                       FROM t_ciudades WHERE Id_Ciudad IN (SELECT value FROM json_each(?))""", (codigos,))
+            }
+            nuevos = [m for m in lote if m[0] not in actuales]
+            modificados = [m for m in lote if m[0] in actuales and actuales[m[0]] != m]
+            if nuevos:
+                conn.executemany("""INSERT INTO t_ciudades (Id_Ciudad, Id_Departamento, Nombre_Departamento, Nombre_Ciudad)
+                                    VALUES (?, ?, ?, ?)""", nuevos)
+            if modificados:
+                conn.executemany("""UPDATE t_ciudades SET Id_Departamento = ?, Nombre_Departamento = ?, Nombre_Ciudad = ?
+                                    WHERE Id_Ciudad = ?""", [(m[1], m[2], m[3], m[0]) for m in modificados])
+            resumen["insertados"] += len(nuevos)
+            resumen["actualizados"] += len(modificados)
+        if conn.execute("SELECT COUNT(*) FROM temp.t_carga_ciudades").fetchone()[0] == 0:
+            raise ValueError("El CSV no contiene municipios; no se modifica t_ciudades.")
+        cursor = conn.execute("""DELETE FROM t_ciudades
+                                 WHERE Id_Ciudad NOT IN (SELECT Id_Ciudad FROM temp.t_carga_ciudades)""")
+        resumen["eliminados"] = cursor.rowcount
+        conn.execute("DELETE FROM temp.t_carga_ciudades")
+        conn.execute("INSERT INTO t_metadatos (Clave, Valor) VALUES (?, ?) "
+                     "ON CONFLICT (Clave) DO UPDATE SET Valor = excluded.Valor", (CLAVE_HUELLA, huella))
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+    return resumen
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Carga incremental de t_ciudades desde el CSV del DANE.")
+    parser.add_argument("base", help="ruta de Participantes.db")
+    parser.add_argument("csv", help="CSV de departamentos y municipios de Colombia")
+    parser.add_argument("--forzar", action="store_true", help="compara la tabla aunque el archivo no haya cambiado")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    conn = sqlite3.connect(args.base)
+    try:
+        aplicar_migraciones(conn)
+        resumen = cargar_ciudades(conn, args.csv, args.forzar)
+    except (sqlite3.Error, OSError, ValueError) as e:
+        print("Error al cargar las ciudades:", e)
+        return 1
+    finally:
+        conn.close()
+    if resumen["omitido"]:
+        print("El archivo no cambió desde la última carga; t_ciudades no se modificó.")
+    else:
+        print(f"t_ciudades actualizada: {resumen['insertados']} insertados, "
+              f"{resumen['actualizados']} actualizados, {resumen['eliminados']} eliminados.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
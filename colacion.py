@@ -0,0 +1,48 @@
+# colacion.py
+"""
+Orden alfabético en español para SQLite y para Python.
+Las claves de orden no distinguen mayúsculas ni tildes y ubican la ñ después de la n
+(Ávila, Múnera, Muñoz, Núñez, Nuño, Zuluaga), a diferencia del orden binario de SQLite,
+que deja las palabras con tilde después de la z. En memoria se ordena con clave_es().
+En la base de datos el mismo orden se obtiene con una clave normalizada (clave_indice) que
+calcula SQL estándar (expresion_clave), guardada en columnas generadas con índice binario:
+así cualquier conexión puede escribir y verificar la base sin registrar ninguna colación.
+"""
+import unicodedata
+from functools import lru_cache
+
+# Letras del español que la clave de los índices reemplaza; SQLite lower() solo convierte A-Z
+EQUIVALENCIAS_INDICE = {"á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u", "ü": "u", "ñ": "n~",
+                        "Á": "a", "É": "e", "Í": "i", "Ó": "o", "Ú": "u", "Ü": "u", "Ñ": "n~"}
+_TABLA_INDICE = str.maketrans({**EQUIVALENCIAS_INDICE,
+                               **{chr(c): chr(c + 32) for c in range(ord("A"), ord("Z") + 1)}})
+
+@lru_cache(maxsize=65536)
+def clave_es(texto):
+    """
+    Clave de orden en español de un texto: en minúsculas, sin tildes y con la ñ como 'n~'
+    ('~' es posterior a todas las letras, por lo que 'ña' queda después de 'nz').
+    Se guarda en caché porque los mismos nombres, entidades y ciudades se comparan muchas veces.
+    """
+    minusculas = texto.casefold().replace("ñ", "\x00")
+    sin_tildes = "".join(c for c in unicodedata.normalize("NFKD", minusculas) if not unicodedata.combining(c))
+    return sin_tildes.replace("\x00", "n~")
+
+def expresion_clave(columna):
+    """
+    Expresión SQL de la clave de orden de una columna de texto: NULL como '', las letras del español
+    sin tildes, la ñ como 'n~' y en minúsculas. Solo usa funciones estándar de SQLite, por lo que
+    sirve en columnas generadas e índices sin registrar nada en la conexión.
+    """
+    expresion = f"COALESCE({columna}, '')"
+    for letra, reemplazo in EQUIVALENCIAS_INDICE.items():
+        expresion = f"replace({expresion}, '{letra}', '{reemplazo}')"
+    return f"lower({expresion})"
+
+@lru_cache(maxsize=65536)
+def clave_indice(texto):
+    """
+    Clave de orden de un texto exactamente igual a la que calcula expresion_clave() en SQLite.
+    Coincide con clave_es() en los textos en español; otras letras con tilde quedan después de la z.
+    """
+    return (texto or "").translate(_TABLA_INDICE)
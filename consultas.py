@@ -0,0 +1,157 @@
+# consultas.py
+"""
+Sentencias SQL compartidas por la aplicación.
+Se centralizan aquí para que la interfaz y la verificación de planes de consulta
+(ver migraciones.py) usen exactamente el mismo texto.
+"""
+from functools import lru_cache
+
+# Columnas del listado de participantes; el departamento de cada ciudad se resuelve
+# en memoria con el Gazetteer (ver gazetteer.py) en lugar de una subconsulta por fila
+COLUMNAS_LISTADO = """p.Id, p.Nombre, p."Dirección", p.Celular, p.Entidad, p.Fecha, p.Ciudad"""
+
+SQL_LISTADO = f"""SELECT {COLUMNAS_LISTADO}
+                   FROM t_participantes p
+                   ORDER BY p.Id DESC"""
+
+# Paginación por clave (keyset) sobre Id: cada página continúa después del último Id mostrado,
+# por lo que su costo no depende de cuántas páginas se hayan leído antes
+SQL_PAGINA = f"""SELECT {COLUMNAS_LISTADO}
+                   FROM t_participantes p
+                   WHERE p.Id > ?
+                   ORDER BY p.Id
+                   LIMIT ?"""
+
+# Igual que SQL_PAGINA, filtrando con el índice FTS5; el primer parámetro es una expresión MATCH (ver busqueda.py)
+SQL_PAGINA_BUSQUEDA = f"""SELECT {COLUMNAS_LISTADO}
+                   FROM t_participantes p
+                   WHERE p.Id IN (SELECT rowid FROM t_participantes_fts
+                                  WHERE t_participantes_fts MATCH ? AND rowid > ?
+                                  ORDER BY rowid
+                                  LIMIT ?)
+                   ORDER BY p.Id"""
+
+# Expresión de orden de cada columna por la que se puede ordenar el listado: las columnas generadas
+# de la migración 5, con los textos normalizados al orden en español (colacion.expresion_clave),
+# la fecha dd/mm/aaaa como aaaammdd y NULL como ''. Cada una tiene un índice (Orden_x, Id),
+# por lo que ordenar no recorre la tabla; paginacion.valor_orden calcula los mismos valores en Python
+ORDEN_LISTADO = {
+    "Id": "p.Id",
+    "Nombre": "p.Orden_Nombre",
+    "Entidad": "p.Orden_Entidad",
+    "Fecha": "p.Orden_Fecha",
+    "Ciudad": "p.Orden_Ciudad",
+}
+
+@lru_cache(maxsize=None)
+def sql_pagina_ordenada(columna, descendente=False, busqueda=False, inicial=False):
+    """
+    Página del listado ordenada por una columna de ORDEN_LISTADO y luego por Id, con paginación keyset
+    sobre el par (valor de orden, Id). Parámetros, en orden: la expresión MATCH si busqueda=True,
+    salvo en la página inicial el valor de orden (dos veces) y el Id de la última fila leída, y el límite.
+    """
+    expresion = ORDEN_LISTADO[columna]
+    comparacion, sentido = ("<", " DESC") if descendente else (">", "")
+    condiciones = []
+    if busqueda:
+        condiciones.append("p.Id IN (SELECT rowid FROM t_participantes_fts WHERE t_participantes_fts MATCH ?)")
+    if not inicial:
+        # Equivale a (valor, Id) > (?, ?); escrito así, SQLite inicia el recorrido del índice en el valor
+        condiciones.append(f"{expresion} {comparacion}= ? AND ({expresion} {comparacion} ? OR p.Id {comparacion} ?)")
+    donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    return f"""SELECT {COLUMNAS_LISTADO}
+                   FROM t_participantes p
+                   {donde}
+                   ORDER BY {expresion}{sentido}, p.Id{sentido}
+                   LIMIT ?"""
+
+# Operaciones sobre un conjunto de Id recibido como arreglo JSON (una sola sentencia para todo el conjunto)
+SQL_FILAS_POR_IDS = f"""SELECT {COLUMNAS_LISTADO}
+                   FROM t_participantes p
+                   WHERE p.Id IN (SELECT value FROM json_each(?))"""
+
+SQL_ELIMINA_IDS = "DELETE FROM t_participantes WHERE Id IN (SELECT value FROM json_each(?))"
+
+# Id del conjunto (arreglo JSON) que coinciden con la expresión MATCH de la búsqueda actual
+SQL_COINCIDEN_BUSQUEDA = """SELECT rowid FROM t_participantes_fts
+                   WHERE t_participantes_fts MATCH ? AND rowid IN (SELECT value FROM json_each(?))"""
+
+# Indica si un participante coincide con la expresión MATCH de la búsqueda actual
+SQL_COINCIDE_BUSQUEDA = "SELECT 1 FROM t_participantes_fts WHERE t_participantes_fts MATCH ? AND rowid = ?"
+
+SQL_TOTAL = "SELECT COUNT(*) FROM t_participantes"
+
+SQL_TOTAL_BUSQUEDA = "SELECT COUNT(*) FROM t_participantes_fts WHERE t_participantes_fts MATCH ?"
+
+SQL_CONSULTA_ID = f"""SELECT {COLUMNAS_LISTADO}
+                   FROM t_participantes p
+                   WHERE p.Id = ?"""
+
+SQL_GAZETTEER = """SELECT Id_Departamento, Id_Ciudad, Nombre_Departamento, Nombre_Ciudad
+                   FROM t_ciudades
+                   ORDER BY Id_Ciudad"""
+
+SQL_EXISTE_ID = "SELECT 1 FROM t_participantes WHERE Id = ?"
+
+# Solo la clave primaria: se recorre en orden sin leer las filas
+SQL_IDS = "SELECT Id FROM t_participantes ORDER BY Id"
+
+# Último cambio de cada participante modificado después de una marca (Secuencia de t_cambios), en orden de
+# secuencia, con sus datos actuales; las columnas del participante son NULL si ya fue eliminado.
+# Si el primer cambio después de la marca fue el alta, el participante se informa como alta ('I')
+SQL_CAMBIOS_DESDE = """SELECT c.Secuencia, CASE WHEN c.Operacion <> 'D' AND f.Operacion = 'I' THEN 'I' ELSE c.Operacion END,
+                          c.Id, p.Nombre, p."Dirección", p.Celular, p.Entidad, p.Fecha, p.Ciudad
+                   FROM (SELECT MIN(Secuencia) AS Primera, MAX(Secuencia) AS Secuencia
+                         FROM t_cambios WHERE Secuencia > ? GROUP BY Id) u
+                   JOIN t_cambios c ON c.Secuencia = u.Secuencia
+                   JOIN t_cambios f ON f.Secuencia = u.Primera
+                   LEFT JOIN t_participantes p ON p.Id = c.Id
+                   ORDER BY c.Secuencia"""
+
+SQL_LEE_METADATO = "SELECT Valor FROM t_metadatos WHERE Clave = ?"
+
+SQL_GUARDA_METADATO = """INSERT INTO t_metadatos (Clave, Valor) VALUES (?, ?)
+                   ON CONFLICT (Clave) DO UPDATE SET Valor = excluded.Valor"""
+
+# Conteos por ciudad, entidad y fecha que mantienen los triggers (migración 6): una fila por valor distinto
+SQL_RESUMEN = "SELECT Dimension, Valor, Cantidad FROM t_resumen"
+
+# Columnas que retornan las escrituras de un participante, en el mismo orden de COLUMNAS_LISTADO
+RETORNO_PARTICIPANTE = """RETURNING Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad"""
+
+# Inserta un participante o, si el Id ya existe, actualiza sus datos en la misma sentencia.
+# Una ciudad NULL conserva la ciudad registrada (formularios que no la piden)
+SQL_UPSERT_PARTICIPANTE = f"""INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (Id) DO UPDATE SET
+                        Nombre = excluded.Nombre, "Dirección" = excluded."Dirección",
+                        Celular = excluded.Celular, Entidad = excluded.Entidad,
+                        Fecha = excluded.Fecha, Ciudad = COALESCE(excluded.Ciudad, Ciudad)
+                   {RETORNO_PARTICIPANTE}"""
+
+# Inserta un participante solo si el Id no existe; no retorna filas si ya existía
+SQL_INSERTA_PARTICIPANTE = f"""INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (Id) DO NOTHING
+                   {RETORNO_PARTICIPANTE}"""
+
+# Igual que SQL_UPSERT_PARTICIPANTE para un lote completo recibido como arreglo JSON de filas.
+# Una sola sentencia por lote permite que el índice FTS5 acumule los términos de todas las filas
+# y los escriba de una vez, en lugar de vaciar su búfer en cada fila que dispara los triggers
+SQL_UPSERT_LOTE = """INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                   SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]'),
+                          json_extract(value, '$[3]'), json_extract(value, '$[4]'), json_extract(value, '$[5]'),
+                          json_extract(value, '$[6]')
+                   FROM json_each(?)
+                   WHERE true
+                   ON CONFLICT (Id) DO UPDATE SET
+                        Nombre = excluded.Nombre, "Dirección" = excluded."Dirección",
+                        Celular = excluded.Celular, Entidad = excluded.Entidad,
+                        Fecha = excluded.Fecha, Ciudad = excluded.Ciudad"""
+
+# Inserta un lote de filas completas recibido como arreglo JSON; falla si algún Id ya existe
+SQL_INSERTA_LOTE = """INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                   SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]'),
+                          json_extract(value, '$[3]'), json_extract(value, '$[4]'), json_extract(value, '$[5]'),
+                          json_extract(value, '$[6]')
+                   FROM json_each(?)"""
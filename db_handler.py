@@ -1,27 +1,129 @@
 # db_handler.py
+import logging
+import random
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from instrumentacion import ConexionMedida
+
+logger = logging.getLogger(__name__)
+
+def es_bloqueo(error):
+    """Indica si el error de SQLite se debe a que otra conexión tiene la base ocupada ('database is locked')."""
+    mensaje = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in mensaje or "busy" in mensaje)
 
 class DatabaseHandler:
-    def __init__(self, db_path):
+    """
+    Administra las conexiones a la base de datos SQLite.
+    Mantiene una conexión persistente por hilo (en lugar de abrir una por consulta),
+    reutiliza las sentencias preparadas y cierra todas las conexiones al finalizar.
+    """
+    # Pragmas aplicados a cada conexión nueva
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",     # Lectores y escritor no se bloquean entre sí
+        "PRAGMA synchronous = NORMAL",   # Suficientemente seguro con WAL y mucho más rápido
+        "PRAGMA foreign_keys = ON",
+    )
+    # Si otro proceso (otro puesto con la misma base) retiene la escritura más allá de busy_timeout,
+    # se reintenta el inicio de la transacción con una espera que se duplica en cada intento
+    reintentos_escritura = 5
+    espera_reintento = 0.05     # Segundos antes del primer reintento
+
+    def __init__(self, db_path, timeout=5.0, cached_statements=128, monitor=None):
         self.db_path = db_path
+        self.timeout = timeout                      # Segundos de espera si la base está bloqueada
+        self.cached_statements = cached_statements  # Tamaño de la caché de sentencias preparadas
+        self.monitor = monitor                      # instrumentacion.MonitorSQL, o None para no medir
+        self._local = threading.local()
+        self._conexiones = []
+        self._lock = threading.Lock()
+        # Serializa las escrituras de todos los hilos: esperan su turno aquí en lugar de reintentar
+        # contra el bloqueo de SQLite; las lecturas siguen siendo concurrentes gracias a WAL
+        self._lock_escritura = threading.Lock()
 
     def connect(self):
-        """Establece y retorna una conexión a la base de datos."""
-        return sqlite3.connect(self.db_path)
+        """Retorna la conexión del hilo actual, creándola la primera vez."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Con monitor, las sentencias de la conexión se miden (ver instrumentacion.py)
+            factory = ConexionMedida if self.monitor is not None else sqlite3.Connection
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                                   cached_statements=self.cached_statements,
+                                   check_same_thread=False, factory=factory)
+            if self.monitor is not None:
+                conn.monitor = self.monitor
+            conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                self._conexiones.append(conn)
+        return conn
 
     def execute_query(self, query, params=()):
         """Ejecuta una consulta con parámetros opcionales y retorna el cursor."""
+        conn = self.connect()
         try:
-            with self.connect() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
+            cursor = conn.execute(query, params)
+            if conn.in_transaction:
                 conn.commit()
-                return cursor
+            return cursor
         except sqlite3.Error as e:
-            print("Error en la consulta:", e)
+            if conn.in_transaction:
+                conn.rollback()
+            logger.error("Error en la consulta: %s | %s", e, " ".join(query.split()))
             return None
 
     def fetch_all(self, query, params=()):
         """Ejecuta una consulta y retorna todos los resultados."""
         cursor = self.execute_query(query, params)
         return cursor.fetchall() if cursor else None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupa varias sentencias en una sola transacción de escritura.
+        Confirma al salir del bloque o revierte si ocurre una excepción.
+        Solo un hilo a la vez puede tener abierta una transacción.
+        """
+        conn = self.connect()
+        with self._lock_escritura:
+            self.inicia_escritura(conn)
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def inicia_escritura(self, conn):
+        """
+        Ejecuta BEGIN IMMEDIATE y reintenta, con espera creciente y algo de azar para que los puestos
+        no vuelvan a chocar al mismo tiempo, mientras la base siga bloqueada por otro proceso.
+        Lanza el último error si la base sigue bloqueada después de todos los reintentos.
+        """
+        espera = self.espera_reintento
+        for intento in range(self.reintentos_escritura + 1):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                if not es_bloqueo(e) or intento == self.reintentos_escritura:
+                    raise
+                logger.warning("Base de datos ocupada; reintento %s en %.0f ms", intento + 1, espera * 1000)
+                time.sleep(espera * random.uniform(0.5, 1.5))
+                espera *= 2
+
+    def close(self):
+        """Cierra todas las conexiones abiertas por cualquier hilo."""
+        with self._lock:
+            conexiones, self._conexiones = self._conexiones, []
+        for conn in conexiones:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error("Error al cerrar la conexión: %s", e)
+        self._local = threading.local()
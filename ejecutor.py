@@ -0,0 +1,132 @@
+# ejecutor.py
+"""
+Ejecución de trabajo de base de datos fuera del hilo de Tk.
+Las tareas se ejecutan en orden en un hilo dedicado; sus resultados se entregan de vuelta
+al hilo de la interfaz mediante 'after', que es el único hilo autorizado a tocar los widgets.
+"""
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+class Tarea:
+    """
+    Representa un trabajo enviado al ejecutor.
+    Una tarea cancelada no se ejecuta si aún no empezó, y su resultado se descarta si ya estaba en curso.
+    """
+    def __init__(self, funcion, args, al_terminar, al_fallar, clave):
+        self.funcion = funcion
+        self.args = args
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.clave = clave
+        self.cancelada = False
+
+    def cancelar(self):
+        """Marca la tarea como cancelada."""
+        self.cancelada = True
+
+class EjecutorBD:
+    """
+    Hilo dedicado a la base de datos con entrega de resultados al hilo de Tk.
+    """
+    def __init__(self, widget, intervalo=30, al_cambiar_ocupado=None):
+        self.widget = widget                          # Cualquier widget de la ventana, para usar 'after'
+        self.intervalo = intervalo                    # Milisegundos entre revisiones de resultados
+        self.al_cambiar_ocupado = al_cambiar_ocupado  # Función(ocupado) para mostrar el indicador de trabajo
+        self._pendientes = queue.Queue()
+        self._resultados = queue.Queue()
+        self._vigentes = {}      # clave -> última tarea enviada con esa clave
+        self._en_curso = 0       # Tareas enviadas cuyo resultado aún no se ha entregado
+        self._id_revision = None
+        self._hilo = threading.Thread(target=self._trabaja, name="EjecutorBD", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, funcion, *args, al_terminar=None, al_fallar=None, clave=None):
+        """
+        Programa funcion(*args) en el hilo de la base de datos y retorna la Tarea.
+        al_terminar(resultado) o al_fallar(excepcion) se llaman luego en el hilo de Tk.
+        Si se indica una clave, la tarea anterior con la misma clave se cancela
+        (por ejemplo, una búsqueda que quedó desactualizada).
+        """
+        tarea = Tarea(funcion, args, al_terminar, al_fallar, clave)
+        if clave is not None:
+            anterior = self._vigentes.get(clave)
+            if anterior is not None:
+                anterior.cancelar()
+            self._vigentes[clave] = tarea
+        self._en_curso += 1
+        if self._en_curso == 1 and self.al_cambiar_ocupado:
+            self.al_cambiar_ocupado(True)
+        self._pendientes.put(tarea)
+        if self._id_revision is None:
+            self._id_revision = self.widget.after(self.intervalo, self._entrega)
+        return tarea
+
+    def cancelar(self, clave):
+        """Cancela la tarea vigente asociada a la clave, si existe."""
+        tarea = self._vigentes.pop(clave, None)
+        if tarea is not None:
+            tarea.cancelar()
+
+    def ocupado(self):
+        """Indica si hay tareas pendientes o en ejecución."""
+        return self._en_curso > 0
+
+    def _trabaja(self):
+        """Bucle del hilo de la base de datos: ejecuta las tareas en orden de llegada."""
+        while True:
+            tarea = self._pendientes.get()
+            if tarea is None:
+                break
+            if tarea.cancelada:
+                self._resultados.put((tarea, None, None))
+                continue
+            try:
+                resultado = tarea.funcion(*tarea.args)
+            except Exception as e:
+                self._resultados.put((tarea, None, e))
+            else:
+                self._resultados.put((tarea, resultado, None))
+
+    def _entrega(self):
+        """Entrega en el hilo de Tk los resultados disponibles y vuelve a programarse mientras haya tareas."""
+        self._id_revision = None
+        while True:
+            try:
+                tarea, resultado, error = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._en_curso -= 1
+            if tarea.clave is not None and self._vigentes.get(tarea.clave) is tarea:
+                del self._vigentes[tarea.clave]
+            if tarea.cancelada:
+                continue
+            try:
+                if error is not None:
+                    if tarea.al_fallar:
+                        tarea.al_fallar(error)
+                    else:
+                        logger.error("Error en tarea de base de datos: %s", error)
+                elif tarea.al_terminar:
+                    tarea.al_terminar(resultado)
+            except Exception as e:
+                # Un error en la interfaz no debe detener la entrega de los demás resultados
+                logger.exception("Error al entregar el resultado de una tarea: %s", e)
+        if self._en_curso > 0:
+            # Las funciones de entrega pueden haber enviado nuevas tareas y programado ya la revisión
+            if self._id_revision is None:
+                self._id_revision = self.widget.after(self.intervalo, self._entrega)
+        elif self.al_cambiar_ocupado:
+            self.al_cambiar_ocupado(False)
+
+    def cerrar(self, espera=2.0):
+        """Detiene el hilo de trabajo después de las tareas ya enviadas."""
+        if self._id_revision is not None:
+            self.widget.after_cancel(self._id_revision)
+            self._id_revision = None
+        for tarea in self._vigentes.values():
+            tarea.cancelar()
+        self._pendientes.put(None)
+        self._hilo.join(espera)
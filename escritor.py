@@ -0,0 +1,99 @@
+# escritor.py
+"""
+Escritor único con cola y confirmación agrupada (group commit).
+Los hilos que graban (el servicio HTTP con varios puestos de registro, las ventanas de la aplicación)
+no abren cada uno su transacción: encolan la escritura y esperan su resultado. Un solo hilo toma
+todas las escrituras pendientes y las graba en una misma transacción, de modo que con muchos
+puestos a la vez se paga una confirmación en disco por lote y no una por participante.
+Cada escritura va en su propio SAVEPOINT: si falla, se descarta solo ella y el resto del lote se confirma.
+Los bloqueos de otros procesos se reintentan con espera creciente (ver DatabaseHandler.transaction).
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+class EscritorAgrupado:
+    """
+    Hilo escritor de un DatabaseHandler.
+    enviar(funcion, *args) programa funcion(conn, *args), que ejecuta sus sentencias en la conexión
+    del escritor dentro de la transacción del lote; el resultado se entrega después de confirmar.
+    """
+    def __init__(self, db_handler, max_lote=256):
+        self.db_handler = db_handler
+        self.max_lote = max_lote      # Escrituras como máximo por transacción
+        self._pendientes = queue.Queue()
+        self._cerrado = False
+        self._hilo = threading.Thread(target=self._trabaja, name="EscritorBD", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, funcion, *args):
+        """Encola funcion(conn, *args) y retorna un Future con su resultado (o su excepción)."""
+        if self._cerrado:
+            raise RuntimeError("El escritor ya fue cerrado.")
+        futuro = Future()
+        self._pendientes.put((funcion, args, futuro))
+        return futuro
+
+    def ejecutar(self, funcion, *args):
+        """Igual que enviar(), esperando a que el lote se confirme: retorna el resultado o lanza la excepción."""
+        return self.enviar(funcion, *args).result()
+
+    def _trabaja(self):
+        """Bucle del hilo escritor: graba juntas todas las escrituras que esperan."""
+        terminar = False
+        while not terminar:
+            escritura = self._pendientes.get()
+            if escritura is None:
+                break
+            lote = [escritura]
+            # Lo que llegó mientras se confirmaba el lote anterior va en la misma transacción
+            while len(lote) < self.max_lote:
+                try:
+                    escritura = self._pendientes.get_nowait()
+                except queue.Empty:
+                    break
+                if escritura is None:
+                    terminar = True
+                    break
+                lote.append(escritura)
+            self._graba(lote)
+
+    def _graba(self, lote):
+        """Graba un lote en una transacción, con un SAVEPOINT por escritura, y entrega los resultados."""
+        lote = [(funcion, args, futuro) for funcion, args, futuro in lote if futuro.set_running_or_notify_cancel()]
+        if not lote:
+            return
+        resultados = []
+        try:
+            with self.db_handler.transaction() as conn:
+                for funcion, args, futuro in lote:
+                    conn.execute("SAVEPOINT escritura")
+                    try:
+                        resultado = funcion(conn, *args)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO escritura")
+                        conn.execute("RELEASE escritura")
+                        resultados.append((futuro, None, e))
+                    else:
+                        conn.execute("RELEASE escritura")
+                        resultados.append((futuro, resultado, None))
+        except Exception as e:
+            # No se pudo iniciar o confirmar la transacción: falla todo el lote
+            logger.error("No se pudo grabar un lote de %s escrituras: %s", len(lote), e)
+            for _, _, futuro in lote:
+                futuro.set_exception(e)
+            return
+        for futuro, resultado, error in resultados:
+            if error is None:
+                futuro.set_result(resultado)
+            else:
+                futuro.set_exception(error)
+
+    def cerrar(self, espera=5.0):
+        """Graba las escrituras ya encoladas y detiene el hilo escritor."""
+        self._cerrado = True
+        self._pendientes.put(None)
+        self._hilo.join(espera)
@@ -0,0 +1,176 @@
+# exportacion.py
+"""
+Exportación de participantes a CSV por flujo.
+Las filas se leen del cursor por lotes (fetchmany) y se escriben con un búfer, de modo que
+la memoria usada no depende del tamaño de la tabla. El archivo se escribe primero con un
+nombre temporal y solo se renombra al terminar, así una exportación cancelada no deja
+archivos incompletos.
+La exportación incremental (exportar_cambios) escribe solo los participantes que cambiaron
+después de la marca de agua de cada consumidor, según el registro t_cambios (migración 7).
+
+Uso desde la línea de comandos (exportación incremental):
+    python exportacion.py ruta/Participantes.db salida.(csv|jsonl)[.gz] [--consumidor nombre] [--desde N]
+"""
+import argparse
+import csv
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import sys
+from consultas import SQL_LISTADO, SQL_TOTAL, SQL_CAMBIOS_DESDE, SQL_LEE_METADATO, SQL_GUARDA_METADATO
+from db_handler import DatabaseHandler
+from gazetteer import Gazetteer
+from migraciones import aplicar_migraciones
+from modelo import CAMPOS
+
+logger = logging.getLogger(__name__)
+
+# Mismas columnas que un Participante (ver modelo.py) más el departamento de su ciudad
+ENCABEZADO = list(CAMPOS) + ["Departamento"]
+# Exportación incremental: secuencia del cambio y operación antes de los datos del participante
+ENCABEZADO_CAMBIOS = ["Secuencia", "Operacion"] + ENCABEZADO
+# Operaciones de t_cambios como se escriben en la exportación
+OPERACIONES = {"I": "alta", "U": "cambio", "D": "baja"}
+# Clave en t_metadatos de la marca de agua de cada consumidor
+PREFIJO_MARCA = "marca_cambios:"
+
+def abrir_destino(ruta, comprimir):
+    """Abre el archivo de destino en modo texto, comprimido con gzip si se indica."""
+    if comprimir:
+        return gzip.open(ruta, mode="wt", newline="", encoding="utf-8", compresslevel=6)
+    return open(ruta, mode="w", newline="", encoding="utf-8", buffering=1 << 16)
+
+def exportar_csv(db_handler, gazetteer, ruta, comprimir=None, tamano_lote=1000,
+                 progreso=None, cancelado=None):
+    """
+    Escribe todos los participantes en 'ruta'.
+     - comprimir: True/False; si es None se comprime cuando la ruta termina en '.gz'.
+     - progreso(escritos, total): se llama después de cada lote (desde el hilo que exporta).
+     - cancelado(): si retorna True se detiene la exportación y se elimina el archivo parcial.
+    Retorna la tupla (filas_escritas, completo).
+    """
+    if comprimir is None:
+        comprimir = ruta.lower().endswith(".gz")
+    total = db_handler.fetch_all(SQL_TOTAL)
+    if total is None:
+        raise OSError("No se pudo obtener los datos para exportar.")
+    total = total[0][0]
+    temporal = ruta + ".parcial"
+    escritos = 0
+    completo = False
+    cursor = db_handler.connect().execute(SQL_LISTADO)
+    try:
+        with abrir_destino(temporal, comprimir) as archivo:
+            writer = csv.writer(archivo)
+            writer.writerow(ENCABEZADO)
+            while True:
+                if cancelado and cancelado():
+                    break
+                lote = cursor.fetchmany(tamano_lote)
+                if not lote:
+                    completo = True
+                    break
+                writer.writerows(row + (gazetteer.departamento_de(row[6]),) for row in lote)
+                escritos += len(lote)
+                if progreso:
+                    progreso(escritos, total)
+    finally:
+        cursor.close()
+        if not completo and os.path.exists(temporal):
+            os.remove(temporal)
+    if completo:
+        os.replace(temporal, ruta)
+    return escritos, completo
+
+def marca_cambios(db_handler, consumidor):
+    """Retorna la marca de agua (última Secuencia exportada) del consumidor, 0 si nunca ha exportado."""
+    filas = db_handler.fetch_all(SQL_LEE_METADATO, (PREFIJO_MARCA + consumidor,))
+    if filas is None:
+        raise OSError("No se pudo leer la marca de la última exportación.")
+    return int(filas[0][0]) if filas else 0
+
+def exportar_cambios(db_handler, gazetteer, ruta, consumidor="exportacion", desde=None, formato=None,
+                     comprimir=None, tamano_lote=1000, cancelado=None):
+    """
+    Escribe en 'ruta' los participantes que cambiaron después de la marca de agua, una fila por
+    participante con su último cambio ('alta', 'cambio' o 'baja'; en una baja solo va el Id),
+    en orden de secuencia. El costo depende del número de cambios, no del tamaño de la tabla.
+     - consumidor: nombre del sistema que recibe los cambios; cada uno tiene su propia marca.
+     - desde: marca inicial; si es None se usa la guardada para el consumidor.
+     - formato: 'csv' o 'jsonl'; si es None se deduce de la extensión (por defecto CSV).
+     - comprimir: True/False; si es None se comprime cuando la ruta termina en '.gz'.
+    Al terminar el archivo se guarda como nueva marca del consumidor la última secuencia exportada.
+    Retorna la tupla (cambios_escritos, marca, completo).
+    """
+    nombre = ruta.lower()[:-3] if ruta.lower().endswith(".gz") else ruta.lower()
+    if formato is None:
+        formato = "jsonl" if nombre.endswith((".jsonl", ".ndjson")) else "csv"
+    if comprimir is None:
+        comprimir = ruta.lower().endswith(".gz")
+    marca = marca_cambios(db_handler, consumidor) if desde is None else desde
+    temporal = ruta + ".parcial"
+    escritos = 0
+    completo = False
+    # Una sola consulta: los cambios y los datos leídos corresponden al mismo momento de la base
+    cursor = db_handler.connect().execute(SQL_CAMBIOS_DESDE, (marca,))
+    try:
+        with abrir_destino(temporal, comprimir) as archivo:
+            if formato == "csv":
+                writer = csv.writer(archivo)
+                writer.writerow(ENCABEZADO_CAMBIOS)
+            while True:
+                if cancelado and cancelado():
+                    break
+                lote = cursor.fetchmany(tamano_lote)
+                if not lote:
+                    completo = True
+                    break
+                filas = []
+                for secuencia, operacion, *datos in lote:
+                    if operacion == "D":
+                        # El participante ya no existe: solo se informa su Id
+                        filas.append((secuencia, OPERACIONES[operacion], datos[0]) + (None,) * (len(ENCABEZADO) - 1))
+                    else:
+                        filas.append((secuencia, OPERACIONES[operacion], *datos, gazetteer.departamento_de(datos[6])))
+                if formato == "csv":
+                    writer.writerows(filas)
+                else:
+                    archivo.writelines(json.dumps(dict(zip(ENCABEZADO_CAMBIOS, fila)), ensure_ascii=False) + "\n"
+                                       for fila in filas)
+                escritos += len(lote)
+                marca = lote[-1][0]
+    finally:
+        cursor.close()
+        if not completo and os.path.exists(temporal):
+            os.remove(temporal)
+    if completo:
+        os.replace(temporal, ruta)
+        with db_handler.transaction() as conn:
+            conn.execute(SQL_GUARDA_METADATO, (PREFIJO_MARCA + consumidor, str(marca)))
+    return escritos, marca, completo
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos: exportación incremental de cambios."""
+    parser = argparse.ArgumentParser(description="Exporta los participantes que cambiaron desde la última exportación.")
+    parser.add_argument("base", help="ruta de Participantes.db")
+    parser.add_argument("salida", help="archivo .csv o .jsonl (con .gz se comprime)")
+    parser.add_argument("--consumidor", default="exportacion", help="sistema que recibe los cambios (su propia marca)")
+    parser.add_argument("--desde", type=int, help="secuencia desde la que se exporta (por defecto, la marca guardada)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    db_handler = DatabaseHandler(args.base)
+    try:
+        aplicar_migraciones(db_handler.connect())
+        escritos, marca, _ = exportar_cambios(db_handler, Gazetteer(db_handler), args.salida, args.consumidor, args.desde)
+    except (sqlite3.Error, OSError, ValueError) as e:
+        logger.error("No se pudo exportar los cambios: %s", e)
+        return 1
+    finally:
+        db_handler.close()
+    logger.info("%s cambios exportados a %s; nueva marca: %s", escritos, args.salida, marca)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
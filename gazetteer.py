@@ -0,0 +1,218 @@
+# gazetteer.py
+"""
+Caché en memoria de la tabla de referencia t_ciudades (departamentos y municipios DANE).
+La tabla se carga una sola vez y se comparte entre todas las ventanas; las consultas solo leen memoria.
+Un hilo de verificación (iniciar_verificacion) vuelve a leerla cuando cambia la huella del archivo
+de ciudades cargado (cargador_ciudades.py guarda la huella en t_metadatos en cada recarga, también
+desde otro proceso); invalidar() descarta la caché para que la próxima consulta la lea de nuevo.
+Incluye un índice de prefijos sin tildes ni mayúsculas para buscar municipios mientras se escriben.
+"""
+import re
+import logging
+import threading
+import unicodedata
+from bisect import bisect_left
+from cargador_ciudades import CLAVE_HUELLA
+from consultas import SQL_GAZETTEER, SQL_LEE_METADATO
+
+logger = logging.getLogger(__name__)
+
+PATRON_SEPARADORES = re.compile(r"[\W_]+")
+
+def normaliza(texto):
+    """Texto sin tildes, en minúsculas y con la puntuación como espacios: 'Bogotá, D.C.' -> 'bogota d c'."""
+    sin_tildes = "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+    return PATRON_SEPARADORES.sub(" ", sin_tildes.casefold()).strip()
+
+class Gazetteer:
+    """
+    Mantiene en memoria:
+     - departamento -> lista ordenada de municipios,
+     - municipio -> departamento (búsqueda inversa),
+     - (departamento, municipio) -> códigos DANE,
+     - índice ordenado de nombres normalizados (ver busca_ciudades).
+    """
+    # Segundos entre dos comparaciones de la huella de t_ciudades con la de la carga en memoria
+    intervalo_verificacion = 5.0
+
+    def __init__(self, db_handler):
+        self.db_handler = db_handler
+        self._lock = threading.Lock()
+        self._cargado = False
+        self._huella = None     # Huella del archivo de ciudades con la que se hizo la carga
+        self._departamentos = []
+        self._ciudades_por_departamento = {}
+        self._departamento_por_ciudad = {}
+        self._codigos = {}
+        # (claves, entradas): nombre normalizado desde cada palabra, en orden, y el
+        # (municipio, departamento, es_inicio) de cada clave; se reemplazan juntas al recargar
+        self._indice = ([], [])
+        self._detener = threading.Event()
+        self._hilo = None       # Hilo de verificación de la huella (ver iniciar_verificacion)
+
+    def cargar(self):
+        """
+        Lee t_ciudades completa y construye las estructuras de consulta, si aún no estaba cargada
+        (o se invalidó); si ya lo estaba no consulta la base de datos.
+        Retorna True si la carga fue exitosa, False si la consulta falló.
+        """
+        with self._lock:
+            return self._cargado or self._lee()
+
+    def verificar(self):
+        """
+        Compara la huella guardada en t_metadatos con la de la carga en memoria y vuelve a leer
+        t_ciudades si las ciudades se recargaron. Consulta la base de datos, por lo que la llama
+        el hilo de verificación y no las consultas de la interfaz.
+        Retorna True si la tabla se volvió a leer.
+        """
+        with self._lock:
+            if not self._cargado:
+                return self._lee()
+            huella = self.db_handler.fetch_all(SQL_LEE_METADATO, (CLAVE_HUELLA,))
+            if huella is None or (huella[0][0] if huella else None) == self._huella:
+                return False
+            return self._lee()
+
+    def iniciar_verificacion(self, intervalo=None):
+        """
+        Inicia un hilo que llama a verificar() cada 'intervalo' segundos (por defecto intervalo_verificacion),
+        con su propia conexión a la base de datos. Detenerlo con detener_verificacion() antes de cerrar el manejador.
+        """
+        if self._hilo is not None:
+            return
+        intervalo = self.intervalo_verificacion if intervalo is None else intervalo
+        self._detener.clear()
+
+        def verifica_periodicamente():
+            while not self._detener.wait(intervalo):
+                try:
+                    self.verificar()
+                except Exception as e:
+                    logger.error("No se pudo verificar la tabla de ciudades: %s", e)
+
+        self._hilo = threading.Thread(target=verifica_periodicamente, name="VerificaCiudades", daemon=True)
+        self._hilo.start()
+
+    def detener_verificacion(self, espera=2.0):
+        """Detiene el hilo de verificación, si está activo."""
+        if self._hilo is None:
+            return
+        self._detener.set()
+        self._hilo.join(espera)
+        self._hilo = None
+
+    def _lee(self):
+        """Lee la huella y t_ciudades y reemplaza las estructuras de consulta (con self._lock tomado)."""
+        huella = self.db_handler.fetch_all(SQL_LEE_METADATO, (CLAVE_HUELLA,))
+        huella = huella[0][0] if huella else None
+        filas = self.db_handler.fetch_all(SQL_GAZETTEER)
+        if filas is None:
+            # Si falla una recarga se sigue usando la carga anterior
+            return self._cargado
+        ciudades_por_departamento = {}
+        departamento_por_ciudad = {}
+        codigos = {}
+        for id_dep, id_ciudad, departamento, ciudad in filas:
+            ciudades_por_departamento.setdefault(departamento, []).append(ciudad)
+            # Entre municipios homónimos se conserva el primero por código DANE,
+            # igual que la antigua subconsulta con LIMIT 1
+            departamento_por_ciudad.setdefault(ciudad, departamento)
+            codigos[(departamento, ciudad)] = (id_dep, id_ciudad)
+        for ciudades in ciudades_por_departamento.values():
+            ciudades.sort()
+        self._departamentos = sorted(ciudades_por_departamento)
+        self._ciudades_por_departamento = ciudades_por_departamento
+        self._departamento_por_ciudad = departamento_por_ciudad
+        self._codigos = codigos
+        self._indice = self.indice_nombres(codigos)
+        self._huella = huella
+        self._cargado = True
+        return True
+
+    @staticmethod
+    def indice_nombres(codigos):
+        """
+        Construye el índice de búsqueda: por cada municipio, una clave por cada palabra de su nombre
+        normalizado ('san andres de cuerquia', 'andres de cuerquia', 'de cuerquia', 'cuerquia'),
+        para encontrarlo también por una palabra intermedia. Retorna (claves, entradas) ordenadas por clave.
+        """
+        indice = []
+        for departamento, ciudad in codigos:
+            nombre = normaliza(ciudad)
+            inicio = 0
+            while inicio >= 0:
+                indice.append((nombre[inicio:], ciudad, departamento, inicio == 0))
+                inicio = nombre.find(" ", inicio)
+                inicio = inicio + 1 if inicio >= 0 else -1
+        indice.sort()
+        return [clave for clave, *_ in indice], [tuple(entrada) for _, *entrada in indice]
+
+    def invalidar(self):
+        """Descarta la caché; la próxima consulta volverá a leer t_ciudades."""
+        with self._lock:
+            self._cargado = False
+
+    def _disponible(self):
+        """
+        Indica si hay datos en memoria para consultar. Una vez cargados no toma el candado ni consulta
+        la base de datos, aunque el hilo de verificación esté volviendo a leer la tabla.
+        """
+        return self._cargado or self.cargar()
+
+    def departamentos(self):
+        """Retorna la lista ordenada de departamentos, o None si no se pudo cargar."""
+        if not self._disponible():
+            return None
+        return list(self._departamentos)
+
+    def ciudades(self, departamento):
+        """Retorna la lista ordenada de municipios del departamento, o None si no se pudo cargar."""
+        if not self._disponible():
+            return None
+        return list(self._ciudades_por_departamento.get(departamento, ()))
+
+    def departamento_de(self, ciudad, defecto=""):
+        """Retorna el departamento al que pertenece el municipio, o el valor por defecto."""
+        if not self._disponible():
+            return defecto
+        return self._departamento_por_ciudad.get(ciudad, defecto)
+
+    def codigo_dane(self, ciudad, departamento=None):
+        """
+        Retorna la tupla (Id_Departamento, Id_Ciudad) del municipio, o None si no existe.
+        Si no se indica el departamento se usa el que resuelve departamento_de().
+        """
+        if not self._disponible():
+            return None
+        if departamento is None:
+            departamento = self._departamento_por_ciudad.get(ciudad)
+        return self._codigos.get((departamento, ciudad))
+
+    def busca_ciudades(self, texto, limite=10):
+        """
+        Retorna hasta 'limite' pares (municipio, departamento) cuyo nombre, o alguna de sus palabras,
+        empieza por el texto indicado, sin distinguir tildes ni mayúsculas ('medelli' -> Medellín).
+        Primero los que empiezan por el texto y luego los que lo tienen en una palabra intermedia;
+        dentro de cada grupo, en orden alfabético. Retorna None si no se pudo cargar.
+        """
+        if not self._disponible():
+            return None
+        prefijo = normaliza(texto)
+        if not prefijo:
+            return []
+        claves, entradas = self._indice
+        inicio_nombre, intermedias = [], []
+        for i in range(bisect_left(claves, prefijo), len(claves)):
+            if not claves[i].startswith(prefijo):
+                break
+            ciudad, departamento, es_inicio = entradas[i]
+            if es_inicio:
+                inicio_nombre.append((ciudad, departamento))
+                if len(inicio_nombre) >= limite:
+                    break
+            elif len(intermedias) < limite:
+                intermedias.append((ciudad, departamento))
+        # Un municipio puede coincidir por dos palabras: se conserva su primera aparición
+        resultado = list(dict.fromkeys(inicio_nombre + intermedias))
+        return resultado[:limite]
@@ -0,0 +1,178 @@
+# importacion.py
+"""
+Importación masiva de participantes desde un archivo CSV.
+El archivo se lee por flujo y por lotes: cada lote se valida por columnas con el mismo
+esquema del formulario (ver validaciones.py), las ciudades se resuelven contra t_ciudades
+y las filas válidas se graban con una sentencia y una transacción por lote. Las filas
+rechazadas se escriben, con el motivo, en un archivo de rechazos.
+La columna opcional Departamento solo se usa para validar: t_participantes guarda la ciudad y el
+departamento se deduce de ella, por lo que un municipio homónimo de otro departamento se rechaza.
+
+Uso desde la línea de comandos:
+    python importacion.py ruta/Participantes.db participantes.csv [--rechazos rechazos.csv] [--lote 5000]
+"""
+import argparse
+import csv
+import logging
+import sys
+import unicodedata
+from datetime import datetime
+from db_handler import DatabaseHandler
+from gazetteer import Gazetteer
+from migraciones import aplicar_migraciones
+from repositorio import ParticipantRepository
+from validaciones import valida_columnas
+
+COLUMNAS = ("Id", "Nombre", "Dirección", "Celular", "Entidad", "Fecha", "Ciudad")
+
+def normaliza_encabezado(nombre):
+    """Compara encabezados sin tildes, mayúsculas ni espacios: 'Dirección ' -> 'direccion'."""
+    sin_tildes = unicodedata.normalize("NFKD", nombre).encode("ascii", "ignore").decode("ascii")
+    return sin_tildes.strip().lower()
+
+def cuenta_filas(ruta):
+    """Cuenta aproximadamente las filas de datos del archivo (saltos de línea menos el encabezado)."""
+    lineas = 0
+    with open(ruta, "rb") as archivo:
+        for bloque in iter(lambda: archivo.read(1 << 20), b""):
+            lineas += bloque.count(b"\n")
+    return max(lineas - 1, 0)
+
+def valida_lote(filas, gazetteer, hoy):
+    """
+    Valida un lote de filas del CSV (diccionarios con las COLUMNAS y opcionalmente 'Departamento'):
+    primero columna por columna con el esquema de validaciones.py y luego la ciudad de cada fila válida.
+    Si la fila indica un departamento distinto del que la aplicación deduce de la ciudad
+    (Gazetteer.departamento_de), se rechaza en lugar de cambiarle el departamento en silencio.
+    Retorna (validas, rechazos): los parámetros de las filas válidas, en orden, y la lista
+    ordenada de pares (posición en el lote, motivo) de las rechazadas, con el primer motivo de cada una.
+    """
+    motivos = {}
+    for error in valida_columnas({c: [fila[c] for fila in filas] for c in COLUMNAS}, hoy):
+        motivos.setdefault(error.fila, error.mensaje)
+    validas = []
+    for i, fila in enumerate(filas):
+        if i in motivos:
+            continue
+        ciudad = fila["Ciudad"]
+        departamento = fila.get("Departamento") or None
+        if gazetteer.codigo_dane(ciudad, departamento) is None:
+            motivos[i] = "La ciudad no existe en t_ciudades" + (f" para {departamento}" if departamento else "")
+            continue
+        if departamento and gazetteer.departamento_de(ciudad) != departamento:
+            motivos[i] = (f"El municipio {ciudad} existe en varios departamentos y solo se guarda la ciudad: "
+                          f"quedaría registrado en {gazetteer.departamento_de(ciudad)}, no en {departamento}")
+            continue
+        validas.append((int(fila["Id"]), fila["Nombre"], fila["Dirección"], fila["Celular"],
+                        fila["Entidad"], fila["Fecha"], ciudad))
+    return validas, sorted(motivos.items())
+
+def valida_fila(fila, gazetteer, hoy):
+    """
+    Valida una sola fila (ver valida_lote).
+    Retorna (parametros, None) si es válida, o (None, motivo) si debe rechazarse.
+    """
+    validas, rechazos = valida_lote([fila], gazetteer, hoy)
+    return (validas[0], None) if validas else (None, rechazos[0][1])
+
+def importar_csv(db_handler, gazetteer, ruta, ruta_rechazos=None, tamano_lote=5000,
+                 progreso=None, cancelado=None):
+    """
+    Importa los participantes del archivo 'ruta'. Los Id existentes se actualizan.
+     - ruta_rechazos: archivo CSV donde se escriben las filas inválidas con su motivo
+       (por defecto '<ruta>_rechazos.csv'; solo se crea si hay rechazos).
+     - progreso(procesadas, total): se llama después de cada lote.
+     - cancelado(): si retorna True se detiene al terminar el lote en curso;
+       los lotes ya grabados se conservan.
+    Retorna la tupla (leidas, importadas, rechazadas, completo).
+    """
+    if ruta_rechazos is None:
+        ruta_rechazos = (ruta[:-4] if ruta.lower().endswith(".csv") else ruta) + "_rechazos.csv"
+    if not gazetteer.cargar():
+        raise OSError("No se pudo cargar la tabla de ciudades.")
+    repositorio = ParticipantRepository(db_handler)
+    total = cuenta_filas(ruta)
+    hoy = datetime.today().date()
+    leidas = importadas = rechazadas = 0
+    completo = False
+    archivo_rechazos = writer_rechazos = None
+
+    def procesa_lote(lote):
+        # Valida el lote, escribe sus rechazos y graba las filas válidas
+        nonlocal importadas, rechazadas, archivo_rechazos, writer_rechazos
+        validas, rechazos = valida_lote([fila for _, fila in lote], gazetteer, hoy)
+        if rechazos:
+            rechazadas += len(rechazos)
+            if writer_rechazos is None:
+                archivo_rechazos = open(ruta_rechazos, "w", newline="", encoding="utf-8")
+                writer_rechazos = csv.writer(archivo_rechazos)
+                writer_rechazos.writerow(list(encabezado) + ["Motivo"])
+            writer_rechazos.writerows(lote[i][0] + [motivo] for i, motivo in rechazos)
+        if validas:
+            importadas += repositorio.guardar_lote(validas)
+
+    try:
+        with open(ruta, newline="", encoding="utf-8-sig") as archivo:
+            reader = csv.reader(archivo)
+            encabezado = next(reader, None)
+            if encabezado is None:
+                return 0, 0, 0, True
+            # Posición de cada columna esperada en el archivo, sin importar tildes ni mayúsculas
+            posiciones = {normaliza_encabezado(nombre): i for i, nombre in enumerate(encabezado)}
+            faltantes = [c for c in COLUMNAS if normaliza_encabezado(c) not in posiciones]
+            if faltantes:
+                raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+            indices = [(c, posiciones[normaliza_encabezado(c)]) for c in COLUMNAS]
+            indice_departamento = posiciones.get("departamento")
+
+            lote = []
+            for valores in reader:
+                if not valores:
+                    continue
+                leidas += 1
+                fila = {c: (valores[i].strip() if i < len(valores) else "") for c, i in indices}
+                if indice_departamento is not None and indice_departamento < len(valores):
+                    fila["Departamento"] = valores[indice_departamento].strip()
+                lote.append((valores, fila))
+                if len(lote) >= tamano_lote:
+                    procesa_lote(lote)
+                    lote = []
+                    if progreso:
+                        progreso(leidas, max(total, leidas))
+                    if cancelado and cancelado():
+                        return leidas, importadas, rechazadas, False
+            if lote:
+                procesa_lote(lote)
+            completo = True
+            if progreso:
+                progreso(leidas, leidas)
+    finally:
+        if archivo_rechazos:
+            archivo_rechazos.close()
+    return leidas, importadas, rechazadas, completo
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Importa participantes desde un archivo CSV.")
+    parser.add_argument("base", help="ruta de Participantes.db")
+    parser.add_argument("csv", help="archivo CSV con las columnas Id, Nombre, Dirección, Celular, Entidad, Fecha, Ciudad")
+    parser.add_argument("--rechazos", help="archivo donde se escriben las filas rechazadas")
+    parser.add_argument("--lote", type=int, default=5000, help="filas por transacción (por defecto 5000)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    db_handler = DatabaseHandler(args.base)
+    try:
+        aplicar_migraciones(db_handler.connect())
+        inicio = datetime.now()
+        leidas, importadas, rechazadas, _ = importar_csv(db_handler, Gazetteer(db_handler), args.csv,
+                                                         args.rechazos, args.lote)
+        segundos = (datetime.now() - inicio).total_seconds()
+        print(f"Filas leídas: {leidas}, importadas: {importadas}, rechazadas: {rechazadas} "
+              f"({leidas / segundos if segundos else leidas:.0f} filas/s)")
+        return 0 if rechazadas == 0 else 1
+    finally:
+        db_handler.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# indice_ids.py
+"""
+Índice en memoria de los Id de todos los participantes, para sugerir identificaciones
+mientras se escriben sin consultar la base de datos.
+Los Id se guardan ordenados en un array de enteros de 64 bits (8 bytes por Id: un millón
+ocupa unos 8 MB) y la búsqueda por prefijo se hace con bisect sobre rangos numéricos.
+"""
+from array import array
+from bisect import bisect_left
+
+# Dígitos máximos de una identificación (ver Participantes.validar_identificacion)
+LONGITUD_MAXIMA = 15
+
+class IndiceIds:
+    """
+    Conjunto ordenado de Id con búsqueda por prefijo.
+    Los Id que empiezan por un prefijo de k dígitos forman, para cada longitud L >= k,
+    el rango [prefijo * 10^(L-k), (prefijo + 1) * 10^(L-k)); cada rango se ubica con dos bisect.
+    """
+    def __init__(self, ids=(), ordenados=False):
+        # Con ordenados=True los Id ya vienen en orden ascendente (por ejemplo, de ORDER BY Id)
+        self._ids = array("q", ids if ordenados else sorted(ids))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, id_participante):
+        posicion = bisect_left(self._ids, id_participante)
+        return posicion < len(self._ids) and self._ids[posicion] == id_participante
+
+    def agrega(self, id_participante):
+        """Agrega un Id en su posición; no hace nada si ya estaba."""
+        posicion = bisect_left(self._ids, id_participante)
+        if posicion == len(self._ids) or self._ids[posicion] != id_participante:
+            self._ids.insert(posicion, id_participante)
+
+    def quita(self, ids):
+        """Quita los Id indicados que estén en el índice."""
+        for id_participante in ids:
+            posicion = bisect_left(self._ids, id_participante)
+            if posicion < len(self._ids) and self._ids[posicion] == id_participante:
+                del self._ids[posicion]
+
+    def con_prefijo(self, prefijo, limite=10):
+        """
+        Retorna hasta 'limite' Id cuyo texto empieza por el prefijo indicado,
+        primero los más cortos y, entre los de igual longitud, en orden ascendente.
+        """
+        if not prefijo.isdigit() or prefijo[0] == "0" or len(prefijo) > LONGITUD_MAXIMA:
+            return []
+        base = int(prefijo)
+        resultado = []
+        for escala in (10 ** extra for extra in range(LONGITUD_MAXIMA - len(prefijo) + 1)):
+            desde = bisect_left(self._ids, base * escala)
+            if desde == len(self._ids):
+                break
+            hasta = bisect_left(self._ids, (base + 1) * escala, desde)
+            resultado.extend(self._ids[desde:min(hasta, desde + limite - len(resultado))])
+            if len(resultado) >= limite:
+                break
+        return resultado
@@ -0,0 +1,289 @@
+# instrumentacion.py
+"""
+Medición de las sentencias SQL ejecutadas por la aplicación.
+Cuando el DatabaseHandler recibe un MonitorSQL, sus conexiones se crean con ConexionMedida:
+cada sentencia registra su latencia (ejecución más lectura de las filas), el número de filas
+y los errores. Las sentencias que superan el umbral de lentitud se registran en el log junto
+con su plan (EXPLAIN QUERY PLAN). Sin monitor las conexiones son las de sqlite3, sin costo extra.
+
+Para activarlo en la aplicación se definen las variables de entorno:
+    PARTICIPANTES_SQL_ESTADISTICAS  archivo JSON donde se guardan las estadísticas al cerrar
+    PARTICIPANTES_SQL_LENTO_MS      umbral de consulta lenta en milisegundos (por defecto 100)
+"""
+import json
+import logging
+import os
+import platform
+import sqlite3
+import threading
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from itertools import chain
+from time import perf_counter
+import consultas
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (en milisegundos) de los intervalos del histograma de latencias
+LIMITES_HISTOGRAMA = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+def datos_maquina():
+    """Identifica el equipo y las versiones con que se tomaron las mediciones."""
+    return {
+        "equipo": platform.node(),
+        "sistema": platform.platform(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+    }
+
+def normaliza_sql(sql):
+    """Reduce los espacios de una sentencia a uno solo, para agrupar el mismo texto escrito en varias líneas."""
+    return " ".join(sql.split())
+
+class EstadisticaSentencia:
+    """Acumulado de las ejecuciones de una misma sentencia."""
+    def __init__(self, sql, nombre):
+        self.sql = sql
+        self.nombre = nombre           # Nombre de la constante en consultas.py, si la sentencia es una de ellas
+        self.ejecuciones = 0
+        self.errores = 0
+        self.filas = 0
+        self.total = 0.0               # Segundos
+        self.maximo = 0.0
+        self.histograma = [0] * (len(LIMITES_HISTOGRAMA) + 1)
+        self.plan = None               # Plan capturado la primera vez que resultó lenta
+
+    def agrega(self, segundos, filas):
+        self.ejecuciones += 1
+        self.filas += filas
+        self.total += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+        self.histograma[bisect_left(LIMITES_HISTOGRAMA, segundos * 1000)] += 1
+
+    def como_dict(self):
+        etiquetas = [f"<={limite}ms" for limite in LIMITES_HISTOGRAMA] + [f">{LIMITES_HISTOGRAMA[-1]}ms"]
+        return {
+            "nombre": self.nombre,
+            "sql": self.sql,
+            "ejecuciones": self.ejecuciones,
+            "errores": self.errores,
+            "filas": self.filas,
+            "total_ms": round(self.total * 1000, 3),
+            "media_ms": round(self.total * 1000 / self.ejecuciones, 3) if self.ejecuciones else None,
+            "maximo_ms": round(self.maximo * 1000, 3),
+            "histograma": {e: n for e, n in zip(etiquetas, self.histograma) if n},
+            "plan": self.plan,
+        }
+
+class MonitorSQL:
+    """
+    Estadísticas de las sentencias ejecutadas por todas las conexiones de un DatabaseHandler.
+    Es seguro usarlo desde varios hilos.
+    """
+    def __init__(self, umbral_lento=0.1, max_lentas=200, ruta=None):
+        self.umbral_lento = umbral_lento      # Segundos a partir de los cuales una sentencia es lenta
+        self.ruta = ruta                      # Archivo JSON por defecto de exportar_json()
+        self.inicio = datetime.now()
+        self.lentas = deque(maxlen=max_lentas)
+        self._sentencias = {}                 # Texto original -> EstadisticaSentencia
+        self._lock = threading.Lock()
+        self._nombres = {normaliza_sql(valor): nombre for nombre, valor in vars(consultas).items()
+                         if nombre.startswith("SQL_") and isinstance(valor, str)}
+
+    def _estadistica(self, sql):
+        estadistica = self._sentencias.get(sql)
+        if estadistica is None:
+            texto = normaliza_sql(sql)
+            # Varias escrituras del mismo texto comparten el acumulado
+            for otra in self._sentencias.values():
+                if otra.sql == texto:
+                    estadistica = otra
+                    break
+            else:
+                estadistica = EstadisticaSentencia(texto, self._nombres.get(texto))
+            self._sentencias[sql] = estadistica
+        return estadistica
+
+    def registrar(self, sql, segundos, filas, conn=None, parametros=()):
+        """Registra una ejecución; si es lenta captura su plan con la conexión indicada."""
+        with self._lock:
+            estadistica = self._estadistica(sql)
+            estadistica.agrega(segundos, filas)
+            capturar = segundos >= self.umbral_lento and estadistica.plan is None
+        if segundos < self.umbral_lento:
+            return
+        plan = estadistica.plan
+        if capturar and conn is not None:
+            plan = self.plan(conn, sql, parametros)
+            estadistica.plan = plan
+        self.lentas.append({
+            "momento": datetime.now().isoformat(timespec="seconds"),
+            "nombre": estadistica.nombre,
+            "sql": estadistica.sql,
+            "ms": round(segundos * 1000, 3),
+            "filas": filas,
+            "plan": plan,
+        })
+        logger.warning("Consulta lenta (%.1f ms, %d filas) %s: %s | plan: %s", segundos * 1000, filas,
+                       estadistica.nombre or "-", estadistica.sql, "; ".join(plan or ()))
+
+    def registrar_error(self, sql):
+        """Cuenta una ejecución fallida de la sentencia."""
+        with self._lock:
+            self._estadistica(sql).errores += 1
+
+    @staticmethod
+    def plan(conn, sql, parametros=()):
+        """Retorna las líneas de EXPLAIN QUERY PLAN, o None si no se pudo obtener."""
+        try:
+            # Cursor de sqlite3 sin medición, para no registrar la propia consulta del plan
+            cursor = sqlite3.Cursor(conn)
+            return [fila[3] for fila in cursor.execute("EXPLAIN QUERY PLAN " + sql, parametros)]
+        except (sqlite3.Error, ValueError):
+            return None
+
+    def resumen(self):
+        """Retorna las estadísticas como diccionario, con las sentencias de mayor tiempo total primero."""
+        with self._lock:
+            estadisticas = {id(e): e for e in self._sentencias.values()}.values()
+            sentencias = [e.como_dict() for e in sorted(estadisticas, key=lambda e: e.total, reverse=True)]
+            lentas = list(self.lentas)
+        return {
+            "maquina": datos_maquina(),
+            "inicio": self.inicio.isoformat(timespec="seconds"),
+            "fin": datetime.now().isoformat(timespec="seconds"),
+            "umbral_lento_ms": self.umbral_lento * 1000,
+            "sentencias": sentencias,
+            "lentas": lentas,
+        }
+
+    def exportar_json(self, ruta=None):
+        """Escribe el resumen en un archivo JSON (por defecto self.ruta) y retorna la ruta usada."""
+        ruta = ruta or self.ruta
+        temporal = ruta + ".parcial"
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(self.resumen(), archivo, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
+        return ruta
+
+    def registrar_en_log(self, nivel=logging.INFO):
+        """Escribe una línea JSON por sentencia en el log, para recolectarlas con el resto de los registros."""
+        for sentencia in self.resumen()["sentencias"]:
+            logger.log(nivel, "estadistica_sql %s", json.dumps(sentencia, ensure_ascii=False))
+
+def monitor_desde_entorno():
+    """Crea un MonitorSQL si PARTICIPANTES_SQL_ESTADISTICAS está definida; si no, retorna None."""
+    ruta = os.environ.get("PARTICIPANTES_SQL_ESTADISTICAS")
+    if not ruta:
+        return None
+    umbral = float(os.environ.get("PARTICIPANTES_SQL_LENTO_MS", "100")) / 1000
+    return MonitorSQL(umbral_lento=umbral, ruta=ruta)
+
+class CursorMedido(sqlite3.Cursor):
+    """
+    Cursor que mide cada sentencia. Para las consultas el tiempo incluye la lectura de las filas,
+    y la medición se registra cuando se agotan, se ejecuta otra sentencia o se cierra el cursor.
+    """
+    def __init__(self, conn):
+        super().__init__(conn)
+        self._medicion = None   # [sql, parametros, segundos, filas] de la consulta en lectura
+
+    def execute(self, sql, parameters=()):
+        self._termina()
+        monitor = self.connection.monitor
+        inicio = perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except sqlite3.Error:
+            monitor.registrar_error(sql)
+            raise
+        segundos = perf_counter() - inicio
+        if self.description is None:
+            monitor.registrar(sql, segundos, max(self.rowcount, 0), self.connection, parameters)
+        else:
+            self._medicion = [sql, parameters, segundos, 0]
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._termina()
+        monitor = self.connection.monitor
+        # Los parámetros pueden ser un generador: se guarda el primer juego para el plan de una sentencia lenta
+        parametros = iter(seq_of_parameters)
+        primeros = next(parametros, None)
+        inicio = perf_counter()
+        try:
+            super().executemany(sql, parametros if primeros is None else chain((primeros,), parametros))
+        except sqlite3.Error:
+            monitor.registrar_error(sql)
+            raise
+        monitor.registrar(sql, perf_counter() - inicio, max(self.rowcount, 0), self.connection,
+                          () if primeros is None else primeros)
+        return self
+
+    def _acumula(self, segundos, filas, agotado):
+        medicion = self._medicion
+        if medicion is not None:
+            medicion[2] += segundos
+            medicion[3] += filas
+            if agotado:
+                self._termina()
+
+    def _termina(self):
+        medicion, self._medicion = self._medicion, None
+        if medicion is not None:
+            sql, parametros, segundos, filas = medicion
+            self.connection.monitor.registrar(sql, segundos, filas, self.connection, parametros)
+
+    def fetchone(self):
+        inicio = perf_counter()
+        fila = super().fetchone()
+        self._acumula(perf_counter() - inicio, fila is not None, fila is None)
+        return fila
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        inicio = perf_counter()
+        filas = super().fetchmany(size)
+        self._acumula(perf_counter() - inicio, len(filas), len(filas) < size)
+        return filas
+
+    def fetchall(self):
+        inicio = perf_counter()
+        filas = super().fetchall()
+        self._acumula(perf_counter() - inicio, len(filas), True)
+        return filas
+
+    def __next__(self):
+        inicio = perf_counter()
+        try:
+            fila = super().__next__()
+        except StopIteration:
+            self._acumula(perf_counter() - inicio, 0, True)
+            raise
+        self._acumula(perf_counter() - inicio, 1, False)
+        return fila
+
+    def close(self):
+        self._termina()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._termina()
+        except Exception:
+            pass
+
+class ConexionMedida(sqlite3.Connection):
+    """Conexión cuyos cursores (incluidos los de execute) son CursorMedido."""
+    monitor = None
+
+    def cursor(self, factory=CursorMedido):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
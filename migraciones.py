@@ -0,0 +1,266 @@
+# migraciones.py
+"""
+Migraciones versionadas del esquema de Participantes.db.
+La versión del esquema se guarda en PRAGMA user_version; cada migración se aplica
+una sola vez, en orden y dentro de su propia transacción, por lo que una base de datos
+existente se actualiza en su lugar sin perder información.
+
+Uso desde la línea de comandos:
+    python migraciones.py ruta/Participantes.db [--verificar]
+"""
+import logging
+import sqlite3
+import sys
+from colacion import expresion_clave
+from consultas import (SQL_PAGINA, SQL_PAGINA_BUSQUEDA, SQL_TOTAL_BUSQUEDA, SQL_CONSULTA_ID, SQL_CAMBIOS_DESDE,
+                       ORDEN_LISTADO, sql_pagina_ordenada)
+
+logger = logging.getLogger(__name__)
+
+def sentencias_resumen(columnas):
+    """
+    Sentencias de la migración 6: la tabla t_resumen con el número de participantes por cada valor
+    de las columnas indicadas, sus triggers y su carga inicial. Un valor NULL se cuenta como ''.
+    Cada trigger toca una fila de t_resumen por columna y la fila de un valor se borra al llegar a cero,
+    por lo que leer el resumen cuesta tantas filas como valores distintos haya, no como participantes.
+    """
+    suma = """INSERT INTO t_resumen (Dimension, Valor, Cantidad) VALUES ('{c}', COALESCE(new.{c}, ''), 1)
+                ON CONFLICT (Dimension, Valor) DO UPDATE SET Cantidad = Cantidad + 1;"""
+    resta = """UPDATE t_resumen SET Cantidad = Cantidad - 1 WHERE Dimension = '{c}' AND Valor = COALESCE(old.{c}, '');
+            DELETE FROM t_resumen WHERE Dimension = '{c}' AND Valor = COALESCE(old.{c}, '') AND Cantidad <= 0;"""
+    sentencias = [
+        '''CREATE TABLE IF NOT EXISTS t_resumen (
+            Dimension TEXT NOT NULL,
+            Valor TEXT NOT NULL,
+            Cantidad INTEGER NOT NULL,
+            PRIMARY KEY (Dimension, Valor)
+        ) WITHOUT ROWID''',
+        "CREATE TRIGGER IF NOT EXISTS trg_participantes_resumen_ai AFTER INSERT ON t_participantes BEGIN\n            "
+        + "\n            ".join(suma.format(c=c) for c in columnas) + "\n        END",
+        "CREATE TRIGGER IF NOT EXISTS trg_participantes_resumen_ad AFTER DELETE ON t_participantes BEGIN\n            "
+        + "\n            ".join(resta.format(c=c) for c in columnas) + "\n        END",
+    ]
+    for c in columnas:
+        # Un trigger por columna: los upsert asignan todas las columnas, pero solo cuenta un valor distinto
+        sentencias.append(f'''CREATE TRIGGER IF NOT EXISTS trg_participantes_resumen_au_{c.lower()}
+            AFTER UPDATE OF {c} ON t_participantes WHEN old.{c} IS NOT new.{c} BEGIN
+            {resta.format(c=c)}
+            {suma.format(c=c)}
+        END''')
+        # Cuenta los participantes que ya existían antes de la migración
+        sentencias.append(f'''INSERT INTO t_resumen (Dimension, Valor, Cantidad)
+            SELECT '{c}', COALESCE({c}, ''), COUNT(*) FROM t_participantes GROUP BY 2''')
+    return sentencias
+
+def sentencias_claves_orden(columnas_texto):
+    """
+    Sentencias de la migración 5: columnas generadas Orden_<columna> con la clave de orden del listado
+    (ver consultas.ORDEN_LISTADO) y un índice (Orden_<columna>, Id) para cada una. Las claves son texto
+    comparado en binario y nunca NULL, por lo que la paginación keyset recorre también las filas sin valor
+    y ninguna conexión necesita registrar una colación para escribir o verificar la base.
+    """
+    sentencias = []
+    # VIRTUAL: la clave se calcula al leer la fila; solo el índice la guarda
+    claves = {c: expresion_clave(c) for c in columnas_texto}
+    claves["Fecha"] = "COALESCE(substr(Fecha, 7, 4) || substr(Fecha, 4, 2) || substr(Fecha, 1, 2), '')"
+    for c, expresion in claves.items():
+        sentencias.append(f"ALTER TABLE t_participantes ADD COLUMN Orden_{c} TEXT GENERATED ALWAYS AS ({expresion}) VIRTUAL")
+        sentencias.append(f"CREATE INDEX IF NOT EXISTS idx_participantes_orden_{c.lower()} ON t_participantes (Orden_{c}, Id)")
+    return sentencias
+
+# Lista ordenada de migraciones: (versión, descripción, sentencias)
+MIGRACIONES = [
+    (1, "Esquema base de ciudades y participantes", [
+        '''CREATE TABLE IF NOT EXISTS t_ciudades (
+            Id_Departamento INTEGER NOT NULL,
+            Id_Ciudad INTEGER NOT NULL,
+            Nombre_Departamento TEXT,
+            Nombre_Ciudad TEXT,
+            PRIMARY KEY (Id_Ciudad)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS t_participantes (
+            Id INTEGER NOT NULL UNIQUE,
+            Nombre VARCHAR(45),
+            "Dirección" VARCHAR(45),
+            Celular VARCHAR(45),
+            Entidad VARCHAR(45),
+            Fecha DATE,
+            Ciudad VARCHAR(45),
+            PRIMARY KEY(Id)
+        )''',
+    ]),
+    (2, "Índices para la búsqueda de departamento por ciudad y de ciudades por departamento", [
+        # Conserva el orden por rowid entre ciudades homónimas, igual que la subconsulta con LIMIT 1
+        "CREATE INDEX IF NOT EXISTS idx_ciudades_nombre_ciudad ON t_ciudades (Nombre_Ciudad)",
+        "CREATE INDEX IF NOT EXISTS idx_ciudades_departamento ON t_ciudades (Nombre_Departamento, Nombre_Ciudad)",
+        "ANALYZE t_ciudades",
+    ]),
+    (3, "Índice de texto completo (FTS5) de participantes sincronizado por triggers", [
+        # Tabla de contenido externo: el texto vive en t_participantes, el índice solo guarda los términos.
+        # remove_diacritics permite encontrar 'Martínez' escribiendo 'martinez'; prefix acelera 'mar*'
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS t_participantes_fts USING fts5(
+            Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad,
+            content='t_participantes', content_rowid='Id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_participantes_fts_ai AFTER INSERT ON t_participantes BEGIN
+            INSERT INTO t_participantes_fts (rowid, Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+            VALUES (new.Id, new.Id, new.Nombre, new."Dirección", new.Celular, new.Entidad, new.Fecha, new.Ciudad);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_participantes_fts_ad AFTER DELETE ON t_participantes BEGIN
+            INSERT INTO t_participantes_fts (t_participantes_fts, rowid, Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+            VALUES ('delete', old.Id, old.Id, old.Nombre, old."Dirección", old.Celular, old.Entidad, old.Fecha, old.Ciudad);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_participantes_fts_au AFTER UPDATE ON t_participantes BEGIN
+            INSERT INTO t_participantes_fts (t_participantes_fts, rowid, Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+            VALUES ('delete', old.Id, old.Id, old.Nombre, old."Dirección", old.Celular, old.Entidad, old.Fecha, old.Ciudad);
+            INSERT INTO t_participantes_fts (rowid, Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+            VALUES (new.Id, new.Id, new.Nombre, new."Dirección", new.Celular, new.Entidad, new.Fecha, new.Ciudad);
+        END''',
+        # Indexa los participantes que ya existían antes de la migración
+        "INSERT INTO t_participantes_fts (t_participantes_fts) VALUES ('rebuild')",
+    ]),
+    (4, "Tabla de metadatos (huella del archivo de ciudades cargado, marcas de agua)", [
+        '''CREATE TABLE IF NOT EXISTS t_metadatos (
+            Clave TEXT NOT NULL PRIMARY KEY,
+            Valor TEXT
+        )''',
+    ]),
+    (5, "Claves de orden del listado en columnas generadas con índice binario",
+        sentencias_claves_orden(("Nombre", "Entidad", "Ciudad"))),
+    (6, "Resumen de participantes por ciudad, entidad y fecha mantenido por triggers",
+        sentencias_resumen(("Ciudad", "Entidad", "Fecha"))),
+    (7, "Registro de cambios de participantes para exportaciones incrementales", [
+        # AUTOINCREMENT: la secuencia nunca se reutiliza, aunque se borren entradas antiguas
+        '''CREATE TABLE IF NOT EXISTS t_cambios (
+            Secuencia INTEGER PRIMARY KEY AUTOINCREMENT,
+            Operacion TEXT NOT NULL,
+            Id INTEGER NOT NULL,
+            Momento TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+        )''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_participantes_cambios_ai AFTER INSERT ON t_participantes BEGIN
+            INSERT INTO t_cambios (Operacion, Id) VALUES ('I', new.Id);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS trg_participantes_cambios_ad AFTER DELETE ON t_participantes BEGIN
+            INSERT INTO t_cambios (Operacion, Id) VALUES ('D', old.Id);
+        END''',
+        # Un upsert que deja los mismos valores no es un cambio
+        '''CREATE TRIGGER IF NOT EXISTS trg_participantes_cambios_au AFTER UPDATE ON t_participantes
+            WHEN old.Id IS NOT new.Id OR old.Nombre IS NOT new.Nombre OR old."Dirección" IS NOT new."Dirección"
+                 OR old.Celular IS NOT new.Celular OR old.Entidad IS NOT new.Entidad
+                 OR old.Fecha IS NOT new.Fecha OR old.Ciudad IS NOT new.Ciudad BEGIN
+            INSERT INTO t_cambios (Operacion, Id) SELECT 'D', old.Id WHERE old.Id <> new.Id;
+            INSERT INTO t_cambios (Operacion, Id) VALUES (CASE WHEN old.Id = new.Id THEN 'U' ELSE 'I' END, new.Id);
+        END''',
+        # Los participantes existentes cuentan como altas: exportar desde la marca 0 entrega todo
+        "INSERT INTO t_cambios (Operacion, Id) SELECT 'I', Id FROM t_participantes ORDER BY Id",
+    ])
+]
+
+# Consultas frecuentes y tablas que nunca deben recorrerse completas en su plan.
+# El listado completo (SQL_LISTADO) no se vigila: la exportación lo recorre entero a propósito
+PLANES_VIGILADOS = [
+    ("página del listado", SQL_PAGINA, (0, 100), ("p",)),
+    ("página de búsqueda", SQL_PAGINA_BUSQUEDA, ('"x"*', 0, 100), ("p", "t_participantes_fts")),
+    ("total de la búsqueda", SQL_TOTAL_BUSQUEDA, ('"x"*',), ("t_participantes_fts",)),
+    ("consulta por Id", SQL_CONSULTA_ID, (0,), ("p",)),
+    ("cambios desde una marca", SQL_CAMBIOS_DESDE, (0,), ("t_cambios", "c", "p")),
+] + [
+    (f"página ordenada por {columna}{' (descendente)' if descendente else ''}",
+     sql_pagina_ordenada(columna, descendente), ("", "", 0, 100), ("p",))
+    for columna in ORDEN_LISTADO for descendente in (False, True)
+] + [
+    (f"búsqueda ordenada por {columna}", sql_pagina_ordenada(columna, busqueda=True),
+     ('"x"*', "", "", 0, 100), ("p", "t_participantes_fts"))
+    for columna in ORDEN_LISTADO
+]
+
+def version_esquema(conn):
+    """Retorna la versión actual del esquema (PRAGMA user_version)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def version_objetivo():
+    """Retorna la versión más reciente que conoce esta aplicación."""
+    return MIGRACIONES[-1][0]
+
+def aplicar_migraciones(conn):
+    """
+    Aplica en orden las migraciones pendientes.
+    Retorna la lista de versiones aplicadas (vacía si el esquema ya estaba al día).
+    """
+    actual = version_esquema(conn)
+    if actual > version_objetivo():
+        raise sqlite3.DatabaseError(
+            f"La base de datos tiene la versión de esquema {actual}, más reciente que "
+            f"la soportada por la aplicación ({version_objetivo()}).")
+    if conn.in_transaction:
+        conn.commit()
+    aplicadas = []
+    for version, descripcion, sentencias in MIGRACIONES:
+        if version <= actual:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sentencia in sentencias:
+                conn.execute(sentencia)
+            # PRAGMA user_version es transaccional: se confirma junto con la migración
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        conn.commit()
+        logger.info("Migración %s aplicada: %s", version, descripcion)
+        aplicadas.append(version)
+    return aplicadas
+
+def plan_consulta(conn, query, parametros=()):
+    """Retorna las líneas de detalle de EXPLAIN QUERY PLAN para una consulta."""
+    return [fila[3] for fila in conn.execute("EXPLAIN QUERY PLAN " + query, parametros)]
+
+def es_recorrido_completo(detalle, tabla):
+    """
+    Indica si una línea del plan recorre toda la tabla sin ayuda de un índice.
+    Un recorrido sobre un índice de cobertura ('USING COVERING INDEX') se acepta. En una tabla virtual
+    (el índice FTS5) el recorrido es completo cuando no usa ninguna restricción: 'VIRTUAL TABLE INDEX 0:'.
+    """
+    if detalle.startswith(f"SCAN {tabla} VIRTUAL TABLE INDEX "):
+        return detalle.endswith(":")
+    return detalle == f"SCAN {tabla}" or (detalle.startswith(f"SCAN {tabla} ") and " USING " not in detalle)
+
+def verificar_planes(conn):
+    """
+    Revisa el plan de cada consulta vigilada.
+    Retorna una lista de tuplas (nombre, detalle) con los recorridos completos encontrados.
+    """
+    problemas = []
+    for nombre, query, parametros, tablas in PLANES_VIGILADOS:
+        for detalle in plan_consulta(conn, query, parametros):
+            if any(es_recorrido_completo(detalle, tabla) for tabla in tablas):
+                problemas.append((nombre, detalle))
+    return problemas
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    argv = sys.argv[1:] if argv is None else argv
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if not argv:
+        print("Uso: python migraciones.py ruta/Participantes.db [--verificar]")
+        return 2
+    conn = sqlite3.connect(argv[0])
+    try:
+        print(f"Versión de esquema inicial: {version_esquema(conn)}")
+        aplicar_migraciones(conn)
+        print(f"Versión de esquema final: {version_esquema(conn)}")
+        if "--verificar" in argv:
+            problemas = verificar_planes(conn)
+            for nombre, detalle in problemas:
+                print(f"Recorrido completo en '{nombre}': {detalle}")
+            if problemas:
+                return 1
+            print("Planes de consulta verificados: sin recorridos completos.")
+        return 0
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
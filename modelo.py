@@ -0,0 +1,148 @@
+# modelo.py
+"""
+Representación en memoria de los participantes cargados en la aplicación.
+Cada participante es un objeto con __slots__ (sin diccionario por instancia) y los valores
+que se repiten mucho entre participantes (ciudad, entidad, fecha) se comparten en lugar de
+guardar una copia por fila. El almacén los indexa por Id y mantiene el orden del listado.
+"""
+import sys
+
+# Campos de t_participantes en el orden de las consultas (ver consultas.COLUMNAS_LISTADO)
+CAMPOS = ("Id", "Nombre", "Dirección", "Celular", "Entidad", "Fecha", "Ciudad")
+
+class Participante:
+    """Un participante, con los mismos campos y en el mismo orden que t_participantes."""
+    __slots__ = ("id", "nombre", "direccion", "celular", "entidad", "fecha", "ciudad")
+
+    def __init__(self, id_participante, nombre, direccion, celular, entidad, fecha, ciudad):
+        self.id = id_participante
+        self.nombre = nombre
+        self.direccion = direccion
+        self.celular = celular
+        # Pocos valores distintos: se comparte una sola copia de cada texto
+        self.entidad = sys.intern(entidad) if isinstance(entidad, str) else entidad
+        self.fecha = sys.intern(fecha) if isinstance(fecha, str) else fecha
+        self.ciudad = sys.intern(ciudad) if isinstance(ciudad, str) else ciudad
+
+    @classmethod
+    def desde_fila(cls, fila):
+        """Crea el participante a partir de una fila (Id, Nombre, Dirección, Celular, Entidad, Fecha, Ciudad)."""
+        return cls(*fila)
+
+    def como_fila(self):
+        """Retorna la tupla en el orden de t_participantes."""
+        return (self.id, self.nombre, self.direccion, self.celular, self.entidad, self.fecha, self.ciudad)
+
+    def __eq__(self, otro):
+        return isinstance(otro, Participante) and self.como_fila() == otro.como_fila()
+
+    def __repr__(self):
+        return f"Participante{self.como_fila()!r}"
+
+class AlmacenParticipantes:
+    """
+    Participantes cargados en el listado, indexados por Id (búsqueda O(1))
+    y con la lista de Id en el orden en que se muestran: por Id ascendente o según la función
+    de orden indicada en ordena(). La clave de orden de cada participante se calcula una sola vez
+    y se guarda junto a su Id, para ubicar altas y cambios con búsqueda binaria.
+    """
+    def __init__(self):
+        self._por_id = {}
+        self.ids = []
+        self._claves = []       # Clave de orden de cada Id de self.ids, en el mismo orden
+        self.clave = None       # función(fila) -> clave de orden; None ordena por Id
+        self.descendente = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, id_participante):
+        return id_participante in self._por_id
+
+    def obtener(self, id_participante):
+        """Retorna el participante con ese Id, o None si no está cargado."""
+        return self._por_id.get(id_participante)
+
+    def limpia(self):
+        """Descarta todos los participantes."""
+        self._por_id = {}
+        self.ids = []
+        self._claves = []
+
+    def ordena(self, clave=None, descendente=False):
+        """
+        Cambia el orden del listado: clave(fila) retorna la clave de orden de una fila (None para ordenar por Id).
+        Descarta los participantes, que se vuelven a leer en el nuevo orden.
+        """
+        self.clave = clave
+        self.descendente = descendente
+        self.limpia()
+
+    def clave_de(self, fila):
+        """Clave de orden de una fila (Id, Nombre, ..., Ciudad) en el orden actual."""
+        return fila[0] if self.clave is None else self.clave(fila)
+
+    def posicion(self, clave):
+        """Posición que le corresponde a la clave en el orden en que se muestran los participantes."""
+        claves = self._claves
+        inicio, fin = 0, len(claves)
+        while inicio < fin:
+            medio = (inicio + fin) // 2
+            if (claves[medio] > clave) if self.descendente else (claves[medio] < clave):
+                inicio = medio + 1
+            else:
+                fin = medio
+        return inicio
+
+    def agrega_filas(self, filas):
+        """
+        Agrega al final filas leídas en el orden del listado (una página).
+        Retorna los participantes creados.
+        """
+        participantes = [Participante.desde_fila(fila) for fila in filas]
+        for fila, participante in zip(filas, participantes):
+            self._por_id[participante.id] = participante
+            self.ids.append(participante.id)
+            self._claves.append(self.clave_de(fila))
+        return participantes
+
+    def reemplaza(self, fila):
+        """
+        Actualiza los datos de un participante ya cargado.
+        Retorna la tupla (participante, posición): la nueva posición si el cambio lo movió
+        dentro del orden actual, o None si conserva la suya.
+        """
+        participante = Participante.desde_fila(fila)
+        anterior = self._por_id[participante.id]
+        self._por_id[participante.id] = participante
+        clave_anterior, clave = self.clave_de(anterior.como_fila()), self.clave_de(fila)
+        if clave == clave_anterior:
+            return participante, None
+        actual = self.posicion(clave_anterior)
+        del self.ids[actual], self._claves[actual]
+        posicion = self.posicion(clave)
+        self.ids.insert(posicion, participante.id)
+        self._claves.insert(posicion, clave)
+        return participante, posicion
+
+    def inserta(self, fila):
+        """
+        Agrega un participante en la posición que le corresponde en el orden actual.
+        Retorna la tupla (participante, posición).
+        """
+        participante = Participante.desde_fila(fila)
+        clave = self.clave_de(fila)
+        posicion = self.posicion(clave)
+        self.ids.insert(posicion, participante.id)
+        self._claves.insert(posicion, clave)
+        self._por_id[participante.id] = participante
+        return participante, posicion
+
+    def quita(self, ids):
+        """Quita los participantes indicados que estén cargados y retorna cuántos se quitaron."""
+        quitados = {i for i in ids if self._por_id.pop(i, None) is not None}
+        if quitados:
+            conservados = [(i, clave) for i, clave in zip(self.ids, self._claves) if i not in quitados]
+            self.ids = [i for i, _ in conservados]
+            self._claves = [clave for _, clave in conservados]
+        return len(quitados)
@@ -0,0 +1,180 @@
+# nucleo.py
+"""
+Lógica de negocio de los participantes, independiente de la interfaz.
+La usan la aplicación de escritorio (Proyecto_poo.py), el servicio HTTP (servidor_api.py)
+y cualquier script: registro, consulta, búsqueda, eliminación, exportación, importación y respaldos.
+"""
+from datetime import datetime
+from busqueda import expresion_fts
+from colacion import clave_es
+from exportacion import ENCABEZADO, exportar_cambios, exportar_csv
+from gazetteer import Gazetteer
+from importacion import COLUMNAS, importar_csv, valida_fila
+from indice_ids import IndiceIds
+from migraciones import aplicar_migraciones
+from paginacion import PaginadorKeyset
+from repositorio import ParticipantRepository
+from respaldo import respaldar
+
+class ErrorValidacion(ValueError):
+    """Los datos de un participante no cumplen las reglas de validación."""
+
+class ServicioParticipantes:
+    """
+    Operaciones sobre los participantes a través de un DatabaseHandler.
+    Es seguro usarlo desde varios hilos: cada hilo lee con su propia conexión y las
+    escrituras se serializan en DatabaseHandler.transaction().
+    """
+    def __init__(self, db_handler, gazetteer=None, escritor=None):
+        self.db_handler = db_handler
+        self.gazetteer = gazetteer if gazetteer is not None else Gazetteer(db_handler)
+        self.repositorio = ParticipantRepository(db_handler)
+        # escritor.EscritorAgrupado: si se indica, los registros se graban por lotes en su hilo
+        self.escritor = escritor
+
+    def preparar(self):
+        """Aplica las migraciones pendientes y carga las ciudades. Retorna True si las ciudades se cargaron."""
+        aplicar_migraciones(self.db_handler.connect())
+        return self.gazetteer.cargar()
+
+    # --- Validación y conversión ---
+
+    def parametros(self, id_participante, nombre, direccion, celular, entidad, fecha, ciudad=None):
+        """Convierte los datos a los tipos de la tabla (ver ParticipantRepository.parametros)."""
+        return self.repositorio.parametros(id_participante, nombre, direccion, celular, entidad, fecha, ciudad)
+
+    def validar(self, datos, hoy=None):
+        """
+        Valida un diccionario con las claves de COLUMNAS (y opcionalmente 'Departamento')
+        con las mismas reglas de la importación masiva.
+        Retorna los parámetros para guardar() o lanza ErrorValidacion con el motivo.
+        """
+        fila = {c: str(datos.get(c) if datos.get(c) is not None else "").strip() for c in COLUMNAS}
+        if datos.get("Departamento"):
+            fila["Departamento"] = str(datos["Departamento"]).strip()
+        parametros, motivo = valida_fila(fila, self.gazetteer, hoy or datetime.today().date())
+        if motivo:
+            raise ErrorValidacion(motivo)
+        return parametros
+
+    def como_dict(self, fila):
+        """Convierte una fila (Id, Nombre, ..., Ciudad) en diccionario, agregando el departamento."""
+        return dict(zip(ENCABEZADO, fila + (self.gazetteer.departamento_de(fila[6]),)))
+
+    # --- Lectura ---
+
+    def obtener(self, id_participante):
+        """Retorna la fila del participante, o None si no existe."""
+        return self.repositorio.obtener(id_participante)
+
+    def indice_ids(self):
+        """Retorna un IndiceIds con los Id de todos los participantes, para buscarlos por prefijo."""
+        return IndiceIds(self.repositorio.ids(), ordenados=True)
+
+    def paginador(self, texto=None, tamano_pagina=200, despues_de=-1, orden=None, descendente=False):
+        """
+        Retorna un PaginadorKeyset sobre todos los participantes o, si el texto contiene algún término,
+        sobre los que coinciden con la búsqueda de texto completo. Empieza después del Id indicado.
+        Con orden (una columna de consultas.ORDEN_LISTADO) las páginas siguen ese orden en español.
+        """
+        paginador = PaginadorKeyset(self.db_handler, tamano_pagina, expresion_fts(texto) if texto else None,
+                                    orden, descendente)
+        paginador.ultimo_id = despues_de
+        return paginador
+
+    def pagina(self, texto=None, despues_de=-1, limite=200):
+        """
+        Retorna la tupla (filas, siguiente): una página de participantes ordenada por Id y el Id
+        desde el que continúa la página siguiente (None si no hay más).
+        Lanza ValueError si la consulta falla.
+        """
+        paginador = self.paginador(texto, limite, despues_de)
+        filas = paginador.siguiente_pagina()
+        if filas is None:
+            raise ValueError("No se pudo leer los participantes.")
+        return filas, (None if paginador.agotado else paginador.ultimo_id)
+
+    def coincide(self, expresion, id_participante):
+        """Indica si el participante coincide con la expresión MATCH de una búsqueda."""
+        return self.repositorio.coincide(expresion, id_participante)
+
+    def coincidencias(self, expresion, ids):
+        """Retorna el conjunto de Id, entre los indicados, que coinciden con la expresión MATCH."""
+        return self.repositorio.coincidencias(expresion, ids)
+
+    def estadisticas(self):
+        """
+        Retorna el número de participantes por Departamento, Ciudad, Entidad y Fecha, como diccionario
+        columna -> lista de pares (valor, cantidad): las fechas en orden cronológico y el resto de mayor
+        a menor cantidad. Lee las tablas de resumen, por lo que el costo depende del número de valores
+        distintos y no del de participantes; el departamento se obtiene sumando sus ciudades.
+        """
+        resumen = self.repositorio.resumen()
+        por_ciudad = resumen.get("Ciudad", {})
+        por_departamento = {}
+        for ciudad, cantidad in por_ciudad.items():
+            departamento = self.gazetteer.departamento_de(ciudad)
+            por_departamento[departamento] = por_departamento.get(departamento, 0) + cantidad
+
+        def por_cantidad(conteo):
+            return sorted(conteo.items(), key=lambda par: (-par[1], clave_es(par[0])))
+
+        # Fechas dd/mm/aaaa comparadas como aaaammdd
+        return {
+            "Departamento": por_cantidad(por_departamento),
+            "Ciudad": por_cantidad(por_ciudad),
+            "Entidad": por_cantidad(resumen.get("Entidad", {})),
+            "Fecha": sorted(resumen.get("Fecha", {}).items(), key=lambda par: par[0][6:10] + par[0][3:5] + par[0][:2]),
+        }
+
+    def departamentos(self):
+        """Retorna la lista ordenada de departamentos, o None si no se pudo cargar."""
+        return self.gazetteer.departamentos()
+
+    def ciudades(self, departamento):
+        """Retorna la lista ordenada de municipios del departamento, o None si no se pudo cargar."""
+        return self.gazetteer.ciudades(departamento)
+
+    # --- Escritura ---
+
+    def guardar(self, parametros, sobrescribir=True):
+        """
+        Graba un participante ya convertido con parametros() o validar().
+        Retorna (fila, creado); fila es None si sobrescribir=False y el Id ya existía.
+        Con escritor, la grabación espera su turno en la cola y se confirma junto con las demás pendientes.
+        """
+        if self.escritor is not None:
+            return self.escritor.ejecutar(self.repositorio.graba, tuple(parametros), sobrescribir)
+        return self.repositorio.guardar(*parametros, sobrescribir=sobrescribir)
+
+    def eliminar(self, ids):
+        """Elimina los participantes indicados en una sola transacción y retorna las filas eliminadas."""
+        return self.repositorio.eliminar(ids)
+
+    def restaurar(self, filas):
+        """Vuelve a insertar filas eliminadas en una sola transacción."""
+        self.repositorio.restaurar(filas)
+
+    # --- Archivos ---
+
+    def exportar(self, ruta, comprimir=None, progreso=None, cancelado=None):
+        """Exporta todos los participantes a CSV. Retorna (filas_escritas, completo)."""
+        return exportar_csv(self.db_handler, self.gazetteer, ruta, comprimir, 1000, progreso, cancelado)
+
+    def exportar_cambios(self, ruta, consumidor="exportacion", desde=None, cancelado=None):
+        """
+        Exporta a CSV o JSON Lines solo los participantes que cambiaron desde la última exportación
+        del consumidor (o desde la marca indicada) y guarda la nueva marca. Retorna (cambios, marca, completo).
+        """
+        return exportar_cambios(self.db_handler, self.gazetteer, ruta, consumidor, desde, cancelado=cancelado)
+
+    def importar(self, ruta, progreso=None, cancelado=None):
+        """Importa participantes desde un CSV. Retorna (leidas, importadas, rechazadas, completo)."""
+        return importar_csv(self.db_handler, self.gazetteer, ruta, None, 5000, progreso, cancelado)
+
+    def respaldar(self, carpeta=None, conservar=10, progreso=None, cancelado=None):
+        """
+        Crea un respaldo verificado de la base sin detener los registros y conserva los 'conservar'
+        más recientes (ver respaldo.py). Retorna la ruta del respaldo, o None si se canceló.
+        """
+        return respaldar(self.db_handler.db_path, carpeta, conservar, progreso, cancelado)
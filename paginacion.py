@@ -0,0 +1,114 @@
+# paginacion.py
+"""
+Lectura paginada del listado de participantes.
+En lugar de cargar toda la tabla, se leen páginas de tamaño fijo ordenadas por Id (o por una
+columna de consultas.ORDEN_LISTADO y luego por Id), usando como punto de partida la última
+fila de la página anterior (paginación keyset).
+"""
+from colacion import clave_indice
+from consultas import SQL_PAGINA, SQL_PAGINA_BUSQUEDA, SQL_TOTAL, SQL_TOTAL_BUSQUEDA, sql_pagina_ordenada
+from modelo import CAMPOS
+
+def valor_orden(columna, fila):
+    """
+    Valor de la fila que compara el ORDER BY de la columna (ver consultas.ORDEN_LISTADO), igual al de
+    su columna generada: el texto normalizado (colacion.clave_indice) o la fecha como aaaammdd, y '' si es NULL.
+    Una fecha guardada como número (la afinidad DATE convierte '2026' en 2026) se toma como su texto, igual que substr().
+    """
+    valor = fila[CAMPOS.index(columna)]
+    if columna == "Fecha":
+        if valor is None:
+            return ""
+        valor = str(valor)
+        return valor[6:10] + valor[3:5] + valor[0:2]
+    if columna in ("Nombre", "Entidad", "Ciudad"):
+        return clave_indice(valor)
+    return valor
+
+def clave_orden(columna, fila):
+    """Clave de orden en Python equivalente al ORDER BY de la columna seguido de Id."""
+    return (valor_orden(columna, fila), fila[0])
+
+class PaginadorKeyset:
+    """
+    Recorre t_participantes por páginas, opcionalmente filtrado por una expresión FTS5
+    y ordenado por una columna de consultas.ORDEN_LISTADO (por Id si no se indica).
+    """
+    def __init__(self, db_handler, tamano_pagina=200, expresion=None, orden=None, descendente=False):
+        self.db_handler = db_handler
+        self.tamano_pagina = tamano_pagina
+        self.expresion = expresion  # Expresión MATCH de busqueda.expresion_fts(), o None para todos
+        self.orden = orden          # Columna de ORDEN_LISTADO, o None para ordenar por Id ascendente
+        self.descendente = descendente
+        self.ultimo_id = -1         # Los Id son números de identificación positivos
+        self.ultima_fila = None     # Última fila leída (punto de partida con orden)
+        self.agotado = False
+
+    def clave(self, fila):
+        """Clave de orden de una fila en el orden de este paginador."""
+        return clave_orden(self.orden, fila) if self.orden else fila[0]
+
+    def cargada(self, fila):
+        """
+        Indica si la fila cae en la parte del listado ya leída, es decir, si en el orden del paginador
+        no está después de la última fila leída (si lo está, llegará con una página siguiente).
+        """
+        if self.agotado:
+            return True
+        if self.orden is None:
+            return fila[0] <= self.ultimo_id
+        if self.ultima_fila is None:
+            return False
+        clave, ultima = self.clave(fila), self.clave(self.ultima_fila)
+        return clave >= ultima if self.descendente else clave <= ultima
+
+    def total(self):
+        """
+        Retorna el número total de participantes (o de coincidencias) sin leer las filas.
+        Retorna None si la consulta falla.
+        """
+        if self.expresion:
+            filas = self.db_handler.fetch_all(SQL_TOTAL_BUSQUEDA, (self.expresion,))
+        else:
+            filas = self.db_handler.fetch_all(SQL_TOTAL)
+        return filas[0][0] if filas else None
+
+    def siguiente_pagina(self):
+        """
+        Retorna la siguiente página de filas (lista vacía si ya no hay más).
+        Retorna None si la consulta falla.
+        """
+        if self.agotado:
+            return []
+        if self.orden is not None:
+            return self.siguiente_pagina_ordenada()
+        if self.expresion:
+            filas = self.db_handler.fetch_all(SQL_PAGINA_BUSQUEDA,
+                                              (self.expresion, self.ultimo_id, self.tamano_pagina))
+        else:
+            filas = self.db_handler.fetch_all(SQL_PAGINA, (self.ultimo_id, self.tamano_pagina))
+        if filas is None:
+            return None
+        if len(filas) < self.tamano_pagina:
+            self.agotado = True
+        if filas:
+            self.ultimo_id = filas[-1][0]
+        return filas
+
+    def siguiente_pagina_ordenada(self):
+        """Igual que siguiente_pagina(), con el orden por columna (ver consultas.sql_pagina_ordenada)."""
+        inicial = self.ultima_fila is None
+        parametros = (self.expresion,) if self.expresion else ()
+        if not inicial:
+            valor = valor_orden(self.orden, self.ultima_fila)
+            parametros += (valor, valor, self.ultima_fila[0])
+        query = sql_pagina_ordenada(self.orden, self.descendente, bool(self.expresion), inicial)
+        filas = self.db_handler.fetch_all(query, parametros + (self.tamano_pagina,))
+        if filas is None:
+            return None
+        if len(filas) < self.tamano_pagina:
+            self.agotado = True
+        if filas:
+            self.ultima_fila = filas[-1]
+            self.ultimo_id = filas[-1][0]
+        return filas
@@ -3,12 +3,15 @@
 import tkinter as tk
 import tkinter.ttk as ttk
 from tkinter import messagebox as mssg
-import sqlite3
+from db_handler import DatabaseHandler
+from repositorio import ParticipantRepository
 
 class Participantes:
     # nombre de la base de datos  y ruta 
     path = r'X:/Users/ferna/Documents/UNal/Alumnos/2024_S2/POO/Proy'
     db_name = path + r'/Participantes.db'
+    # Todo acceso a t_participantes pasa por el repositorio
+    repositorio = ParticipantRepository(DatabaseHandler(db_name))
     actualiza = None
     def __init__(self, master=None):
         # Top Level - Ventana Principal
@@ -198,48 +201,39 @@ class Participantes:
     def limpia_Campos(self):
       pass
 
-    def run_Query(self, query, parametros = ()):
-        ''' Función para ejecutar los Querys a la base de datos '''
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.cursor()
-            result = cursor.execute(query, parametros)
-            conn.commit()
-        return result
-
     def lee_tablaTreeView(self):
         ''' Carga los datos de la BD y Limpia la Tabla tablaTreeView '''
         tabla_TreeView = self.treeDatos.get_children()
         for linea in tabla_TreeView:
             self.treeDatos.delete(linea)
         # Seleccionando los datos de la BD
-        query = 'SELECT * FROM t_participantes ORDER BY Id DESC'
-        db_rows = self.run_Query(query)
+        db_rows = self.repositorio.listado() or []
         # Insertando los datos de la BD en la tabla de la pantalla
         for row in db_rows:
             self.treeDatos.insert('',0, text = row[0], values = [row[1],row[2],row[3],row[4],row[5]])
         
     def adiciona_Registro(self, event=None):
         '''Adiciona un producto a la BD si la validación es True'''
-        if self.actualiza:
-            self.actualiza = None
-            self.entryId.configure(state = 'readonly')
-            query = 'UPDATE t_participantes SET Id = ?,Nombre = ?,Dirección = ?,Celular = ?, Entidad = ?, Fecha = ? WHERE Id = ?'
-            parametros = (self.entryId.get(), self.entryNombre.get(), self.entryDireccion.get(),
-                          self.entryCelular.get(), self.entryEntidad.get(), self.entryFecha.get()
-                          )
-                        #   self.entryId.get())
-            self.run_Query(query, parametros)
-            mssg.showinfo('Ok',' Registro actualizado con éxito')
+        if not self.valida():
+            mssg.showerror("¡ Atención !","No puede dejar la identificación vacía")
+            return
+        # Este formulario no pide la ciudad: None conserva la registrada
+        try:
+            fila, creado = self.repositorio.guardar(self.entryId.get(), self.entryNombre.get(),
+                                                    self.entryDireccion.get(), self.entryCelular.get(),
+                                                    self.entryEntidad.get(), self.entryFecha.get(),
+                                                    sobrescribir = bool(self.actualiza))
+        except Exception as error:
+            mssg.showerror("¡ Atención !",f'No se pudo grabar el registro: {error}')
+            return
+        self.actualiza = None
+        if fila is None:
+            mssg.showerror("¡ Atención !",f'El registro: {self.entryId.get()} .. ya existe')
+            return
+        if creado:
+            mssg.showinfo('',f'Registro: {fila[0]} .. agregado')
         else:
-            query = 'INSERT INTO t_participantes VALUES(?, ?, ?, ?, ?, ?)'
-            parametros = (self.entryId.get(),self.entryNombre.get(), self.entryDireccion.get(),
-                          self.entryCelular.get(), self.entryEntidad.get(), self.entryFecha.get())
-            if self.valida():
-                self.run_Query(query, parametros)
-                self.limpia_Campos()
-                mssg.showinfo('',f'Registro: {self.entryId.get()} .. agregado')
-            else:
-                mssg.showerror("¡ Atención !","No puede dejar la identificación vacía")
+            mssg.showinfo('Ok',' Registro actualizado con éxito')
         self.limpia_Campos()
         self.lee_tablaTreeView()
 
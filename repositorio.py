@@ -0,0 +1,141 @@
+# repositorio.py
+"""
+Acceso a los datos de los participantes.
+Toda lectura puntual y toda escritura de t_participantes pasa por ParticipantRepository,
+de modo que la interfaz no arma SQL y cada operación cuesta una sola sentencia y una
+sola transacción (ver consultas.py).
+"""
+import json
+from array import array
+from consultas import (SQL_LISTADO, SQL_CONSULTA_ID, SQL_EXISTE_ID, SQL_IDS, SQL_UPSERT_PARTICIPANTE,
+                       SQL_INSERTA_PARTICIPANTE, SQL_UPSERT_LOTE, SQL_FILAS_POR_IDS, SQL_ELIMINA_IDS, SQL_INSERTA_LOTE,
+                       SQL_COINCIDE_BUSQUEDA, SQL_COINCIDEN_BUSQUEDA, SQL_RESUMEN)
+
+class ParticipantRepository:
+    """
+    Operaciones sobre t_participantes a través de un DatabaseHandler.
+    Las filas se reciben y se retornan como tuplas (Id, Nombre, Dirección, Celular, Entidad, Fecha, Ciudad).
+    """
+    def __init__(self, db_handler):
+        self.db_handler = db_handler
+
+    @staticmethod
+    def parametros(id_participante, nombre, direccion, celular, entidad, fecha, ciudad):
+        """
+        Convierte los datos de un participante a los tipos de la tabla: Id entero y el resto texto.
+        La ciudad puede ser None para conservar la registrada. Lanza ValueError si la identificación no es numérica.
+        """
+        return (int(id_participante), str(nombre), str(direccion), str(celular),
+                str(entidad), str(fecha), None if ciudad is None else str(ciudad))
+
+    def listado(self):
+        """Retorna todos los participantes ordenados por Id descendente, o None si la consulta falla."""
+        return self.db_handler.fetch_all(SQL_LISTADO)
+
+    def existe(self, id_participante):
+        """Indica si hay un participante con el Id dado. Retorna None si la consulta falla."""
+        filas = self.db_handler.fetch_all(SQL_EXISTE_ID, (int(id_participante),))
+        return None if filas is None else bool(filas)
+
+    def ids(self):
+        """
+        Retorna todos los Id en orden ascendente, en un array de enteros de 64 bits.
+        Lanza ValueError si la consulta falla.
+        """
+        cursor = self.db_handler.execute_query(SQL_IDS)
+        if cursor is None:
+            raise ValueError("No se pudo leer los Id de los participantes.")
+        return array("q", (fila[0] for fila in cursor))
+
+    def resumen(self):
+        """
+        Retorna el número de participantes por valor de cada columna resumida (ver migraciones.sentencias_resumen),
+        como diccionario columna -> {valor: cantidad}. Lanza ValueError si la consulta falla.
+        """
+        filas = self.db_handler.fetch_all(SQL_RESUMEN)
+        if filas is None:
+            raise ValueError("No se pudo leer el resumen de participantes.")
+        resumen = {}
+        for dimension, valor, cantidad in filas:
+            resumen.setdefault(dimension, {})[valor] = cantidad
+        return resumen
+
+    def obtener(self, id_participante):
+        """Retorna la fila del participante, o None si no existe. Lanza ValueError si la consulta falla."""
+        filas = self.db_handler.fetch_all(SQL_CONSULTA_ID, (int(id_participante),))
+        if filas is None:
+            raise ValueError("No se pudo consultar el participante.")
+        return filas[0] if filas else None
+
+    def guardar(self, id_participante, nombre, direccion, celular, entidad, fecha, ciudad=None, sobrescribir=True):
+        """
+        Graba un participante con una sola sentencia (INSERT ... ON CONFLICT) y una sola transacción.
+         - sobrescribir=True: si el Id ya existe se actualizan sus datos.
+         - sobrescribir=False: si el Id ya existe no se modifica nada.
+        Retorna la tupla (fila, creado): la fila tal como quedó grabada (None si no se grabó porque
+        ya existía) y True si el participante se creó o False si se actualizó.
+        """
+        parametros = self.parametros(id_participante, nombre, direccion, celular, entidad, fecha, ciudad)
+        with self.db_handler.transaction() as conn:
+            return self.graba(conn, parametros, sobrescribir)
+
+    @staticmethod
+    def graba(conn, parametros, sobrescribir=True):
+        """
+        Igual que guardar(), con parámetros ya convertidos y dentro de una transacción abierta en conn
+        (por ejemplo, la de un lote del escritor agrupado, ver escritor.py). Retorna (fila, creado).
+        """
+        if not sobrescribir:
+            fila = conn.execute(SQL_INSERTA_PARTICIPANTE, parametros).fetchone()
+            return fila, fila is not None
+
+        # El upsert no indica si insertó o actualizó; una inserción cambia last_insert_rowid y una
+        # actualización no. Solo si ya valía este Id hace falta verificar la existencia antes
+        previo = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        existia = None
+        if previo == parametros[0]:
+            existia = conn.execute(SQL_EXISTE_ID, (parametros[0],)).fetchone() is not None
+        cursor = conn.execute(SQL_UPSERT_PARTICIPANTE, parametros)
+        fila = cursor.fetchone()
+        if existia is None:
+            creado = cursor.lastrowid == parametros[0]
+        else:
+            creado = not existia
+        return fila, creado
+
+    def guardar_lote(self, filas):
+        """
+        Graba (inserta o actualiza) un lote de filas con una sola sentencia y una sola transacción.
+        Retorna el número de filas grabadas.
+        """
+        with self.db_handler.transaction() as conn:
+            conn.execute(SQL_UPSERT_LOTE, (json.dumps(filas, ensure_ascii=False),))
+        return len(filas)
+
+    def eliminar(self, ids):
+        """
+        Elimina los participantes indicados con una sola sentencia y una sola transacción.
+        Retorna las filas eliminadas, que sirven para deshacer la eliminación con restaurar().
+        """
+        lista = json.dumps([int(i) for i in ids])
+        with self.db_handler.transaction() as conn:
+            filas = conn.execute(SQL_FILAS_POR_IDS, (lista,)).fetchall()
+            conn.execute(SQL_ELIMINA_IDS, (lista,))
+        return filas
+
+    def restaurar(self, filas):
+        """
+        Vuelve a insertar filas eliminadas en una sola transacción.
+        Falla sin modificar nada si alguno de los Id volvió a registrarse.
+        """
+        with self.db_handler.transaction() as conn:
+            conn.execute(SQL_INSERTA_LOTE, (json.dumps(filas, ensure_ascii=False),))
+
+    def coincide(self, expresion, id_participante):
+        """Indica si el participante coincide con la expresión MATCH de busqueda.expresion_fts()."""
+        return bool(self.db_handler.fetch_all(SQL_COINCIDE_BUSQUEDA, (expresion, int(id_participante))))
+
+    def coincidencias(self, expresion, ids):
+        """Retorna el conjunto de Id, entre los indicados, que coinciden con la expresión MATCH."""
+        filas = self.db_handler.fetch_all(SQL_COINCIDEN_BUSQUEDA, (expresion, json.dumps([int(i) for i in ids])))
+        return {fila[0] for fila in filas or ()}
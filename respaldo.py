@@ -0,0 +1,141 @@
+# respaldo.py
+"""
+Respaldos en caliente de Participantes.db con la API de respaldo de SQLite.
+La copia se hace mientras la aplicación sigue registrando participantes:
+ - la conexión de origen abre una transacción de lectura, así que con WAL la copia es una foto
+   consistente de la base y los escritores no se bloquean (tampoco se reinicia la copia cuando escriben);
+ - las páginas se copian por pasos pequeños con una pausa entre ellos, para no acaparar el disco;
+ - la copia se escribe en un archivo temporal, se verifica con PRAGMA integrity_check y solo entonces
+   se renombra a 'Participantes_aaaammdd-hhmmss.db';
+ - se conservan los respaldos más recientes y se borran los demás.
+
+Uso desde la línea de comandos:
+    python respaldo.py ruta/Participantes.db [--carpeta ruta/respaldos] [--conservar 10]
+"""
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+FORMATO_MARCA = "%Y%m%d-%H%M%S"
+
+class RespaldoInvalido(sqlite3.DatabaseError):
+    """La copia no superó la verificación de integridad."""
+
+class _Cancelado(Exception):
+    """Interrumpe la copia cuando se solicita la cancelación."""
+
+def carpeta_por_defecto(ruta_base):
+    """Carpeta 'respaldos' junto a la base de datos."""
+    return os.path.join(os.path.dirname(os.path.abspath(ruta_base)), "respaldos")
+
+def patron_respaldos(ruta_base):
+    """Expresión que reconoce los nombres de respaldo de la base indicada."""
+    nombre = re.escape(os.path.splitext(os.path.basename(ruta_base))[0])
+    return re.compile(rf"{nombre}_\d{{8}}-\d{{6}}\.db")
+
+def verifica_integridad(conn):
+    """Ejecuta PRAGMA integrity_check y lanza RespaldoInvalido con los problemas encontrados."""
+    resultado = [fila[0] for fila in conn.execute("PRAGMA integrity_check")]
+    if resultado != ["ok"]:
+        raise RespaldoInvalido("; ".join(resultado[:10]))
+
+def crear_respaldo(ruta_base, carpeta=None, paginas_por_paso=64, pausa=0.001, progreso=None, cancelado=None, ahora=None):
+    """
+    Copia la base de datos a '<carpeta>/<nombre>_<aaaammdd-hhmmss>.db' y verifica la copia.
+    progreso(hechas, total) recibe las páginas copiadas; si cancelado() retorna True la copia se
+    interrumpe entre dos pasos. Retorna la ruta del respaldo, o None si se canceló.
+    Lanza RespaldoInvalido si la copia no supera la verificación (y en ese caso la borra).
+    """
+    carpeta = carpeta or carpeta_por_defecto(ruta_base)
+    os.makedirs(carpeta, exist_ok=True)
+    nombre = os.path.splitext(os.path.basename(ruta_base))[0]
+    ruta = os.path.join(carpeta, f"{nombre}_{(ahora or datetime.now()).strftime(FORMATO_MARCA)}.db")
+    if os.path.exists(ruta):
+        raise FileExistsError(f"Ya existe el respaldo {ruta}")
+    temporal = ruta + ".parcial"
+
+    def paso(estado, restantes, total):
+        if cancelado is not None and cancelado():
+            raise _Cancelado()
+        if progreso is not None:
+            progreso(total - restantes, total)
+
+    # Solo lectura: una ruta equivocada falla en lugar de crear (y respaldar) una base vacía
+    origen = sqlite3.connect(Path(ruta_base).absolute().as_uri() + "?mode=ro", uri=True)
+    destino = sqlite3.connect(temporal)
+    try:
+        # La transacción de lectura fija la foto de la base durante todos los pasos de la copia
+        origen.execute("BEGIN")
+        origen.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        origen.backup(destino, pages=paginas_por_paso, progress=paso, sleep=pausa)
+        origen.rollback()
+        # El respaldo queda en un solo archivo, sin -wal ni -shm
+        destino.execute("PRAGMA journal_mode = DELETE")
+        verifica_integridad(destino)
+    except _Cancelado:
+        destino.close()
+        os.remove(temporal)
+        logger.info("Respaldo cancelado")
+        return None
+    except BaseException:
+        destino.close()
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    finally:
+        origen.close()
+    destino.close()
+    os.replace(temporal, ruta)
+    logger.info("Respaldo creado: %s", ruta)
+    return ruta
+
+def aplicar_retencion(ruta_base, carpeta=None, conservar=10):
+    """
+    Conserva los 'conservar' respaldos más recientes de la base en la carpeta y borra los demás.
+    Retorna la lista de respaldos borrados.
+    """
+    carpeta = carpeta or carpeta_por_defecto(ruta_base)
+    patron = patron_respaldos(ruta_base)
+    # La marca aaaammdd-hhmmss del nombre ordena los respaldos del más antiguo al más reciente
+    respaldos = sorted(nombre for nombre in os.listdir(carpeta) if patron.fullmatch(nombre))
+    borrados = []
+    for nombre in respaldos[:max(len(respaldos) - conservar, 0)]:
+        os.remove(os.path.join(carpeta, nombre))
+        logger.info("Respaldo antiguo borrado: %s", nombre)
+        borrados.append(nombre)
+    return borrados
+
+def respaldar(ruta_base, carpeta=None, conservar=10, progreso=None, cancelado=None):
+    """Crea un respaldo y aplica la retención. Retorna la ruta del respaldo, o None si se canceló."""
+    ruta = crear_respaldo(ruta_base, carpeta, progreso=progreso, cancelado=cancelado)
+    if ruta is not None:
+        aplicar_retencion(ruta_base, carpeta, conservar)
+    return ruta
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Respaldo en caliente de la base de participantes.")
+    parser.add_argument("base", help="ruta de Participantes.db")
+    parser.add_argument("--carpeta", help="carpeta de los respaldos (por defecto 'respaldos' junto a la base)")
+    parser.add_argument("--conservar", type=int, default=10, help="respaldos que se conservan (por defecto 10)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.conservar < 1:
+        parser.error("--conservar debe ser al menos 1")
+    try:
+        ruta = respaldar(args.base, args.carpeta, args.conservar)
+    except (sqlite3.Error, OSError) as e:
+        logger.error("No se pudo crear el respaldo: %s", e)
+        return 1
+    print(ruta)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
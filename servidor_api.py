@@ -0,0 +1,250 @@
+# servidor_api.py
+"""
+Servicio HTTP/JSON local para registrar participantes desde varios puntos a la vez
+(tabletas de registro, scripts), sin compartir el archivo .db por la red.
+Las peticiones se atienden en un grupo fijo de hilos, cada uno con su propia conexión
+persistente: las lecturas son concurrentes gracias a WAL y las escrituras se serializan
+en el DatabaseHandler.
+
+Rutas:
+    GET    /salud                                   estado del servicio
+    GET    /participantes?q=texto&despues=Id&limite=N   página del listado o de una búsqueda
+    GET    /participantes/<Id>                      un participante
+    POST   /participantes                           registra un participante nuevo (409 si ya existe)
+    PUT    /participantes/<Id>                      registra o actualiza un participante
+    DELETE /participantes/<Id>                      elimina un participante
+    GET    /departamentos                           lista de departamentos
+    GET    /departamentos/<nombre>/ciudades         municipios de un departamento
+    GET    /estadisticas                            participantes por departamento, ciudad, entidad y fecha
+    GET    /exportacion                             todos los participantes en CSV
+
+Uso desde la línea de comandos:
+    python servidor_api.py ruta/Participantes.db [--host 127.0.0.1] [--puerto 8765] [--hilos 16]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from db_handler import DatabaseHandler
+from escritor import EscritorAgrupado
+from nucleo import ErrorValidacion, ServicioParticipantes
+
+logger = logging.getLogger(__name__)
+
+LIMITE_PAGINA = 200          # Filas por página si el cliente no indica otra cantidad
+LIMITE_PAGINA_MAXIMO = 1000
+TAMANO_MAXIMO_CUERPO = 64 * 1024
+
+class ErrorPeticion(Exception):
+    """Error que se responde al cliente con el código HTTP indicado."""
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+class ManejadorAPI(BaseHTTPRequestHandler):
+    """Atiende una petición HTTP; el servicio compartido está en self.server.servicio."""
+    server_version = "ParticipantesAPI/1.0"
+
+    # --- Respuestas ---
+
+    def responde_json(self, estado, contenido):
+        cuerpo = json.dumps(contenido, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def responde_vacio(self, estado):
+        self.send_response(estado)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def lee_json(self):
+        """Retorna el cuerpo de la petición como diccionario."""
+        try:
+            longitud = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if longitud > TAMANO_MAXIMO_CUERPO:
+            raise ErrorPeticion(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "El cuerpo de la petición es demasiado grande")
+        try:
+            datos = json.loads(self.rfile.read(longitud) or b"{}")
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "El cuerpo debe ser JSON")
+        if not isinstance(datos, dict):
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "El cuerpo debe ser un objeto JSON")
+        return datos
+
+    # --- Despacho ---
+
+    def atiende(self, metodo):
+        url = urlsplit(self.path)
+        partes = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        try:
+            self.despacha(metodo, partes, parse_qs(url.query))
+        except ErrorPeticion as e:
+            self.responde_json(e.estado, {"error": str(e)})
+        except ErrorValidacion as e:
+            self.responde_json(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(e)})
+        except Exception as e:
+            logger.exception("Error al atender %s %s", metodo, self.path)
+            self.responde_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+
+    def do_GET(self):
+        self.atiende("GET")
+
+    def do_POST(self):
+        self.atiende("POST")
+
+    def do_PUT(self):
+        self.atiende("PUT")
+
+    def do_DELETE(self):
+        self.atiende("DELETE")
+
+    def despacha(self, metodo, partes, consulta):
+        servicio = self.server.servicio
+        if partes == ["salud"] and metodo == "GET":
+            self.responde_json(HTTPStatus.OK, {"estado": "ok"})
+        elif partes == ["participantes"] and metodo == "GET":
+            self.lista(servicio, consulta)
+        elif partes == ["participantes"] and metodo == "POST":
+            self.registra(servicio, self.lee_json(), sobrescribir=False)
+        elif len(partes) == 2 and partes[0] == "participantes":
+            id_participante = self.id_de(partes[1])
+            if metodo == "GET":
+                fila = servicio.obtener(id_participante)
+                if fila is None:
+                    raise ErrorPeticion(HTTPStatus.NOT_FOUND, "Participante no encontrado")
+                self.responde_json(HTTPStatus.OK, servicio.como_dict(fila))
+            elif metodo == "PUT":
+                datos = self.lee_json()
+                datos["Id"] = str(id_participante)
+                self.registra(servicio, datos, sobrescribir=True)
+            elif metodo == "DELETE":
+                if not servicio.eliminar([id_participante]):
+                    raise ErrorPeticion(HTTPStatus.NOT_FOUND, "Participante no encontrado")
+                self.responde_vacio(HTTPStatus.NO_CONTENT)
+            else:
+                raise ErrorPeticion(HTTPStatus.METHOD_NOT_ALLOWED, "Método no permitido")
+        elif partes == ["departamentos"] and metodo == "GET":
+            self.responde_json(HTTPStatus.OK, {"departamentos": servicio.departamentos() or []})
+        elif len(partes) == 3 and partes[0] == "departamentos" and partes[2] == "ciudades" and metodo == "GET":
+            self.responde_json(HTTPStatus.OK, {"ciudades": servicio.ciudades(partes[1]) or []})
+        elif partes == ["estadisticas"] and metodo == "GET":
+            self.responde_json(HTTPStatus.OK, {columna: [{"valor": valor, "cantidad": cantidad} for valor, cantidad in pares]
+                                               for columna, pares in servicio.estadisticas().items()})
+        elif partes == ["exportacion"] and metodo == "GET":
+            self.exporta(servicio)
+        else:
+            raise ErrorPeticion(HTTPStatus.NOT_FOUND, "Ruta no encontrada")
+
+    @staticmethod
+    def id_de(texto):
+        if not texto.isdigit():
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "El Id debe ser numérico")
+        return int(texto)
+
+    # --- Operaciones ---
+
+    def lista(self, servicio, consulta):
+        try:
+            despues = int(consulta.get("despues", ["-1"])[0])
+            limite = min(int(consulta.get("limite", [LIMITE_PAGINA])[0]), LIMITE_PAGINA_MAXIMO)
+        except ValueError:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "'despues' y 'limite' deben ser enteros")
+        if limite < 1:
+            raise ErrorPeticion(HTTPStatus.BAD_REQUEST, "'limite' debe ser positivo")
+        filas, siguiente = servicio.pagina(consulta.get("q", [""])[0], despues, limite)
+        self.responde_json(HTTPStatus.OK, {"participantes": [servicio.como_dict(f) for f in filas],
+                                           "siguiente": siguiente})
+
+    def registra(self, servicio, datos, sobrescribir):
+        fila, creado = servicio.guardar(servicio.validar(datos), sobrescribir=sobrescribir)
+        if fila is None:
+            raise ErrorPeticion(HTTPStatus.CONFLICT, "Ya existe un participante con ese Id")
+        self.responde_json(HTTPStatus.CREATED if creado else HTTPStatus.OK, servicio.como_dict(fila))
+
+    def exporta(self, servicio):
+        # Se exporta a un archivo temporal para responder con Content-Length y sin mantener
+        # abierta la lectura de la base mientras el cliente descarga
+        carpeta = tempfile.mkdtemp(prefix="exportacion_")
+        try:
+            ruta = os.path.join(carpeta, "participantes.csv")
+            servicio.exportar(ruta, comprimir=False)
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/csv; charset=utf-8")
+            self.send_header("Content-Disposition", 'attachment; filename="participantes.csv"')
+            self.send_header("Content-Length", str(os.path.getsize(ruta)))
+            self.end_headers()
+            with open(ruta, "rb") as archivo:
+                shutil.copyfileobj(archivo, self.wfile, 1 << 16)
+        finally:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+    def log_message(self, formato, *args):
+        logger.info("%s - %s", self.address_string(), formato % args)
+
+class ServidorAPI(ThreadingHTTPServer):
+    """
+    Servidor HTTP que comparte un ServicioParticipantes entre un número fijo de hilos.
+    A diferencia de un hilo nuevo por petición, los hilos (y sus conexiones a la base) se reutilizan.
+    """
+    # Conexiones en espera de ser aceptadas; el valor por defecto (5) rechaza ráfagas de clientes
+    request_queue_size = 128
+
+    def __init__(self, direccion, servicio, hilos=16):
+        super().__init__(direccion, ManejadorAPI)
+        self.servicio = servicio
+        self._hilos = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="API")
+
+    def process_request(self, request, client_address):
+        self._hilos.submit(self.process_request_thread, request, client_address)
+
+    def server_close(self):
+        super().server_close()
+        self._hilos.shutdown(wait=True)
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON local de registro de participantes.")
+    parser.add_argument("base", help="ruta de Participantes.db")
+    parser.add_argument("--host", default="127.0.0.1", help="dirección en la que escucha (por defecto 127.0.0.1)")
+    parser.add_argument("--puerto", type=int, default=8765, help="puerto (por defecto 8765)")
+    parser.add_argument("--hilos", type=int, default=16, help="peticiones atendidas a la vez (por defecto 16)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    db_handler = DatabaseHandler(args.base)
+    # Los registros de todos los puestos se graban por lotes en un solo hilo escritor
+    escritor = EscritorAgrupado(db_handler)
+    servicio = ServicioParticipantes(db_handler, escritor=escritor)
+    try:
+        if not servicio.preparar():
+            logger.error("No se pudo cargar la tabla de ciudades.")
+            return 1
+        servicio.gazetteer.iniciar_verificacion()
+        servidor = ServidorAPI((args.host, args.puerto), servicio, args.hilos)
+        logger.info("Escuchando en http://%s:%s", args.host, args.puerto)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+    finally:
+        servicio.gazetteer.detener_verificacion()
+        escritor.cerrar()
+        db_handler.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# conftest.py
+"""
+Accesorios compartidos por las pruebas: una base de datos temporal con el esquema al día
+y algunos municipios de referencia (incluidos dos homónimos en departamentos distintos).
+"""
+import csv
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Los módulos de la aplicación están en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_handler import DatabaseHandler
+from gazetteer import Gazetteer
+from migraciones import aplicar_migraciones
+
+CIUDADES = [
+    (5, 5001, "ANTIOQUIA", "MEDELLÍN"),
+    (5, 5002, "ANTIOQUIA", "ABEJORRAL"),
+    (8, 8001, "ATLÁNTICO", "BARRANQUILLA"),
+    (8, 8638, "ATLÁNTICO", "SABANALARGA"),
+    (11, 11001, "BOGOTÁ, D.C.", "BOGOTÁ, D.C."),
+    (85, 85300, "CASANARE", "SABANALARGA"),
+]
+
+def crea_base(ruta):
+    """Crea en 'ruta' una base con las migraciones aplicadas y t_ciudades cargada."""
+    conn = sqlite3.connect(ruta)
+    aplicar_migraciones(conn)
+    with conn:
+        conn.executemany("""INSERT INTO t_ciudades (Id_Departamento, Id_Ciudad, Nombre_Departamento, Nombre_Ciudad)
+                            VALUES (?, ?, ?, ?)""", CIUDADES)
+    conn.close()
+    return ruta
+
+def escribe_dane(ruta, ciudades):
+    """Escribe en 'ruta' un CSV de municipios con el formato del DANE (códigos con punto de miles)."""
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        writer = csv.writer(archivo)
+        writer.writerow(["CÓDIGO DANE DEL DEPARTAMENTO", "DEPARTAMENTO", "CÓDIGO DANE DEL MUNICIPIO", "MUNICIPIO"])
+        for id_dep, id_muni, departamento, municipio in ciudades:
+            writer.writerow([str(id_dep), departamento, f"{id_muni:,}".replace(",", "."), municipio])
+    return ruta
+
+@pytest.fixture
+def nueva_base(tmp_path):
+    """Función que crea una base adicional en la carpeta temporal y retorna su DatabaseHandler."""
+    handlers = []
+
+    def crea(nombre):
+        handler = DatabaseHandler(crea_base(str(tmp_path / nombre)))
+        handlers.append(handler)
+        return handler
+    yield crea
+    for handler in handlers:
+        handler.close()
+
+@pytest.fixture
+def ruta_base(tmp_path):
+    """Ruta de una base nueva con las migraciones aplicadas y t_ciudades cargada."""
+    return crea_base(str(tmp_path / "Participantes.db"))
+
+@pytest.fixture
+def db_handler(ruta_base):
+    handler = DatabaseHandler(ruta_base)
+    yield handler
+    handler.close()
+
+@pytest.fixture
+def gazetteer(db_handler):
+    return Gazetteer(db_handler)
@@ -0,0 +1,43 @@
+# test_busqueda.py
+import pytest
+
+from busqueda import expresion_fts
+
+SQL_COINCIDENCIAS = "SELECT rowid FROM t_participantes_fts WHERE t_participantes_fts MATCH ? ORDER BY rowid"
+
+def test_cada_termino_es_un_prefijo():
+    assert expresion_fts("jor san") == '"jor"* "san"*'
+    assert expresion_fts("  ") is None
+    assert expresion_fts("--") is None
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("ana AND luis", '"ana"* "AND"* "luis"*'),
+    ("NOT ana", '"NOT"* "ana"*'),
+    ('"ana" OR luis*', '"ana"* "OR"* "luis"*'),
+    ("nombre:ana -luis (x)", '"nombre"* "ana"* "luis"* "x"*'),
+    ("NEAR(ana luis)", '"NEAR"* "ana"* "luis"*'),
+])
+def test_operadores_fts_se_buscan_como_texto(texto, esperado):
+    assert expresion_fts(texto) == esperado
+
+def test_busqueda_sobre_el_indice(db_handler):
+    conn = db_handler.connect()
+    with conn:
+        conn.executemany("INSERT INTO t_participantes VALUES (?, ?, ?, ?, ?, ?, ?)", [
+            (1, "José Núñez", "Calle 1", "300", "UNAL", "01/02/2024", "MEDELLÍN"),
+            (2, "Ana Not", "Calle 2", "301", "EAFIT", "02/02/2024", "ABEJORRAL"),
+            (3, "Luis Pérez", "Calle 3", "302", "UdeA", "03/02/2024", "MEDELLÍN"),
+        ])
+    busca = lambda texto: [fila[0] for fila in conn.execute(SQL_COINCIDENCIAS, (expresion_fts(texto),))]
+    # Las tildes no importan y cada término es un prefijo
+    assert busca("jose nu") == [1]
+    assert busca("medel") == [1, 3]
+    # 'not' es una palabra más, no el operador NOT
+    assert busca("not") == [2]
+    assert busca("ana AND luis") == []
+    # Los cambios se reflejan en el índice por medio de los disparadores
+    with conn:
+        conn.execute("UPDATE t_participantes SET Nombre = 'Luisa Gómez' WHERE Id = 2")
+        conn.execute("DELETE FROM t_participantes WHERE Id = 3")
+    assert busca("lui") == [2]
+    assert busca("not") == []
@@ -0,0 +1,67 @@
+# test_cargador_ciudades.py
+import sqlite3
+
+import pytest
+
+from cargador_ciudades import cargar_ciudades
+from conftest import CIUDADES, escribe_dane
+
+@pytest.fixture
+def conn(ruta_base):
+    conn = sqlite3.connect(ruta_base)
+    # Registra cada fila que la carga toca, para comprobar que solo cambian las diferentes
+    conn.executescript("""
+        CREATE TEMP TABLE t_tocadas (Operacion TEXT, Id_Ciudad INTEGER);
+        CREATE TEMP TRIGGER tr_ins AFTER INSERT ON main.t_ciudades
+            BEGIN INSERT INTO t_tocadas VALUES ('I', new.Id_Ciudad); END;
+        CREATE TEMP TRIGGER tr_upd AFTER UPDATE ON main.t_ciudades
+            BEGIN INSERT INTO t_tocadas VALUES ('U', new.Id_Ciudad); END;
+        CREATE TEMP TRIGGER tr_del AFTER DELETE ON main.t_ciudades
+            BEGIN INSERT INTO t_tocadas VALUES ('D', old.Id_Ciudad); END;
+    """)
+    yield conn
+    conn.close()
+
+def tocadas(conn):
+    filas = conn.execute("SELECT Operacion, Id_Ciudad FROM t_tocadas ORDER BY Operacion, Id_Ciudad").fetchall()
+    conn.execute("DELETE FROM t_tocadas")
+    conn.commit()
+    return filas
+
+def test_recarga_incremental_solo_toca_las_filas_diferentes(conn, tmp_path):
+    ruta = str(tmp_path / "dane.csv")
+    escribe_dane(ruta, CIUDADES)
+    # La primera carga encuentra la tabla ya al día: solo guarda la huella
+    assert cargar_ciudades(conn, ruta, tamano_lote=2) == \
+        {"insertados": 0, "actualizados": 0, "eliminados": 0, "omitido": False}
+    assert tocadas(conn) == []
+
+    nuevas = [c for c in CIUDADES if c[1] != 5002]                # ABEJORRAL desaparece
+    nuevas[0] = (5, 5001, "ANTIOQUIA", "MEDELLÍN D.E.")          # MEDELLÍN cambia de nombre
+    nuevas.append((5, 5088, "ANTIOQUIA", "BELLO"))               # BELLO es nuevo
+    escribe_dane(ruta, nuevas)
+    assert cargar_ciudades(conn, ruta, tamano_lote=2) == \
+        {"insertados": 1, "actualizados": 1, "eliminados": 1, "omitido": False}
+    assert tocadas(conn) == [("D", 5002), ("I", 5088), ("U", 5001)]
+    assert sorted(conn.execute("SELECT Id_Departamento, Id_Ciudad, Nombre_Departamento, Nombre_Ciudad "
+                               "FROM t_ciudades")) == sorted(nuevas)
+
+def test_archivo_sin_cambios_se_omite(conn, tmp_path):
+    ruta = escribe_dane(str(tmp_path / "dane.csv"), CIUDADES)
+    cargar_ciudades(conn, ruta)
+    tocadas(conn)
+    conn.execute("DELETE FROM t_ciudades WHERE Id_Ciudad = 5002")
+    conn.commit()
+    tocadas(conn)
+    # Misma huella: no se compara la tabla, salvo que se fuerce
+    assert cargar_ciudades(conn, ruta)["omitido"]
+    assert tocadas(conn) == []
+    assert cargar_ciudades(conn, ruta, forzar=True)["insertados"] == 1
+    assert tocadas(conn) == [("I", 5002)]
+
+def test_csv_vacio_no_modifica_la_tabla(conn, tmp_path):
+    ruta = escribe_dane(str(tmp_path / "vacio.csv"), [])
+    with pytest.raises(ValueError, match="no contiene municipios"):
+        cargar_ciudades(conn, ruta)
+    assert conn.execute("SELECT COUNT(*) FROM t_ciudades").fetchone() == (len(CIUDADES),)
+    assert not conn.in_transaction
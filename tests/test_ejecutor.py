@@ -0,0 +1,87 @@
+# test_ejecutor.py
+import threading
+import time
+
+import pytest
+
+from ejecutor import EjecutorBD
+
+class WidgetFalso:
+    """Sustituye a la ventana de Tk: guarda las funciones programadas con 'after' para llamarlas a mano."""
+    def __init__(self):
+        self.programadas = []
+
+    def after(self, ms, funcion):
+        self.programadas.append(funcion)
+        return len(self.programadas)
+
+    def after_cancel(self, id_programada):
+        pass
+
+    def procesa(self, ejecutor, espera=2.0):
+        """Entrega resultados, como haría el bucle de Tk, hasta que no quede trabajo en curso."""
+        limite = time.monotonic() + espera
+        while ejecutor.ocupado() and time.monotonic() < limite:
+            programadas, self.programadas = self.programadas, []
+            for funcion in programadas:
+                funcion()
+            time.sleep(0.005)
+        assert not ejecutor.ocupado()
+
+@pytest.fixture
+def widget():
+    return WidgetFalso()
+
+@pytest.fixture
+def ocupado():
+    return []
+
+@pytest.fixture
+def ejecutor(widget, ocupado):
+    ejecutor = EjecutorBD(widget, al_cambiar_ocupado=ocupado.append)
+    yield ejecutor
+    ejecutor.cerrar()
+
+def test_resultados_en_orden_y_errores(widget, ejecutor, ocupado):
+    resultados, errores = [], []
+    for n in range(3):
+        ejecutor.enviar(lambda n: n * 10, n, al_terminar=resultados.append)
+    ejecutor.enviar(lambda: 1 / 0, al_fallar=errores.append)
+    widget.procesa(ejecutor)
+    assert resultados == [0, 10, 20]
+    assert isinstance(errores[0], ZeroDivisionError)
+    assert ocupado == [True, False]
+
+def test_tarea_obsoleta_con_la_misma_clave_se_cancela(widget, ejecutor):
+    liberar = threading.Event()
+    ejecutadas, entregadas = [], []
+
+    def busca(texto):
+        ejecutadas.append(texto)
+        return texto
+
+    # La primera tarea ocupa el hilo hasta que se libere; las dos búsquedas quedan en cola
+    ejecutor.enviar(liberar.wait, 2.0)
+    ejecutor.enviar(busca, "ju", al_terminar=entregadas.append, clave="busqueda")
+    ejecutor.enviar(busca, "juan", al_terminar=entregadas.append, clave="busqueda")
+    liberar.set()
+    widget.procesa(ejecutor)
+    # La búsqueda desactualizada ni se ejecuta ni se entrega
+    assert ejecutadas == ["juan"]
+    assert entregadas == ["juan"]
+
+def test_resultado_de_una_tarea_cancelada_en_curso_se_descarta(widget, ejecutor):
+    empezo, liberar = threading.Event(), threading.Event()
+    entregadas = []
+
+    def lenta():
+        empezo.set()
+        liberar.wait(2.0)
+        return "vieja"
+
+    ejecutor.enviar(lenta, al_terminar=entregadas.append, clave="pagina")
+    assert empezo.wait(2.0)
+    ejecutor.cancelar("pagina")
+    liberar.set()
+    widget.procesa(ejecutor)
+    assert entregadas == []
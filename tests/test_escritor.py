@@ -0,0 +1,91 @@
+# test_escritor.py
+import sqlite3
+import threading
+
+import pytest
+
+from db_handler import DatabaseHandler
+from escritor import EscritorAgrupado
+
+SQL_INSERTA = """INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                 VALUES (?, ?, '', '', '', '', 'MEDELLÍN')"""
+
+def inserta(conn, id_participante, nombre="Ana"):
+    conn.execute(SQL_INSERTA, (id_participante, nombre))
+    return id_participante
+
+def inserta_y_falla(conn, id_participante):
+    # La primera sentencia se graba; la segunda viola la clave primaria
+    conn.execute(SQL_INSERTA, (id_participante, "Parcial"))
+    conn.execute(SQL_INSERTA, (id_participante, "Repetido"))
+
+@pytest.fixture
+def escritor(db_handler):
+    escritor = EscritorAgrupado(db_handler)
+    yield escritor
+    escritor.cerrar()
+
+def bloquea(escritor):
+    """Ocupa el hilo escritor hasta que se active el evento retornado, para encolar un lote completo."""
+    liberar, ocupado = threading.Event(), threading.Event()
+    escritor.enviar(lambda conn: ocupado.set() or liberar.wait(5))
+    assert ocupado.wait(5)
+    return liberar
+
+def ids(db_handler):
+    return [fila[0] for fila in db_handler.fetch_all("SELECT Id FROM t_participantes ORDER BY Id")]
+
+def test_escritura_fallida_revierte_solo_su_savepoint(db_handler, escritor):
+    liberar = bloquea(escritor)
+    futuros = [escritor.enviar(inserta, 1), escritor.enviar(inserta_y_falla, 2), escritor.enviar(inserta, 3)]
+    # El lote aún no se ha confirmado: nadie recibe su resultado antes del COMMIT
+    assert not any(futuro.done() for futuro in futuros)
+    liberar.set()
+    assert futuros[0].result(5) == 1 and futuros[2].result(5) == 3
+    with pytest.raises(sqlite3.IntegrityError):
+        futuros[1].result(5)
+    # Tampoco queda la primera sentencia de la escritura fallida
+    assert ids(db_handler) == [1, 3]
+    # Un cambio en la misma tabla del lote anterior ve las filas ya confirmadas
+    assert escritor.ejecutar(lambda conn: conn.execute("SELECT COUNT(*) FROM t_participantes").fetchone()[0]) == 2
+
+def test_lote_en_una_sola_transaccion(db_handler, escritor):
+    sentencias = []
+    # Registra las sentencias de la conexión del escritor (esta llamada es un lote con su propio COMMIT)
+    escritor.ejecutar(lambda conn: conn.set_trace_callback(sentencias.append))
+    liberar = bloquea(escritor)
+    futuros = [escritor.enviar(inserta, n) for n in range(10, 20)]
+    liberar.set()
+    assert [futuro.result(5) for futuro in futuros] == list(range(10, 20))
+    escritor.ejecutar(lambda conn: conn.set_trace_callback(None))
+    # Tres lotes: el que activó el registro, el que ocupó el hilo y las diez escrituras juntas
+    assert sum(1 for sql in sentencias if sql == "COMMIT") == 3
+    assert sentencias.count("SAVEPOINT escritura") == 12
+    assert ids(db_handler) == list(range(10, 20))
+
+def test_cerrar_graba_lo_que_estaba_encolado(db_handler):
+    escritor = EscritorAgrupado(db_handler, max_lote=4)
+    liberar = bloquea(escritor)
+    futuros = [escritor.enviar(inserta, n) for n in range(100, 120)]
+    threading.Timer(0.05, liberar.set).start()
+    escritor.cerrar()
+    assert all(futuro.done() for futuro in futuros)
+    assert [futuro.result() for futuro in futuros] == list(range(100, 120))
+    assert ids(db_handler) == list(range(100, 120))
+    with pytest.raises(RuntimeError):
+        escritor.enviar(inserta, 200)
+
+def test_base_bloqueada_por_otro_proceso_se_reintenta(ruta_base):
+    # Con busy_timeout de 20 ms el BEGIN IMMEDIATE falla mientras la otra conexión escribe
+    handler = DatabaseHandler(ruta_base, timeout=0.02)
+    otro = sqlite3.connect(ruta_base, isolation_level=None, check_same_thread=False)
+    try:
+        handler.connect()
+        otro.execute("BEGIN IMMEDIATE")
+        threading.Timer(0.15, otro.rollback).start()
+        with handler.transaction() as conn:
+            inserta(conn, 7)
+        assert handler.fetch_all("SELECT Id FROM t_participantes") == [(7,)]
+    finally:
+        otro.close()
+        handler.close()
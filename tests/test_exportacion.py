@@ -0,0 +1,124 @@
+# test_exportacion.py
+import csv
+import gzip
+import json
+import os
+
+import pytest
+
+from exportacion import ENCABEZADO, ENCABEZADO_CAMBIOS, exportar_cambios, exportar_csv, marca_cambios
+from repositorio import ParticipantRepository
+
+@pytest.fixture
+def con_filas(db_handler):
+    conn = db_handler.connect()
+    with conn:
+        conn.executemany("""INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                         [(n, f"Persona {n}", f"Calle {n}", "300", "UNAL", "01/02/2024",
+                           "SABANALARGA" if n % 2 else "MEDELLÍN") for n in range(1, 26)])
+    return db_handler
+
+def test_exporta_por_lotes_con_progreso(con_filas, gazetteer, tmp_path):
+    ruta = str(tmp_path / "participantes.csv")
+    avances = []
+    assert exportar_csv(con_filas, gazetteer, ruta, tamano_lote=10,
+                        progreso=lambda escritos, total: avances.append((escritos, total))) == (25, True)
+    assert avances == [(10, 25), (20, 25), (25, 25)]
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        filas = list(csv.reader(archivo))
+    assert filas[0] == ENCABEZADO
+    assert len(filas) == 26
+    # Listado del Id mayor al menor, con el departamento resuelto por el gazetteer
+    assert filas[1] == ["25", "Persona 25", "Calle 25", "300", "UNAL", "01/02/2024", "SABANALARGA", "ATLÁNTICO"]
+    assert filas[2][-2:] == ["MEDELLÍN", "ANTIOQUIA"]
+
+def test_ruta_gz_se_comprime(con_filas, gazetteer, tmp_path):
+    ruta = str(tmp_path / "participantes.csv.gz")
+    assert exportar_csv(con_filas, gazetteer, ruta, tamano_lote=7) == (25, True)
+    with open(ruta, "rb") as archivo:
+        assert archivo.read(2) == b"\x1f\x8b"
+    with gzip.open(ruta, "rt", newline="", encoding="utf-8") as archivo:
+        filas = list(csv.reader(archivo))
+    assert filas[0] == ENCABEZADO
+    assert sorted(int(fila[0]) for fila in filas[1:]) == list(range(1, 26))
+
+def test_cancelar_no_deja_archivo_parcial(con_filas, gazetteer, tmp_path):
+    ruta = str(tmp_path / "participantes.csv")
+    revisiones = []
+
+    def cancelado():
+        # Se cancela después del primer lote
+        revisiones.append(1)
+        return len(revisiones) > 1
+
+    assert exportar_csv(con_filas, gazetteer, ruta, tamano_lote=10, cancelado=cancelado) == (10, False)
+    # Ni el destino ni el temporal quedan en la carpeta
+    assert not os.path.exists(ruta)
+    assert not os.path.exists(ruta + ".parcial")
+
+def test_cancelar_conserva_la_exportacion_anterior(con_filas, gazetteer, tmp_path):
+    ruta = str(tmp_path / "participantes.csv")
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write("anterior\n")
+    assert exportar_csv(con_filas, gazetteer, ruta, cancelado=lambda: True) == (0, False)
+    with open(ruta, encoding="utf-8") as archivo:
+        assert archivo.read() == "anterior\n"
+    assert not os.path.exists(ruta + ".parcial")
+
+def lee_jsonl(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return [json.loads(linea) for linea in archivo]
+
+def test_exportacion_incremental_desde_la_marca(db_handler, gazetteer, tmp_path):
+    repositorio = ParticipantRepository(db_handler)
+    repositorio.guardar_lote([[1, "Ana María", "Calle 1", "300", "UNAL", "", "MEDELLÍN"],
+                              [2, "Ñeco", "Carrera 2", "", "", "", "SABANALARGA"],
+                              [3, "Luis", "", "", "UdeA", "", "BOGOTÁ, D.C."]])
+    primera = str(tmp_path / "cambios1.jsonl")
+    escritos, marca, completo = exportar_cambios(db_handler, gazetteer, primera)
+    assert (escritos, completo) == (3, True)
+    assert [(c["Operacion"], c["Id"], c["Departamento"]) for c in lee_jsonl(primera)] == \
+        [("alta", 1, "ANTIOQUIA"), ("alta", 2, "ATLÁNTICO"), ("alta", 3, "BOGOTÁ, D.C.")]
+    assert marca_cambios(db_handler, "exportacion") == marca
+
+    # Varios cambios del mismo participante se exportan como uno solo, el último
+    repositorio.guardar(1, "Ana María", "Calle 5", "300", "UNAL", "", "MEDELLÍN")
+    repositorio.guardar(1, "Ana María", "Calle 9", "300", "UNAL", "", "MEDELLÍN")
+    repositorio.eliminar([3])
+    segunda = str(tmp_path / "cambios2.jsonl")
+    escritos, nueva_marca, _ = exportar_cambios(db_handler, gazetteer, segunda)
+    assert escritos == 2 and nueva_marca > marca
+    assert [(c["Operacion"], c["Id"], c["Dirección"]) for c in lee_jsonl(segunda)] == \
+        [("cambio", 1, "Calle 9"), ("baja", 3, None)]
+    # Sin cambios nuevos no se exporta nada y la marca no se mueve
+    assert exportar_cambios(db_handler, gazetteer, str(tmp_path / "cambios3.csv"))[:2] == (0, nueva_marca)
+    # Otro consumidor tiene su propia marca y recibe todo desde el principio
+    assert exportar_cambios(db_handler, gazetteer, str(tmp_path / "otro.csv"), consumidor="otro")[0] == 3
+
+def test_cambios_comprimidos_en_csv(db_handler, gazetteer, tmp_path):
+    ParticipantRepository(db_handler).guardar_lote([[n, "Ana", "", "", "", "", "MEDELLÍN"] for n in (1, 2)])
+    ruta = str(tmp_path / "cambios.csv.gz")
+    assert exportar_cambios(db_handler, gazetteer, ruta)[0] == 2
+    with gzip.open(ruta, "rt", newline="", encoding="utf-8") as archivo:
+        filas = list(csv.reader(archivo))
+    assert filas[0] == ENCABEZADO_CAMBIOS
+    assert [(fila[1], fila[2]) for fila in filas[1:]] == [("alta", "1"), ("alta", "2")]
+
+def test_exportacion_cancelada_no_mueve_la_marca(db_handler, gazetteer, tmp_path):
+    ParticipantRepository(db_handler).guardar_lote([[n, "Ana", "", "", "", "", "MEDELLÍN"] for n in range(1, 6)])
+    ruta = str(tmp_path / "cambios.jsonl")
+    lotes = []
+
+    def cancelado():
+        # Se cancela después de escribir dos lotes de dos cambios
+        lotes.append(1)
+        return len(lotes) > 2
+
+    escritos, _, completo = exportar_cambios(db_handler, gazetteer, ruta, tamano_lote=2, cancelado=cancelado)
+    assert (escritos, completo) == (4, False)
+    assert not os.path.exists(ruta) and not os.path.exists(ruta + ".parcial")
+    assert marca_cambios(db_handler, "exportacion") == 0
+    # La siguiente exportación vuelve a incluir todos los cambios
+    assert exportar_cambios(db_handler, gazetteer, ruta)[:1] == (5,)
+    assert [c["Id"] for c in lee_jsonl(ruta)] == [1, 2, 3, 4, 5]
@@ -0,0 +1,83 @@
+# test_gazetteer.py
+import sqlite3
+import time
+
+from cargador_ciudades import cargar_ciudades
+from conftest import escribe_dane
+
+def test_departamentos_y_municipios(gazetteer):
+    assert gazetteer.departamentos() == ["ANTIOQUIA", "ATLÁNTICO", "BOGOTÁ, D.C.", "CASANARE"]
+    assert gazetteer.ciudades("ANTIOQUIA") == ["ABEJORRAL", "MEDELLÍN"]
+    assert gazetteer.ciudades("AMAZONAS") == []
+    assert gazetteer.departamento_de("MEDELLÍN") == "ANTIOQUIA"
+    assert gazetteer.departamento_de("ENVIGADO", defecto=None) is None
+
+def test_municipios_homonimos(gazetteer):
+    # Sin departamento se resuelve el primero por código DANE, como la antigua subconsulta con LIMIT 1
+    assert gazetteer.departamento_de("SABANALARGA") == "ATLÁNTICO"
+    assert gazetteer.codigo_dane("SABANALARGA") == (8, 8638)
+    assert gazetteer.codigo_dane("SABANALARGA", "CASANARE") == (85, 85300)
+    assert gazetteer.codigo_dane("SABANALARGA", "ANTIOQUIA") is None
+
+def test_la_cache_se_lee_una_vez_hasta_invalidarla(db_handler, gazetteer):
+    assert gazetteer.cargar()
+    # Un cambio sin nueva huella solo se ve después de invalidar la caché
+    db_handler.execute_query("DELETE FROM t_ciudades WHERE Nombre_Ciudad = 'ABEJORRAL'")
+    assert not gazetteer.verificar()
+    assert gazetteer.ciudades("ANTIOQUIA") == ["ABEJORRAL", "MEDELLÍN"]
+    gazetteer.invalidar()
+    assert gazetteer.ciudades("ANTIOQUIA") == ["MEDELLÍN"]
+
+def test_recarga_de_ciudades_desde_otra_conexion(tmp_path, ruta_base, db_handler, gazetteer):
+    assert gazetteer.departamento_de("ENVIGADO") == ""
+    ruta_csv = escribe_dane(str(tmp_path / "ciudades.csv"),
+                            [(5, 5001, "ANTIOQUIA", "MEDELLÍN"), (5, 5266, "ANTIOQUIA", "ENVIGADO")])
+    # Otro proceso recarga t_ciudades: el Gazetteer lo nota por la huella guardada en t_metadatos
+    conn = sqlite3.connect(ruta_base)
+    cargar_ciudades(conn, ruta_csv)
+    conn.close()
+    # Las consultas solo leen memoria: hasta la siguiente verificación se ve la carga anterior
+    consultas = []
+    db_handler.connect().set_trace_callback(consultas.append)
+    assert gazetteer.departamento_de("ENVIGADO") == ""
+    assert consultas == []
+    assert gazetteer.verificar()
+    assert gazetteer.departamento_de("ENVIGADO") == "ANTIOQUIA"
+    assert gazetteer.departamentos() == ["ANTIOQUIA"]
+    assert not gazetteer.verificar()
+
+def test_el_hilo_de_verificacion_nota_la_recarga(tmp_path, ruta_base, gazetteer):
+    assert gazetteer.cargar()
+    gazetteer.iniciar_verificacion(0.01)
+    try:
+        conn = sqlite3.connect(ruta_base)
+        cargar_ciudades(conn, escribe_dane(str(tmp_path / "ciudades.csv"), [(5, 5266, "ANTIOQUIA", "ENVIGADO")]))
+        conn.close()
+        limite = time.monotonic() + 5
+        while gazetteer.departamento_de("ENVIGADO") == "" and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert gazetteer.departamento_de("ENVIGADO") == "ANTIOQUIA"
+    finally:
+        gazetteer.detener_verificacion()
+
+def test_busca_ciudades_sin_tildes_desde_cualquier_palabra(db_handler, gazetteer):
+    db_handler.execute_query("""INSERT INTO t_ciudades (Id_Departamento, Id_Ciudad, Nombre_Departamento, Nombre_Ciudad)
+                                VALUES (5, 5647, 'ANTIOQUIA', 'SAN ANDRÉS DE CUERQUÍA'),
+                                       (5, 5042, 'ANTIOQUIA', 'SANTA FÉ DE ANTIOQUIA')""")
+    gazetteer.invalidar()
+    assert gazetteer.busca_ciudades("medelli") == [("MEDELLÍN", "ANTIOQUIA")]
+    assert gazetteer.busca_ciudades("MEDELLIN") == [("MEDELLÍN", "ANTIOQUIA")]
+    # Una palabra intermedia del nombre, escrita sin tilde
+    assert gazetteer.busca_ciudades("cuerquia") == [("SAN ANDRÉS DE CUERQUÍA", "ANTIOQUIA")]
+    assert gazetteer.busca_ciudades("andres de cuer") == [("SAN ANDRÉS DE CUERQUÍA", "ANTIOQUIA")]
+    # La puntuación cuenta como espacio
+    assert gazetteer.busca_ciudades("d c") == [("BOGOTÁ, D.C.", "BOGOTÁ, D.C.")]
+    # Primero los que empiezan por el texto; un municipio que coincide en dos palabras aparece una vez
+    assert gazetteer.busca_ciudades("san") == [("SAN ANDRÉS DE CUERQUÍA", "ANTIOQUIA"),
+                                               ("SANTA FÉ DE ANTIOQUIA", "ANTIOQUIA")]
+    assert gazetteer.busca_ciudades("antioquia") == [("SANTA FÉ DE ANTIOQUIA", "ANTIOQUIA")]
+    assert [c for c, _ in gazetteer.busca_ciudades("sabanalarga")] == ["SABANALARGA", "SABANALARGA"]
+    # No hay coincidencias dentro de una palabra
+    assert gazetteer.busca_ciudades("ellin") == []
+    assert gazetteer.busca_ciudades(" , ") == []
+    assert len(gazetteer.busca_ciudades("a", limite=2)) == 2
@@ -0,0 +1,87 @@
+# test_importacion.py
+import csv
+
+from exportacion import ENCABEZADO, exportar_csv
+from gazetteer import Gazetteer
+from importacion import importar_csv
+
+COLUMNAS = ["Id", "Nombre", "Dirección", "Celular", "Entidad", "Fecha", "Ciudad"]
+
+FILAS = [
+    ["1", "Ana María", "Calle 1", "3001234567", "UNAL", "01/01/2099", "MEDELLÍN"],
+    ["2", "Ñeco", "Carrera 2", "", "", "", "SABANALARGA"],
+    ["3", "Luis", "", "3000000000", "UdeA", "15/06/2099", "BOGOTÁ, D.C."],
+]
+
+SQL_TODOS = "SELECT * FROM t_participantes ORDER BY Id"
+
+def escribe_csv(ruta, encabezado, filas):
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        writer = csv.writer(archivo)
+        writer.writerow(encabezado)
+        writer.writerows(filas)
+
+def lee_csv(ruta):
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        return list(csv.reader(archivo))
+
+def test_importa_por_lotes_y_actualiza_los_existentes(tmp_path, db_handler, gazetteer):
+    ruta = str(tmp_path / "entrada.csv")
+    escribe_csv(ruta, COLUMNAS, FILAS)
+    avances = []
+    assert importar_csv(db_handler, gazetteer, ruta, tamano_lote=2,
+                        progreso=lambda leidas, total: avances.append(leidas)) == (3, 3, 0, True)
+    assert avances == [2, 3]
+    # Un Id repetido actualiza la fila en lugar de fallar
+    escribe_csv(ruta, COLUMNAS, [["2", "Ñeco", "Carrera 20", "", "", "", "SABANALARGA"]])
+    assert importar_csv(db_handler, gazetteer, ruta) == (1, 1, 0, True)
+    filas = db_handler.fetch_all(SQL_TODOS)
+    assert [fila[0] for fila in filas] == [1, 2, 3]
+    assert filas[1][2] == "Carrera 20"
+    assert db_handler.fetch_all("SELECT rowid FROM t_participantes_fts WHERE t_participantes_fts MATCH 'carrera'") == [(2,)]
+
+def test_exportar_e_importar_conserva_los_participantes(tmp_path, db_handler, gazetteer, nueva_base):
+    entrada = str(tmp_path / "entrada.csv")
+    escribe_csv(entrada, COLUMNAS, FILAS)
+    importar_csv(db_handler, gazetteer, entrada)
+    ruta = str(tmp_path / "participantes.csv")
+    assert exportar_csv(db_handler, gazetteer, ruta) == (3, True)
+    exportadas = lee_csv(ruta)
+    assert exportadas[0] == ENCABEZADO
+    assert ["2", "Ñeco", "Carrera 2", "", "", "", "SABANALARGA", "ATLÁNTICO"] in exportadas
+
+    # El archivo exportado, con su columna Departamento, se importa tal cual en otra base
+    destino = nueva_base("copia.db")
+    assert importar_csv(destino, Gazetteer(destino), ruta) == (3, 3, 0, True)
+    assert destino.fetch_all(SQL_TODOS) == db_handler.fetch_all(SQL_TODOS)
+    assert not (tmp_path / "participantes_rechazos.csv").exists()
+
+def test_rechazos_con_motivo(tmp_path, db_handler, gazetteer):
+    ruta = str(tmp_path / "entrada.csv")
+    escribe_csv(ruta, ["id", "NOMBRE", "Direccion", "Celular", "Entidad", "Fecha", "Ciudad", "Departamento"], [
+        ["10", "Ana", "", "", "", "", "MEDELLÍN", "ANTIOQUIA"],
+        ["x1", "Luis", "", "", "", "", "MEDELLÍN", ""],
+        ["11", "Eva", "", "", "", "", "ENVIGADO", ""],
+        ["12", "Rosa", "", "", "", "01/01/2000", "MEDELLÍN", ""],
+        ["13", "Juan", "", "", "", "", "MEDELLÍN", "CASANARE"],
+    ])
+    assert importar_csv(db_handler, gazetteer, ruta) == (5, 1, 4, True)
+    rechazos = lee_csv(str(tmp_path / "entrada_rechazos.csv"))
+    assert rechazos[0][-1] == "Motivo"
+    assert [fila[0] for fila in rechazos[1:]] == ["x1", "11", "12", "13"]
+    assert "t_ciudades" in rechazos[2][-1] and "pasado" in rechazos[3][-1]
+    assert "CASANARE" in rechazos[4][-1]
+
+def test_municipio_homonimo_de_otro_departamento_se_rechaza(tmp_path, db_handler, gazetteer):
+    # Solo se guarda la ciudad: SABANALARGA siempre se resuelve como ATLÁNTICO (primer código DANE)
+    ruta = str(tmp_path / "homonimos.csv")
+    escribe_csv(ruta, COLUMNAS + ["Departamento"], [
+        ["20", "Ana", "", "", "", "", "SABANALARGA", "ATLÁNTICO"],
+        ["21", "Luis", "", "", "", "", "SABANALARGA", "CASANARE"],
+    ])
+    assert importar_csv(db_handler, gazetteer, ruta) == (2, 1, 1, True)
+    rechazo = lee_csv(str(tmp_path / "homonimos_rechazos.csv"))[1]
+    assert rechazo[0] == "21" and "ATLÁNTICO" in rechazo[-1]
+    salida = str(tmp_path / "salida.csv")
+    exportar_csv(db_handler, gazetteer, salida)
+    assert [fila[-1] for fila in lee_csv(salida)[1:]] == ["ATLÁNTICO"]
@@ -0,0 +1,51 @@
+# test_indice_ids.py
+import random
+
+import pytest
+
+from indice_ids import IndiceIds
+
+IDS = [1, 7, 10, 12, 19, 100, 105, 120, 1000, 1099, 123456789, 999999999999999]
+
+def por_texto(ids, prefijo, limite):
+    """Resultado esperado calculado sobre el texto: más cortos primero y luego en orden ascendente."""
+    return sorted((i for i in ids if str(i).startswith(prefijo)), key=lambda i: (len(str(i)), i))[:limite]
+
+@pytest.fixture
+def indice():
+    return IndiceIds(reversed(IDS))
+
+@pytest.mark.parametrize("prefijo, esperado", [
+    ("1", [1, 10, 12, 19, 100, 105, 120, 1000, 1099, 123456789]),
+    ("10", [10, 100, 105, 1000, 1099]),
+    ("12", [12, 120, 123456789]),
+    ("1234", [123456789]),
+    ("9", [999999999999999]),
+    ("999999999999999", [999999999999999]),
+    ("2", []),
+])
+def test_rangos_por_prefijo(indice, prefijo, esperado):
+    assert indice.con_prefijo(prefijo) == esperado
+
+@pytest.mark.parametrize("prefijo", ["", "01", "1a", "-1", "1234567890123456"])
+def test_prefijos_invalidos(indice, prefijo):
+    assert indice.con_prefijo(prefijo) == []
+
+def test_limite_corta_entre_longitudes(indice):
+    assert indice.con_prefijo("1", limite=3) == [1, 10, 12]
+    assert indice.con_prefijo("1", limite=6) == [1, 10, 12, 19, 100, 105]
+
+def test_agrega_y_quita_mantienen_el_orden(indice):
+    indice.agrega(11)
+    indice.agrega(11)
+    indice.quita([10, 4242])
+    assert len(indice) == len(IDS)
+    assert 11 in indice and 10 not in indice
+    assert indice.con_prefijo("1", limite=4) == [1, 11, 12, 19]
+
+def test_coincide_con_la_busqueda_sobre_el_texto():
+    generador = random.Random(18)
+    ids = {generador.randrange(1, 10 ** generador.randrange(1, 12)) for _ in range(3000)}
+    indice = IndiceIds(sorted(ids), ordenados=True)
+    for prefijo in ["1", "5", "42", "907", "31415", "8" * 11] + [str(i)[:3] for i in list(ids)[:50]]:
+        assert indice.con_prefijo(prefijo, limite=25) == por_texto(ids, prefijo, 25)
@@ -0,0 +1,97 @@
+# test_instrumentacion.py
+import json
+import time
+
+import pytest
+
+from consultas import SQL_CONSULTA_ID
+from db_handler import DatabaseHandler
+from instrumentacion import MonitorSQL
+
+# Cada fila tarda PAUSA segundos en producirse, de modo que leerlas cuesta más que ejecutar la sentencia
+PAUSA = 0.02
+SQL_LENTA = "SELECT pausa(value) FROM json_each('[1, 2, 3, 4]')"
+
+def pausa(valor):
+    time.sleep(PAUSA)
+    return valor
+
+@pytest.fixture
+def medido(ruta_base):
+    """DatabaseHandler con monitor; la función pausa() está registrada en la conexión del hilo."""
+    handler = DatabaseHandler(ruta_base, monitor=MonitorSQL(umbral_lento=10))
+    handler.connect().create_function("pausa", 1, pausa)
+    yield handler
+    handler.close()
+
+def estadistica(monitor, sql):
+    texto = " ".join(sql.split())
+    return next(e for e in monitor.resumen()["sentencias"] if e["sql"] == texto)
+
+def test_el_tiempo_incluye_la_lectura_de_las_filas(medido):
+    cursor = medido.connect().execute(SQL_LENTA)
+    # Mientras quedan filas por leer la consulta aún no se registra
+    assert all(e["sql"] != SQL_LENTA for e in medido.monitor.resumen()["sentencias"])
+    assert cursor.fetchone() == (1,)
+    assert cursor.fetchmany(2) == [(2,), (3,)]
+    assert cursor.fetchall() == [(4,)]
+    resultado = estadistica(medido.monitor, SQL_LENTA)
+    assert resultado["ejecuciones"] == 1 and resultado["filas"] == 4
+    # Las cuatro filas, no solo la primera que produce execute()
+    assert resultado["total_ms"] >= 4 * PAUSA * 1000 * 0.9
+
+def test_consulta_sin_agotar_se_registra_al_cerrar_o_al_reutilizar_el_cursor(medido):
+    conn = medido.connect()
+    cursor = conn.execute(SQL_LENTA)
+    cursor.fetchone()
+    cursor.close()
+    assert estadistica(medido.monitor, SQL_LENTA)["filas"] == 1
+    cursor = conn.cursor()
+    cursor.execute(SQL_LENTA)
+    for fila in cursor:
+        break
+    cursor.execute("SELECT 1")
+    assert estadistica(medido.monitor, SQL_LENTA)["ejecuciones"] == 2
+
+def test_plan_de_consulta_lenta_se_captura_una_sola_vez(ruta_base, monkeypatch, tmp_path):
+    monitor = MonitorSQL(umbral_lento=0)
+    planes = []
+    plan_original = MonitorSQL.plan
+
+    def plan_contado(conn, sql, parametros=()):
+        planes.append(sql)
+        return plan_original(conn, sql, parametros)
+
+    monkeypatch.setattr(MonitorSQL, "plan", staticmethod(plan_contado))
+    handler = DatabaseHandler(ruta_base, monitor=monitor)
+    try:
+        for id_participante in (1, 2, 3):
+            assert handler.fetch_all(SQL_CONSULTA_ID, (id_participante,)) == []
+    finally:
+        handler.close()
+    assert planes.count(SQL_CONSULTA_ID) == 1
+    lentas = [l for l in monitor.lentas if l["nombre"] == "SQL_CONSULTA_ID"]
+    assert len(lentas) == 3
+    # Todas las ocurrencias muestran el plan capturado la primera vez (búsqueda por la clave primaria)
+    assert all(l["plan"] == lentas[0]["plan"] for l in lentas)
+    assert any("INTEGER PRIMARY KEY" in linea for linea in lentas[0]["plan"])
+    ruta = monitor.exportar_json(str(tmp_path / "estadisticas.json"))
+    with open(ruta, encoding="utf-8") as archivo:
+        resumen = json.load(archivo)
+    assert estadistica(monitor, SQL_CONSULTA_ID)["ejecuciones"] == 3
+    assert any(s["nombre"] == "SQL_CONSULTA_ID" and s["plan"] for s in resumen["sentencias"])
+
+def test_executemany_lento_captura_su_plan(ruta_base):
+    monitor = MonitorSQL(umbral_lento=0)
+    handler = DatabaseHandler(ruta_base, monitor=monitor)
+    sql = "UPDATE t_participantes SET Nombre = ? WHERE Id = ?"
+    try:
+        with handler.transaction() as conn:
+            # Un generador: el plan usa el primer juego de parámetros sin quitárselo a la sentencia
+            conn.executemany(sql, ((f"P{i}", i) for i in (1, 2, 3)))
+            conn.executemany("INSERT INTO t_metadatos (Clave, Valor) VALUES ('a', 'b')", [()])
+            assert conn.execute("SELECT Valor FROM t_metadatos WHERE Clave = 'a'").fetchone() == ("b",)
+    finally:
+        handler.close()
+    lenta = next(l for l in monitor.lentas if l["sql"] == sql)
+    assert any("INTEGER PRIMARY KEY" in linea for linea in lenta["plan"])
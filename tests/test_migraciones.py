@@ -0,0 +1,52 @@
+# test_migraciones.py
+import sqlite3
+
+import pytest
+
+import migraciones
+from migraciones import aplicar_migraciones, verificar_planes, version_esquema, version_objetivo
+
+def test_base_nueva_queda_en_la_ultima_version():
+    conn = sqlite3.connect(":memory:")
+    assert aplicar_migraciones(conn) == [version for version, _, _ in migraciones.MIGRACIONES]
+    assert version_esquema(conn) == version_objetivo()
+    assert aplicar_migraciones(conn) == []
+
+def test_base_existente_conserva_sus_participantes(tmp_path):
+    ruta = str(tmp_path / "antigua.db")
+    conn = sqlite3.connect(ruta)
+    # Esquema anterior a las migraciones: solo las tablas del script original
+    for sentencia in migraciones.MIGRACIONES[0][2]:
+        conn.execute(sentencia)
+    conn.execute("""INSERT INTO t_participantes VALUES (7, 'Ana', 'Calle 1', '300', 'UNAL', '01/02/2024', 'MEDELLÍN')""")
+    conn.commit()
+    aplicar_migraciones(conn)
+    assert conn.execute("SELECT Nombre FROM t_participantes WHERE Id = 7").fetchone() == ("Ana",)
+    # Los índices y tablas derivadas incluyen los datos existentes
+    assert conn.execute("SELECT rowid FROM t_participantes_fts WHERE t_participantes_fts MATCH 'ana'").fetchall() == [(7,)]
+    assert conn.execute("SELECT Operacion, Id FROM t_cambios").fetchall() == [("I", 7)]
+    assert ("Ciudad", "MEDELLÍN", 1) in conn.execute("SELECT Dimension, Valor, Cantidad FROM t_resumen").fetchall()
+    assert conn.execute("PRAGMA integrity_check").fetchall() == [("ok",)]
+
+def test_version_mas_reciente_se_rechaza():
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"PRAGMA user_version = {version_objetivo() + 1}")
+    with pytest.raises(sqlite3.DatabaseError, match="más reciente"):
+        aplicar_migraciones(conn)
+    assert version_esquema(conn) == version_objetivo() + 1
+
+def test_planes_vigilados_sin_recorridos_completos(ruta_base):
+    # Una conexión de sqlite3 sin nada registrado: los índices no dependen de funciones de la aplicación
+    conn = sqlite3.connect(ruta_base)
+    assert verificar_planes(conn) == []
+
+def test_verificar_planes_detecta_un_indice_faltante(ruta_base):
+    conn = sqlite3.connect(ruta_base)
+    indice = conn.execute("""SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 't_participantes'
+                             AND sql LIKE '%Nombre%'""").fetchone()[0]
+    conn.execute(f"DROP INDEX {indice}")
+    conn.close()
+    # Conexión nueva: la anterior conserva en caché sentencias preparadas con el índice
+    conn = sqlite3.connect(ruta_base)
+    problemas = verificar_planes(conn)
+    assert problemas and all("Nombre" in nombre for nombre, _ in problemas)
@@ -0,0 +1,28 @@
+# test_modelo.py
+from modelo import AlmacenParticipantes, Participante
+
+def fila(id_participante, nombre="Ana", ciudad="MEDELLÍN"):
+    # Las cadenas se arman en tiempo de ejecución para que no sean la misma constante
+    return (id_participante, nombre, "Calle 1", "0300", "".join(["UN", "AL"]), "01/02/2099", "".join(ciudad))
+
+def test_participante_comparte_los_valores_repetidos():
+    a, b = Participante.desde_fila(fila(1)), Participante.desde_fila(fila(2))
+    assert a.ciudad is b.ciudad and a.entidad is b.entidad
+    # El celular se conserva como texto, con el cero inicial
+    assert a.como_fila() == (1, "Ana", "Calle 1", "0300", "UNAL", "01/02/2099", "MEDELLÍN")
+    assert a == Participante.desde_fila(fila(1)) and a != b
+
+def test_almacen_indexado_por_id_y_en_orden():
+    almacen = AlmacenParticipantes()
+    almacen.agrega_filas([fila(1), fila(5)])
+    almacen.agrega_filas([fila(9)])
+    assert list(almacen.ids) == [1, 5, 9] and len(almacen) == 3
+    participante, posicion = almacen.inserta(fila(7, "Luis"))
+    assert posicion == 2 and list(almacen.ids) == [1, 5, 7, 9]
+    assert almacen.obtener(7) is participante and 7 in almacen
+    almacen.reemplaza(fila(7, "Luisa"))
+    assert almacen.obtener(7).nombre == "Luisa"
+    assert almacen.quita([5, 9, 100]) == 2
+    assert list(almacen.ids) == [1, 7] and almacen.obtener(5) is None
+    almacen.limpia()
+    assert len(almacen) == 0 and 1 not in almacen
@@ -0,0 +1,85 @@
+# test_nucleo.py
+import sqlite3
+from datetime import date
+
+import pytest
+
+from escritor import EscritorAgrupado
+from nucleo import ErrorValidacion, ServicioParticipantes
+
+HOY = date(2025, 1, 1)
+
+@pytest.fixture
+def servicio(db_handler, gazetteer):
+    servicio = ServicioParticipantes(db_handler, gazetteer)
+    assert servicio.preparar()
+    return servicio
+
+def datos(**cambios):
+    base = {"Id": "20", "Nombre": "Ana", "Dirección": "Calle 1", "Celular": "300",
+            "Entidad": "UNAL", "Fecha": "01/02/2025", "Ciudad": "MEDELLÍN"}
+    base.update(cambios)
+    return base
+
+def test_validar_convierte_los_datos(servicio):
+    assert servicio.validar(datos(Id=" 20 "), HOY) == (20, "Ana", "Calle 1", "300", "UNAL", "01/02/2025", "MEDELLÍN")
+
+@pytest.mark.parametrize("cambios, motivo", [
+    ({"Id": "12a"}, "Identificación"),
+    ({"Nombre": "Ana 2"}, "nombre"),
+    ({"Fecha": "31/12/2024"}, "pasado"),
+    ({"Ciudad": ""}, "ciudad"),
+    ({"Ciudad": "ENVIGADO"}, "t_ciudades"),
+    ({"Ciudad": "SABANALARGA", "Departamento": "CASANARE"}, "varios departamentos"),
+])
+def test_validar_rechaza_con_motivo(servicio, cambios, motivo):
+    with pytest.raises(ErrorValidacion, match=motivo):
+        servicio.validar(datos(**cambios), HOY)
+
+def test_guardar_y_consultar(servicio):
+    assert servicio.guardar(servicio.validar(datos(), HOY))[1] is True
+    servicio.guardar(servicio.validar(datos(Id="22", Ciudad="SABANALARGA"), HOY))
+    assert servicio.como_dict(servicio.obtener(22))["Departamento"] == "ATLÁNTICO"
+    assert servicio.guardar(servicio.validar(datos(Nombre="Otra"), HOY), sobrescribir=False) == (None, False)
+    assert servicio.obtener(20)[1] == "Ana"
+    assert list(servicio.indice_ids().con_prefijo("2")) == [20, 22]
+
+def test_estadisticas(servicio):
+    servicio.guardar(servicio.validar(datos(), HOY))
+    servicio.guardar(servicio.validar(datos(Id="21", Ciudad="ABEJORRAL", Entidad="EAFIT"), HOY))
+    servicio.guardar(servicio.validar(datos(Id="22", Ciudad="SABANALARGA"), HOY))
+    estadisticas = servicio.estadisticas()
+    # Los municipios se agrupan por departamento con el gazetteer
+    assert estadisticas["Departamento"] == [("ANTIOQUIA", 2), ("ATLÁNTICO", 1)]
+    assert estadisticas["Entidad"] == [("UNAL", 2), ("EAFIT", 1)]
+    assert estadisticas["Fecha"] == [("01/02/2025", 3)]
+
+def test_guardar_por_el_escritor_agrupado(db_handler, gazetteer):
+    escritor = EscritorAgrupado(db_handler)
+    try:
+        servicio = ServicioParticipantes(db_handler, gazetteer, escritor)
+        fila, creado = servicio.guardar(servicio.validar(datos(), HOY))
+        assert creado and fila[0] == 20
+        assert servicio.guardar(servicio.validar(datos(Nombre="Ana Sofía"), HOY)) == (servicio.obtener(20), False)
+        # Un error en una escritura no afecta a las demás del lote
+        with pytest.raises(sqlite3.IntegrityError):
+            servicio.guardar(("x",) + servicio.validar(datos(), HOY)[1:])
+    finally:
+        escritor.cerrar()
+    assert servicio.obtener(20)[1] == "Ana Sofía"
+
+def test_pagina_por_id(servicio):
+    for id_participante in range(20, 25):
+        servicio.guardar(servicio.validar(datos(Id=str(id_participante)), HOY))
+    filas, siguiente = servicio.pagina(despues_de=20, limite=2)
+    assert [fila[0] for fila in filas] == [21, 22] and siguiente == 22
+    filas, siguiente = servicio.pagina(despues_de=siguiente, limite=3)
+    assert [fila[0] for fila in filas] == [23, 24] and siguiente is None
+    assert [fila[0] for fila in servicio.pagina("calle", despues_de=23)[0]] == [24]
+
+def test_eliminar_y_restaurar(servicio):
+    servicio.guardar(servicio.validar(datos(), HOY))
+    filas = servicio.eliminar([20])
+    assert servicio.obtener(20) is None
+    servicio.restaurar(filas)
+    assert servicio.obtener(20)[1] == "Ana"
@@ -0,0 +1,150 @@
+# test_paginacion.py
+import sqlite3
+
+import pytest
+
+from busqueda import expresion_fts
+from consultas import ORDEN_LISTADO
+from nucleo import ServicioParticipantes
+from paginacion import PaginadorKeyset, clave_orden, valor_orden
+
+FILAS = [
+    (1, "Zuluaga", "", "", "UNAL", "01/02/2099", "MEDELLÍN"),
+    (2, "Ávila", "", "", "EAFIT", "15/01/2099", "ABEJORRAL"),
+    (3, "Muñoz", "", "", "UNAL", "02/02/2099", "ABEJORRAL"),
+    (4, "Múnera", "", "", "EAFIT", "01/02/2099", "BARRANQUILLA"),
+    (5, "Núñez", "", "", "UdeA", "03/02/2099", "MEDELLÍN"),
+    (6, "Nuño", "", "", "UdeA", "31/12/2098", "MEDELLÍN"),
+    (7, "Ávila", "", "", "UNAL", "15/01/2099", "SABANALARGA"),
+]
+
+@pytest.fixture
+def con_filas(db_handler):
+    conn = db_handler.connect()
+    with conn:
+        conn.executemany("""INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)""", FILAS)
+    return db_handler
+
+def lee_todo(paginador):
+    paginas = []
+    while not paginador.agotado:
+        pagina = paginador.siguiente_pagina()
+        assert pagina is not None
+        paginas.append([fila[0] for fila in pagina])
+    return paginas
+
+def test_paginas_por_id(con_filas):
+    paginador = PaginadorKeyset(con_filas, tamano_pagina=3)
+    assert paginador.total() == 7
+    assert lee_todo(paginador) == [[1, 2, 3], [4, 5, 6], [7]]
+    assert paginador.siguiente_pagina() == []
+
+def test_pagina_exacta_termina_con_una_lectura_vacia(con_filas):
+    # Con 7 filas y páginas de 7, la primera página no basta para saber que no hay más
+    assert lee_todo(PaginadorKeyset(con_filas, tamano_pagina=7)) == [[1, 2, 3, 4, 5, 6, 7], []]
+
+def test_paginas_de_una_busqueda(con_filas):
+    paginador = PaginadorKeyset(con_filas, tamano_pagina=2, expresion=expresion_fts("medellin"))
+    assert paginador.total() == 3
+    assert lee_todo(paginador) == [[1, 5], [6]]
+
+def test_filas_insertadas_detras_del_punto_de_partida(con_filas):
+    paginador = PaginadorKeyset(con_filas, tamano_pagina=4)
+    assert [fila[0] for fila in paginador.siguiente_pagina()] == [1, 2, 3, 4]
+    conn = con_filas.connect()
+    with conn:
+        conn.execute("DELETE FROM t_participantes WHERE Id = 5")
+        conn.execute("""INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                        VALUES (3000, 'Eva', '', '', '', '', '')""")
+    # La página siguiente parte del último Id leído: no repite ni salta filas por el cambio
+    assert [fila[0] for fila in paginador.siguiente_pagina()] == [6, 7, 3000]
+
+def filas_en_orden(paginador):
+    return [fila for pagina in iter(paginador.siguiente_pagina, []) for fila in pagina]
+
+@pytest.mark.parametrize("descendente", [False, True])
+@pytest.mark.parametrize("columna", list(ORDEN_LISTADO))
+def test_paginas_ordenadas_por_columna(con_filas, columna, descendente):
+    filas = filas_en_orden(PaginadorKeyset(con_filas, tamano_pagina=2, orden=columna, descendente=descendente))
+    # Todas las filas, una sola vez, en el mismo orden que la clave de Python (empates por Id)
+    assert filas == sorted(FILAS, key=lambda f: clave_orden(columna, f), reverse=descendente)
+
+def test_orden_en_espanol(con_filas):
+    filas = filas_en_orden(PaginadorKeyset(con_filas, tamano_pagina=3, orden="Nombre"))
+    # Las tildes no cambian el orden y la ñ va después de la n
+    assert [(f[1], f[0]) for f in filas] == [("Ávila", 2), ("Ávila", 7), ("Múnera", 4), ("Muñoz", 3),
+                                             ("Núñez", 5), ("Nuño", 6), ("Zuluaga", 1)]
+    filas = filas_en_orden(PaginadorKeyset(con_filas, tamano_pagina=3, orden="Fecha"))
+    assert [f[0] for f in filas] == [6, 2, 7, 1, 4, 3, 5]
+
+def test_busqueda_ordenada(con_filas):
+    paginador = PaginadorKeyset(con_filas, tamano_pagina=1, expresion=expresion_fts("medellin"),
+                                orden="Fecha", descendente=True)
+    assert [f[0] for f in filas_en_orden(paginador)] == [5, 1, 6]
+
+def test_cargada_sigue_el_orden_del_paginador(con_filas):
+    paginador = PaginadorKeyset(con_filas, tamano_pagina=3, orden="Ciudad")
+    assert [f[0] for f in paginador.siguiente_pagina()] == [2, 3, 4]
+    # Una fila que pasa a ABEJORRAL queda en la parte leída; una de MEDELLÍN aún no
+    assert paginador.cargada((8, "Eva", "", "", "", "", "ABEJORRAL"))
+    assert not paginador.cargada((8, "Eva", "", "", "", "", "MEDELLÍN"))
+    assert not paginador.cargada((1, "Zuluaga", "", "", "UNAL", "01/02/2099", "CALI"))
+
+# Incluye valores NULL (formularios que no piden la ciudad), vacíos, tildes, ñ y valores repetidos
+FILAS_CON_NULOS = [
+    (1, "Zuluaga", "", "", "UNAL", "01/02/2099", "MEDELLÍN"),
+    (2, "Ávila", "", "", None, "15/01/2099", None),
+    (3, "Muñoz", "", "", "unal", None, "ABEJORRAL"),
+    (4, "Múnera", "", "", "EAFIT", "01/02/2099", "BARRANQUILLA"),
+    (5, "Núñez", "", "", None, "", None),
+    (6, "nuño", "", "", "Ñandú", "31/12/2098", "MEDELLÍN"),
+    (7, "avila", "", "", "", "15/01/2099", ""),
+]
+
+@pytest.fixture
+def servicio(db_handler):
+    with db_handler.transaction() as conn:
+        conn.executemany("""INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)""", FILAS_CON_NULOS)
+    return ServicioParticipantes(db_handler)
+
+@pytest.mark.parametrize("descendente", [False, True])
+@pytest.mark.parametrize("columna", list(ORDEN_LISTADO))
+def test_paginas_ordenadas_incluyen_los_nulos(servicio, columna, descendente):
+    filas = filas_en_orden(servicio.paginador(tamano_pagina=2, orden=columna, descendente=descendente))
+    assert sorted(f[0] for f in filas) == [f[0] for f in FILAS_CON_NULOS]
+    assert filas == sorted(FILAS_CON_NULOS, key=lambda f: clave_orden(columna, f), reverse=descendente)
+
+def test_nulos_y_vacios_van_primero(servicio):
+    filas = filas_en_orden(servicio.paginador(tamano_pagina=2, orden="Nombre"))
+    assert [f[1] for f in filas] == ["Ávila", "avila", "Múnera", "Muñoz", "Núñez", "nuño", "Zuluaga"]
+    # NULL y '' van primero, por Id; la ñ después de la n ('Ñandú' antes de 'UNAL')
+    filas = filas_en_orden(servicio.paginador(tamano_pagina=2, orden="Entidad"))
+    assert [f[4] for f in filas] == [None, None, "", "EAFIT", "Ñandú", "UNAL", "unal"]
+
+def test_cargada_con_nulos(servicio):
+    paginador = servicio.paginador(tamano_pagina=3, orden="Ciudad")
+    assert [f[0] for f in paginador.siguiente_pagina()] == [2, 5, 7]
+    # Un participante que queda sin ciudad se ubica entre los NULL, por su Id
+    assert paginador.cargada((4, "Múnera", "", "", "EAFIT", "01/02/2099", None))
+    assert not paginador.cargada((8, "Eva", "", "", "", "", None))
+    assert not paginador.cargada((1, "Zuluaga", "", "", "UNAL", "01/02/2099", "ABEJORRAL"))
+
+def test_conexion_sin_colacion_puede_escribir_y_verificar(ruta_base):
+    conn = sqlite3.connect(ruta_base)
+    with conn:
+        conn.execute("""INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                        VALUES (9, 'Ñusta', '', '', NULL, NULL, NULL)""")
+        conn.execute("UPDATE t_participantes SET Entidad = 'Ébano' WHERE Id = 9")
+    assert conn.execute("PRAGMA integrity_check").fetchall() == [("ok",)]
+    assert conn.execute("SELECT Orden_Nombre, Orden_Entidad, Orden_Fecha FROM t_participantes").fetchone() == \
+        ("n~usta", "ebano", "")
+
+def test_fecha_guardada_como_numero(db_handler):
+    # La afinidad DATE guarda '2026' como entero; Python calcula la misma clave que la columna generada
+    db_handler.execute_query("""INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                                VALUES (1, 'Eva', '', '', '', '2026', '')""")
+    fila = db_handler.fetch_all("SELECT Id, Nombre, \"Dirección\", Celular, Entidad, Fecha, Ciudad FROM t_participantes")[0]
+    assert fila[5] == 2026
+    assert valor_orden("Fecha", fila) == db_handler.fetch_all("SELECT Orden_Fecha FROM t_participantes")[0][0]
@@ -0,0 +1,77 @@
+# test_repositorio.py
+import sqlite3
+
+import pytest
+
+from busqueda import expresion_fts
+from repositorio import ParticipantRepository
+
+ANA = (10, "Ana", "Calle 1", "300", "UNAL", "01/01/2099", "MEDELLÍN")
+
+@pytest.fixture
+def repositorio(db_handler):
+    return ParticipantRepository(db_handler)
+
+def test_guardar_crea_y_luego_actualiza(repositorio):
+    assert repositorio.guardar(*ANA) == (ANA, True)
+    actualizada = ANA[:2] + ("Calle 2",) + ANA[3:]
+    assert repositorio.guardar(*actualizada) == (actualizada, False)
+    assert repositorio.obtener(10) == actualizada
+    assert repositorio.obtener(99) is None
+
+def test_actualizar_el_id_que_coincide_con_last_insert_rowid(repositorio):
+    # Tras crear el Id 10, last_insert_rowid() vale 10: el upsert siguiente no cambia ese valor
+    # y la creación no puede deducirse de él, de modo que se verifica la existencia
+    assert repositorio.guardar(*ANA)[1] is True
+    assert repositorio.guardar(*ANA)[1] is False
+    assert repositorio.guardar(*ANA)[1] is False
+    # Lo mismo después de un lote cuyo último Id es el que se actualiza
+    repositorio.guardar_lote([[12, "Eva", "", "", "", "", "MEDELLÍN"], [11, "Luis", "", "", "", "", "MEDELLÍN"]])
+    assert repositorio.guardar(11, "Luis", "Calle 5", "", "", "", "MEDELLÍN") == \
+        ((11, "Luis", "Calle 5", "", "", "", "MEDELLÍN"), False)
+    # Y si ese Id se eliminó, volver a grabarlo es una creación
+    repositorio.eliminar([11])
+    assert repositorio.guardar(11, "Luis", "", "", "", "", "MEDELLÍN")[1] is True
+
+def test_guardar_sin_sobrescribir_y_ciudad_nula(repositorio):
+    repositorio.guardar(*ANA)
+    assert repositorio.guardar(10, "Otra", "", "", "", "", "BARRANQUILLA", sobrescribir=False) == (None, False)
+    assert repositorio.obtener(10) == ANA
+    # Una ciudad None conserva la registrada
+    fila, creado = repositorio.guardar(10, "Ana", "", "", "", "", None)
+    assert fila[6] == "MEDELLÍN" and not creado
+
+def test_id_no_numerico(repositorio):
+    with pytest.raises(ValueError):
+        repositorio.guardar("abc", "Ana", "", "", "", "", "MEDELLÍN")
+
+def test_eliminar_y_restaurar(repositorio):
+    repositorio.guardar_lote([list(ANA), [11, "Luis", "", "", "", "", "MEDELLÍN"]])
+    assert list(repositorio.ids()) == [10, 11]
+    eliminadas = repositorio.eliminar([10, 11, 12])
+    assert sorted(f[0] for f in eliminadas) == [10, 11]
+    assert repositorio.existe(10) is False
+    repositorio.restaurar(eliminadas)
+    assert repositorio.obtener(10) == ANA
+    # Si un Id volvió a registrarse la restauración no modifica nada
+    repositorio.eliminar([10, 11])
+    repositorio.guardar(11, "Nuevo", "", "", "", "", "MEDELLÍN")
+    with pytest.raises(sqlite3.IntegrityError):
+        repositorio.restaurar(eliminadas)
+    assert list(repositorio.ids()) == [11]
+    assert repositorio.obtener(11)[1] == "Nuevo"
+
+def test_busqueda_de_texto_completo(repositorio):
+    repositorio.guardar_lote([list(ANA), [11, "Luis Martínez", "", "", "EAFIT", "", "BARRANQUILLA"]])
+    expresion = expresion_fts("martinez")
+    assert repositorio.coincide(expresion, 11) and not repositorio.coincide(expresion, 10)
+    assert repositorio.coincidencias(expresion_fts("medellin"), [10, 11]) == {10}
+
+def test_resumen_mantenido_por_triggers(repositorio):
+    repositorio.guardar_lote([list(ANA), [11, "Luis", "", "", "UNAL", "", "MEDELLÍN"]])
+    repositorio.guardar(11, "Luis", "", "", "EAFIT", "", "BARRANQUILLA")
+    repositorio.eliminar([10])
+    resumen = repositorio.resumen()
+    assert resumen["Ciudad"] == {"BARRANQUILLA": 1}
+    assert resumen["Entidad"] == {"EAFIT": 1}
+    assert resumen["Fecha"] == {"": 1}
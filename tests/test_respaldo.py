@@ -0,0 +1,79 @@
+# test_respaldo.py
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from respaldo import aplicar_retencion, crear_respaldo, respaldar, verifica_integridad
+
+INICIALES = 3000
+
+def inserta(conn, ids):
+    conn.executemany("""INSERT INTO t_participantes (Id, Nombre, "Dirección", Celular, Entidad, Fecha, Ciudad)
+                        VALUES (?, 'Ana', ?, '300', 'UNAL', '', 'MEDELLÍN')""", [(i, "Calle " * 40) for i in ids])
+
+def test_respaldo_mientras_se_escribe(db_handler, ruta_base, tmp_path):
+    with db_handler.transaction() as conn:
+        inserta(conn, range(1, INICIALES + 1))
+    detener = threading.Event()
+    escritos = []
+
+    def escribe():
+        # Otro hilo sigue registrando participantes, uno por transacción, durante toda la copia
+        siguiente = INICIALES + 1
+        while not detener.is_set():
+            with db_handler.transaction() as conn:
+                inserta(conn, [siguiente])
+            escritos.append(siguiente)
+            siguiente += 1
+
+    hilo = threading.Thread(target=escribe)
+    hilo.start()
+    pasos = []
+    try:
+        # Espera a que el escritor esté activo antes de empezar la copia
+        while not escritos:
+            pass
+        ruta = crear_respaldo(ruta_base, str(tmp_path / "respaldos"), paginas_por_paso=8, pausa=0.002,
+                              progreso=lambda hechas, total: pasos.append(hechas))
+    finally:
+        detener.set()
+        hilo.join()
+    assert len(pasos) > 10
+    assert escritos[-1] > INICIALES + 1
+    assert os.listdir(tmp_path / "respaldos") == [os.path.basename(ruta)]
+
+    copia = sqlite3.connect(ruta)
+    try:
+        assert copia.execute("PRAGMA journal_mode").fetchone() == ("delete",)
+        # PRAGMA integrity_check; lanza RespaldoInvalido si encuentra problemas
+        verifica_integridad(copia)
+        # Una foto consistente: los participantes de antes más un prefijo de los que se siguieron escribiendo
+        ids = [fila[0] for fila in copia.execute("SELECT Id FROM t_participantes ORDER BY Id")]
+        assert ids == list(range(1, len(ids) + 1)) and len(ids) >= INICIALES
+        assert copia.execute("SELECT COUNT(*) FROM t_participantes_fts WHERE t_participantes_fts MATCH 'ana'") \
+            .fetchone() == (len(ids),)
+    finally:
+        copia.close()
+
+def test_cancelar_no_deja_archivos(db_handler, ruta_base, tmp_path):
+    carpeta = str(tmp_path / "respaldos")
+    assert crear_respaldo(ruta_base, carpeta, cancelado=lambda: True) is None
+    assert os.listdir(carpeta) == []
+
+def test_retencion_borra_solo_los_mas_antiguos(ruta_base, tmp_path):
+    carpeta = str(tmp_path / "respaldos")
+    inicio = datetime(2026, 1, 31, 23, 59, 58)
+    rutas = [crear_respaldo(ruta_base, carpeta, ahora=inicio + timedelta(seconds=s)) for s in (0, 1, 2, 3)]
+    # Otros archivos de la carpeta no son respaldos de esta base
+    for ajeno in ("Otra_20250101-000000.db", "Participantes_20250101-000000.db.parcial", "notas.txt"):
+        open(os.path.join(carpeta, ajeno), "w").close()
+    borrados = aplicar_retencion(ruta_base, carpeta, conservar=2)
+    assert borrados == [os.path.basename(r) for r in rutas[:2]]
+    assert sorted(os.listdir(carpeta)) == sorted(
+        [os.path.basename(r) for r in rutas[2:]]
+        + ["Otra_20250101-000000.db", "Participantes_20250101-000000.db.parcial", "notas.txt"])
+    # respaldar() crea uno nuevo y vuelve a aplicar la retención
+    nuevo = respaldar(ruta_base, carpeta, conservar=2)
+    assert sorted(n for n in os.listdir(carpeta) if n.startswith("Participantes_2026")) == \
+        sorted([os.path.basename(rutas[3]), os.path.basename(nuevo)])
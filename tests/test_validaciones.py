@@ -0,0 +1,55 @@
+# test_validaciones.py
+from datetime import date
+
+import pytest
+
+from validaciones import ESQUEMA, ErrorCampo, acepta_escritura, error_campo, valida_columnas
+
+HOY = date(2025, 1, 1)
+
+@pytest.mark.parametrize("campo, valor, aceptado", [
+    ("Id", "", True),
+    ("Id", "123", True),
+    ("Id", "12a", False),
+    ("Id", "1" * 16, False),
+    ("Nombre", "José Ñuñez", True),
+    ("Nombre", "Ana2", False),
+    ("Celular", "300 1", False),
+    ("Dirección", "Calle #1-2", True),
+])
+def test_acepta_escritura(campo, valor, aceptado):
+    assert acepta_escritura(campo, valor) is aceptado
+
+def test_error_campo():
+    assert error_campo("Id", "") == ESQUEMA["Id"].mensaje
+    assert error_campo("Ciudad", "") == "Debe indicar una ciudad"
+    assert error_campo("Fecha", "", HOY) is None
+    assert "formato" in error_campo("Fecha", "2025-01-02", HOY)
+    assert "pasado" in error_campo("Fecha", "31/12/2024", HOY)
+    assert error_campo("Fecha", "01/01/2025", HOY) is None
+
+def test_valida_columnas_aisla_los_valores_invalidos():
+    n = 5000
+    columnas = {
+        "Id": [str(i) for i in range(1, n + 1)],
+        "Nombre": ["Ana"] * n,
+        "Celular": ["300"] * n,
+        "Fecha": ["01/02/2025"] * n,
+        "Ciudad": ["MEDELLÍN"] * n,
+        "Otra": ["se ignora"] * n,
+    }
+    columnas["Id"][0] = "x"
+    columnas["Nombre"][1999] = "Ana 2"
+    columnas["Celular"][1999] = "30O"
+    columnas["Fecha"][3000] = "31/12/2024"
+    columnas["Fecha"][4999] = "32/01/2025"
+    columnas["Ciudad"][4500] = ""
+    errores = valida_columnas(columnas, HOY)
+    # Ordenados por fila y, dentro de la fila, en el orden del esquema
+    assert [(e.fila, e.campo) for e in errores] == [
+        (0, "Id"), (1999, "Nombre"), (1999, "Celular"), (3000, "Fecha"), (4500, "Ciudad"), (4999, "Fecha")]
+    assert errores[3] == ErrorCampo(3000, "Fecha", "La fecha no puede ser en el pasado.")
+    # El mismo resultado que revisar cada valor por separado
+    assert errores == [ErrorCampo(fila, campo, error_campo(campo, columnas[campo][fila], HOY))
+                       for fila, campo in [(e.fila, e.campo) for e in errores]]
+    assert valida_columnas({"Id": []}, HOY) == []
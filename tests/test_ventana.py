@@ -0,0 +1,111 @@
+# test_ventana.py
+"""
+Construye la ventana principal sin pantalla: tkinter se reemplaza por objetos simulados,
+de modo que se ejecuta todo el constructor y se revisa la conexión de sus métodos.
+"""
+import importlib
+import sys
+from unittest import mock
+
+import pytest
+
+# Módulos que la ventana importa recién después de mostrarse (ver Participantes.prepara_Trabajo
+# y crea_Servicio) o al usarlos
+MODULOS_DIFERIDOS = ("db_handler", "gazetteer", "instrumentacion", "nucleo", "ejecutor", "validaciones",
+                     "modelo", "paginacion", "colacion", "consultas", "indice_ids")
+
+@pytest.fixture
+def proyecto(monkeypatch):
+    """Módulo Proyecto_poo importado con tkinter simulado."""
+    tk = mock.MagicMock(name="tkinter")
+    for nombre, modulo in (("tkinter", tk), ("tkinter.ttk", tk.ttk),
+                           ("tkinter.messagebox", tk.messagebox), ("tkinter.filedialog", tk.filedialog)):
+        monkeypatch.setitem(sys.modules, nombre, modulo)
+    monkeypatch.delitem(sys.modules, "Proyecto_poo", raising=False)
+    for nombre in MODULOS_DIFERIDOS:
+        monkeypatch.delitem(sys.modules, nombre, raising=False)
+    modulo = importlib.import_module("Proyecto_poo")
+    # Importar la ventana no carga todavía los módulos de la base de datos
+    assert not [nombre for nombre in MODULOS_DIFERIDOS if nombre in sys.modules]
+    yield modulo
+    sys.modules.pop("Proyecto_poo", None)
+
+@pytest.fixture
+def app(proyecto, monkeypatch, ruta_base):
+    # La ventana usa la base temporal; el servicio compartido se crea de nuevo en cada prueba
+    monkeypatch.setattr(proyecto.Participantes, "db_path", ruta_base)
+    for nombre in ("monitor_sql", "db_handler", "gazetteer", "servicio"):
+        monkeypatch.setattr(proyecto.Participantes, nombre, None)
+    app = proyecto.Participantes()
+    # Con tkinter simulado after_idle no llama a arranque_Diferido: se crean aquí los hilos y el almacén
+    app.prepara_Trabajo()
+    yield app
+    app.ejecutor.cerrar()
+    app.ejecutor_largo.cerrar()
+    if proyecto.Participantes.gazetteer is not None:
+        proyecto.Participantes.gazetteer.detener_verificacion()
+    if proyecto.Participantes.db_handler is not None:
+        proyecto.Participantes.db_handler.close()
+
+def test_construye_la_ventana_y_difiere_la_base(app, ruta_base):
+    app.treeDatos.configure.assert_any_call(yscroll=app.desplaza_TreeView)
+    # La base de datos se prepara después de mostrar la ventana
+    assert app.paginador is None and app.servicio is None
+    servicio = app.crea_Servicio()
+    assert servicio.db_handler.db_path == ruta_base
+    assert app.crea_Servicio() is servicio
+
+def test_desplazar_cerca_del_final_programa_la_siguiente_pagina(app):
+    app.paginador = mock.Mock(agotado=False)
+    app.win.after_idle.reset_mock()
+    app.desplaza_TreeView("0.0", "0.5")
+    app.scrollbar.set.assert_called_with("0.0", "0.5")
+    app.win.after_idle.assert_not_called()
+
+    app.desplaza_TreeView("0.5", "0.95")
+    app.win.after_idle.assert_called_once_with(app.carga_Pagina)
+    assert app.id_pagina is not None
+    # Mientras la carga está programada no se vuelve a programar
+    app.desplaza_TreeView("0.6", "1.0")
+    app.win.after_idle.assert_called_once()
+
+def test_sin_mas_paginas_no_se_programa_carga(app):
+    app.paginador = mock.Mock(agotado=True)
+    app.win.after_idle.reset_mock()
+    app.desplaza_TreeView("0.9", "1.0")
+    app.win.after_idle.assert_not_called()
+
+def test_ordenar_conserva_el_almacen_hasta_mostrar_la_primera_pagina(app):
+    app.crea_Servicio()
+    app.inserta_Filas([(1, "Zuluaga", "Calle 1", "300", "SENA", "01/01/2030", "MEDELLIN")])
+    app.entryBuscar.get.return_value = ""
+    app.ejecutor.enviar = mock.Mock()
+    app.ordena_Listado("Nombre")
+    # Mientras se lee la página nueva, el formulario aún puede cargar la fila seleccionada
+    assert app.almacen.obtener(1).nombre == "Zuluaga"
+    assert app.almacen.clave is None
+    muestra = app.ejecutor.enviar.call_args.kwargs["al_terminar"]
+    muestra((1, [(2, "Ávila", "Calle 2", "301", "SENA", "02/01/2030", "MEDELLIN")]))
+    assert app.almacen.obtener(1) is None and app.almacen.obtener(2).nombre == "Ávila"
+    assert app.almacen.clave is not None
+
+def test_grabar_valida_como_el_servicio(proyecto, app):
+    app.crea_Servicio()
+    app.servicio.preparar()
+    app.valida = mock.Mock(return_value=True)
+    # Con tkinter simulado todos los campos son el mismo objeto: cada uno recibe el suyo
+    valores = {"entryId": "7", "entryNombre": "Eva", "entryDireccion": "", "entryCelular": "",
+               "entryEntidad": "", "entryFecha": "2026", "comboCiudad": "MEDELLÍN", "comboDepartamento": "ANTIOQUIA"}
+    for nombre, valor in valores.items():
+        setattr(app, nombre, mock.Mock(**{"get.return_value": valor}))
+    app.graba_Registro = mock.Mock()
+    proyecto.mssg.reset_mock()
+    app.adiciona_Registro()
+    # La fecha incompleta se rechaza antes de grabar
+    app.graba_Registro.assert_not_called()
+    proyecto.mssg.showerror.assert_called_once_with("Error", "Ingrese una fecha válida en formato dd/mm/aaaa.")
+
+    app.entryFecha.get.return_value = "01/01/2099"
+    proyecto.mssg.askyesno.return_value = True
+    app.adiciona_Registro()
+    app.graba_Registro.assert_called_once_with((7, "Eva", "", "", "", "01/01/2099", "MEDELLÍN"), sobrescribir=False)
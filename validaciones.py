@@ -0,0 +1,158 @@
+# validaciones.py
+"""
+Reglas de validación de los datos de un participante.
+El esquema (ESQUEMA) describe cada campo de forma declarativa y sus expresiones regulares se
+compilan una sola vez al importar el módulo. Lo usan, sin widgets:
+ - el formulario, tecla por tecla (acepta_escritura) y al salir de un campo (error_campo);
+ - la importación masiva, por columnas completas de cada lote (valida_columnas, desde
+   importacion.valida_lote), con errores estructurados (ErrorCampo) en lugar de mensajes sueltos;
+ - el servicio (formulario y API HTTP), una fila a la vez con importacion.valida_fila.
+"""
+import re
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+LONGITUD_MAXIMA_ID = 15
+FORMATO_FECHA = "%d/%m/%Y"
+
+# Error de validación de un campo: 'fila' es la posición del registro en el lote (0 para uno solo)
+ErrorCampo = namedtuple("ErrorCampo", "fila campo mensaje")
+
+@lru_cache(maxsize=1024)
+def convierte_fecha(valor):
+    """Convierte una fecha dd/mm/aaaa a date; retorna None si el formato no es válido."""
+    try:
+        return datetime.strptime(valor, FORMATO_FECHA).date()
+    except ValueError:
+        return None
+
+def error_fecha(valor, hoy=None):
+    """
+    Retorna None si la fecha es válida (o está vacía), o el mensaje de error correspondiente:
+    formato distinto de dd/mm/aaaa o fecha anterior a hoy.
+    """
+    if valor == "":
+        return None
+    fecha = convierte_fecha(valor)
+    if fecha is None:
+        return "Ingrese una fecha válida en formato dd/mm/aaaa."
+    if fecha < (hoy or datetime.today().date()):
+        return "La fecha no puede ser en el pasado."
+    return None
+
+class Campo:
+    """
+    Regla de validación de un campo:
+     - caracteres: clase de caracteres permitidos (sintaxis de [] en expresiones regulares), o None para cualquiera;
+     - longitud_maxima: caracteres como máximo, o None sin límite;
+     - requerido: si el valor vacío es un error (al escribir siempre se acepta vacío);
+     - verifica(valor, hoy): regla adicional sobre un valor no vacío con el formato correcto;
+       retorna el mensaje de error o None.
+    """
+    __slots__ = ("nombre", "requerido", "longitud_maxima", "mensaje", "mensaje_vacio", "verifica", "_patron")
+
+    def __init__(self, nombre, mensaje="", caracteres=None, longitud_maxima=None, requerido=False,
+                 mensaje_vacio=None, verifica=None):
+        self.nombre = nombre
+        self.requerido = requerido
+        self.longitud_maxima = longitud_maxima
+        self.mensaje = mensaje
+        self.mensaje_vacio = mensaje_vacio or mensaje
+        self.verifica = verifica
+        # Con '*' la concatenación de valores válidos también es válida: permite revisar una columna de una vez
+        self._patron = re.compile(f"[{caracteres}]*") if caracteres else None
+
+    def acepta(self, valor):
+        """Indica si el valor tiene solo caracteres permitidos y no excede la longitud (vacío se acepta)."""
+        return ((self.longitud_maxima is None or len(valor) <= self.longitud_maxima)
+                and (self._patron is None or self._patron.fullmatch(valor) is not None))
+
+    def error(self, valor, hoy=None):
+        """Retorna el mensaje de error del valor completo, o None si es válido."""
+        if valor == "":
+            return self.mensaje_vacio if self.requerido else None
+        if not self.acepta(valor):
+            return self.mensaje
+        return self.verifica(valor, hoy) if self.verifica else None
+
+    def formato_valido(self, valores):
+        """
+        Indica si todos los valores cumplen requerido, longitud y caracteres, con pocas operaciones
+        sobre la lista entera (la expresión se aplica una vez a la concatenación de los valores).
+        """
+        return ((not self.requerido or all(valores))
+                and (self.longitud_maxima is None or max(map(len, valores), default=0) <= self.longitud_maxima)
+                and (self._patron is None or self._patron.fullmatch("".join(valores)) is not None))
+
+    def errores(self, valores, hoy=None, tamano_bloque=1024):
+        """
+        Valida una columna completa y retorna la lista ordenada de pares (posición, mensaje) de los valores inválidos.
+        La columna se revisa por bloques con formato_valido(); un bloque que falla se divide a la mitad
+        hasta aislar los valores inválidos. 'verifica' se evalúa una vez por cada valor distinto
+        de los bloques con formato correcto.
+        """
+        errores = []
+        correctos = []      # Bloques con formato correcto: (posición inicial, valores)
+        pendientes = [(inicio, valores[inicio:inicio + tamano_bloque])
+                      for inicio in range(0, len(valores), tamano_bloque)]
+        while pendientes:
+            inicio, bloque = pendientes.pop()
+            if self.formato_valido(bloque):
+                correctos.append((inicio, bloque))
+            elif len(bloque) > 16:
+                mitad = len(bloque) // 2
+                pendientes.append((inicio, bloque[:mitad]))
+                pendientes.append((inicio + mitad, bloque[mitad:]))
+            else:
+                for i, valor in enumerate(bloque, inicio):
+                    mensaje = self.error(valor, hoy)
+                    if mensaje:
+                        errores.append((i, mensaje))
+        if self.verifica is not None and correctos:
+            invalidos = {}
+            for valor in {valor for _, bloque in correctos for valor in bloque}:
+                mensaje = self.verifica(valor, hoy) if valor else None
+                if mensaje:
+                    invalidos[valor] = mensaje
+            if invalidos:
+                for inicio, bloque in correctos:
+                    errores.extend((i, invalidos[valor]) for i, valor in enumerate(bloque, inicio) if valor in invalidos)
+        errores.sort()
+        return errores
+
+# Esquema del participante, en el orden en que se informan los errores
+ESQUEMA = {campo.nombre: campo for campo in (
+    Campo("Id", "Identificación vacía, no numérica o de más de 15 caracteres",
+          caracteres="0-9", longitud_maxima=LONGITUD_MAXIMA_ID, requerido=True),
+    # Solo letras, espacios, acentos y la letra ñ
+    Campo("Nombre", "El nombre solo puede contener letras y espacios", caracteres=r"A-Za-zÁÉÍÓÚáéíóúÑñ\s"),
+    Campo("Dirección"),
+    Campo("Celular", "El celular solo puede contener dígitos", caracteres="0-9"),
+    Campo("Entidad"),
+    Campo("Fecha", verifica=error_fecha),
+    Campo("Ciudad", requerido=True, mensaje_vacio="Debe indicar una ciudad"),
+)}
+
+def acepta_escritura(campo, valor):
+    """Validación tecla por tecla: el valor parcial del campo indicado es aceptable."""
+    return ESQUEMA[campo].acepta(valor)
+
+def error_campo(campo, valor, hoy=None):
+    """Retorna el mensaje de error del valor completo del campo indicado, o None si es válido."""
+    return ESQUEMA[campo].error(valor, hoy)
+
+def valida_columnas(columnas, hoy=None):
+    """
+    Valida un lote de registros organizado por columnas: diccionario campo -> lista de valores,
+    todas de la misma longitud. Los campos que no están en el esquema se ignoran.
+    Retorna la lista de ErrorCampo ordenada por fila y, dentro de cada fila, en el orden de ESQUEMA.
+    """
+    hoy = hoy or datetime.today().date()
+    errores = []
+    for orden, campo in enumerate(ESQUEMA.values()):
+        valores = columnas.get(campo.nombre)
+        if valores is not None:
+            errores.extend((fila, orden, campo.nombre, mensaje) for fila, mensaje in campo.errores(valores, hoy))
+    errores.sort()
+    return [ErrorCampo(fila, nombre, mensaje) for fila, _, nombre, mensaje in errores]